@@ -0,0 +1,183 @@
+"""Time dup_finder stages on synthetic trees, results as json.
+
+    python benchmarks/bench.py --num-files 2000 --repeat 3 --output results.jsonl
+
+Every repeat generates new tree (move changes it), stages timed separately:
+scan, size grouping, head hashing, full hashing, cross-directory comparison, move.
+"""
+import argparse
+import contextlib
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from dup_finder.core import FileList
+from dup_finder.hashers import DEFAULT_HASH, DEFAULT_STAGE_HASH
+
+from synth_tree import make_tree
+
+STAGE_NAMES = ("scan", "group", "head", "full", "cross", "move")
+
+
+class Timer:
+    """Wall and cpu time of named stages."""
+
+    def __init__(self) -> None:
+        self.times: dict[str, dict[str, float]] = {}
+
+    @contextlib.contextmanager
+    def __call__(self, name: str) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stage = self.times.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+            stage["wall"] += time.perf_counter() - wall
+            stage["cpu"] += time.process_time() - cpu
+
+
+class BenchFileList(FileList):
+    """FileList with scan and size grouping timed."""
+
+    timer: Timer
+
+    def __init__(self, path: Path, timer: Timer, **kwargs: Any) -> None:
+        self.timer = timer
+        super().__init__(path, **kwargs)
+
+    def _scan(self, *args: Any) -> Any:
+        with self.timer("scan"):
+            return super()._scan(*args)
+
+    def _set_files(self, *args: Any) -> None:
+        with self.timer("group"):
+            super()._set_files(*args)
+
+    def _set_sizes(self) -> None:
+        with self.timer("group"):
+            super()._set_sizes()
+
+
+def run_once(root: Path, tree: dict[str, Any], list_kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Generate tree at root, run all stages, return times and counts."""
+    timer = Timer()
+    generated = make_tree(root / "tree", **tree)
+    file_list = BenchFileList(root / "tree", timer, **list_kwargs)
+    with timer("group"):
+        file_list.check_sizes()
+    with timer("head"):
+        file_list.find_dups_candidates(min_size=0)
+    with timer("full"):
+        file_list.find_dups(method="hash")
+    dups = sum(len(group) - 1 for group in file_list._dup_list())
+
+    subdirs = sorted(path for path in (root / "tree").iterdir() if path.is_dir())
+    if len(subdirs) > 1:
+        cross_timer = Timer()
+        one = BenchFileList(subdirs[0], cross_timer, **list_kwargs)
+        other = BenchFileList(subdirs[1], cross_timer, **list_kwargs)
+        with timer("cross"):
+            one.find_dups_candidates_with(other)
+            one.find_dups_with(other, method="hash")
+
+    with timer("move"):
+        file_list.move_dups(root / "dups")
+    return {
+        "generated": generated,
+        "dups": dups,
+        "stages": timer.times,
+        "metrics": file_list.stats.as_dict(),
+    }
+
+
+def summary(runs: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    """Min and median wall time and median cpu time of every stage."""
+    result = {}
+    for name in STAGE_NAMES:
+        walls = [run["stages"][name]["wall"] for run in runs if name in run["stages"]]
+        cpus = [run["stages"][name]["cpu"] for run in runs if name in run["stages"]]
+        if walls:
+            result[name] = {
+                "wall_min": min(walls),
+                "wall_median": statistics.median(walls),
+                "cpu_median": statistics.median(cpus),
+            }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--num-files", type=int, default=1000)
+    parser.add_argument("--size-mu", type=float, default=11.0)
+    parser.add_argument("--size-sigma", type=float, default=2.0)
+    parser.add_argument("--max-size", type=int, default=16 * 1024 * 1024)
+    parser.add_argument("--dup-ratio", type=float, default=0.2)
+    parser.add_argument("--shared-header-ratio", type=float, default=0.1)
+    parser.add_argument("--hardlink-ratio", type=float, default=0.05)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--executor", choices=("thread", "process"), default=None)
+    parser.add_argument("--hash", default=DEFAULT_HASH)
+    parser.add_argument("--stage-hash", default=DEFAULT_STAGE_HASH)
+    parser.add_argument("--tmp-dir", default=None, help="where trees generated")
+    parser.add_argument("--label", default="", help="stored with results, e.g. commit")
+    parser.add_argument("--output", default=None, help="append result as json line")
+    args = parser.parse_args()
+
+    tree = dict(
+        num_files=args.num_files,
+        size_mu=args.size_mu,
+        size_sigma=args.size_sigma,
+        max_size=args.max_size,
+        dup_ratio=args.dup_ratio,
+        shared_header_ratio=args.shared_header_ratio,
+        hardlink_ratio=args.hardlink_ratio,
+        depth=args.depth,
+        fanout=args.fanout,
+        seed=args.seed,
+    )
+    list_kwargs = dict(
+        workers=args.workers,
+        executor=args.executor,
+        hash_name=args.hash,
+        stage_hash_name=args.stage_hash,
+        verbose=False,
+    )
+    runs = []
+    for _ in range(args.repeat):
+        root = Path(tempfile.mkdtemp(prefix="dup_finder_bench_", dir=args.tmp_dir))
+        try:
+            runs.append(run_once(root, tree, list_kwargs))
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    result = {
+        "label": args.label,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "tree": tree,
+        "options": list_kwargs,
+        "runs": runs,
+        "summary": summary(runs),
+    }
+    line = json.dumps(result)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+    print(json.dumps(result["summary"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
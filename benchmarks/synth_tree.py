@@ -0,0 +1,92 @@
+"""Synthetic tree with duplicates for benchmarks."""
+import argparse
+import json
+import os
+import random
+from pathlib import Path
+from typing import Any
+
+HEADER_SIZE = 32768
+
+
+def make_tree(
+    root: str | Path,
+    num_files: int = 1000,
+    size_mu: float = 11.0,
+    size_sigma: float = 2.0,
+    max_size: int = 64 * 1024 * 1024,
+    dup_ratio: float = 0.2,
+    shared_header_ratio: float = 0.1,
+    hardlink_ratio: float = 0.05,
+    depth: int = 3,
+    fanout: int = 4,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Create tree at root, return stats of created files.
+    Sizes lognormal (size_mu, size_sigma), dup_ratio of files are copies of
+    other files, shared_header_ratio - same size and header, other content
+    (copies, counted as dups, if source not bigger than header),
+    hardlink_ratio - hardlinks to other files. Files spread over dirs tree of
+    depth levels with fanout subdirs at every level.
+    """
+    rnd = random.Random(seed)
+    root = Path(root)
+    dirs = [root]
+    level = [root]
+    for _ in range(depth):
+        level = [parent / f"d{num}" for parent in level for num in range(fanout)]
+        dirs.extend(level)
+    for dir_path in dirs:
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+    stats = {"files": 0, "unique": 0, "dups": 0, "shared_header": 0, "hardlinks": 0, "bytes": 0}
+    created: list[tuple[Path, int]] = []
+    for num in range(num_files):
+        path = rnd.choice(dirs) / f"f{num}.bin"
+        kind = rnd.random()
+        if created and kind < dup_ratio:
+            src, size = rnd.choice(created)
+            path.write_bytes(src.read_bytes())
+            stats["dups"] += 1
+        elif created and kind < dup_ratio + shared_header_ratio:
+            src, size = rnd.choice(created)
+            data = src.read_bytes()
+            if size > HEADER_SIZE:
+                data = data[:HEADER_SIZE] + rnd.randbytes(size - HEADER_SIZE)
+                stats["shared_header"] += 1
+            else:  # whole file is header - copy
+                stats["dups"] += 1
+            path.write_bytes(data)
+        elif created and kind < dup_ratio + shared_header_ratio + hardlink_ratio:
+            src, size = rnd.choice(created)
+            os.link(src, path)
+            stats["hardlinks"] += 1
+        else:
+            size = min(max_size, int(rnd.lognormvariate(size_mu, size_sigma)))
+            path.write_bytes(rnd.randbytes(size))
+            stats["unique"] += 1
+        created.append((path, size))
+        stats["files"] += 1
+        stats["bytes"] += size
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("root")
+    parser.add_argument("--num-files", type=int, default=1000)
+    parser.add_argument("--size-mu", type=float, default=11.0)
+    parser.add_argument("--size-sigma", type=float, default=2.0)
+    parser.add_argument("--max-size", type=int, default=64 * 1024 * 1024)
+    parser.add_argument("--dup-ratio", type=float, default=0.2)
+    parser.add_argument("--shared-header-ratio", type=float, default=0.1)
+    parser.add_argument("--hardlink-ratio", type=float, default=0.05)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = vars(parser.parse_args())
+    print(json.dumps(make_tree(args.pop("root"), **args)))
+
+
+if __name__ == "__main__":
+    main()
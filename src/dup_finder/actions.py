@@ -0,0 +1,214 @@
+import errno
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from .compare import compare_files
+from .helpers import PathOrStr, bytes_human
+from .links import _tmp_name, replace_with_link
+
+ACTIONS = ("move", "delete", "hardlink", "reflink")
+
+
+class Action(NamedTuple):
+    """Action on file at index idx of file list.
+    target - destination for move, file to link to for hardlink and reflink,
+    kept copy for delete (None if kept copy is not at list).
+    target_idx - index of file to link to or kept copy.
+    size, mtime_ns - file stat at planning, file changed since is skipped.
+    target_size, target_mtime_ns - same for kept copy, action skipped if it
+    changed, as it may no longer be a copy.
+    """
+
+    kind: str
+    path: Path
+    target: Path | None
+    idx: int
+    size: int
+    mtime_ns: int
+    target_idx: int | None = None
+    target_size: int | None = None
+    target_mtime_ns: int | None = None
+
+
+class Plan:
+    """Actions to review before execution."""
+
+    def __init__(self, actions: Iterable[Action] = ()) -> None:
+        self.actions = list(actions)
+        for action in self.actions:
+            if action.kind not in ACTIONS:
+                raise ValueError(f"Unknown action: {action.kind}, expected one of {ACTIONS}")
+
+    def __repr__(self) -> str:
+        kinds: dict[str, int] = {}
+        for action in self.actions:
+            kinds[action.kind] = kinds.get(action.kind, 0) + 1
+        counts = ", ".join(f"{kind} {num}" for kind, num in kinds.items()) or "empty"
+        return f"Plan: {counts}, {bytes_human(self.size)}"
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def __iter__(self) -> Iterator[Action]:
+        return iter(self.actions)
+
+    @property
+    def size(self) -> int:
+        """Bytes of files at plan."""
+        return sum(action.size for action in self.actions)
+
+    def lines(self) -> list[str]:
+        """Actions as text lines."""
+        return [f"{action.kind} {action.path}{_target_text(action)}" for action in self.actions]
+
+    def show(self) -> None:
+        for line in self.lines():
+            print(line)
+        print(self)
+
+    def save(self, path: PathOrStr) -> None:
+        """Save plan as json lines."""
+        with open(path, "w", encoding="utf-8") as file:
+            for action in self.actions:
+                file.write(json.dumps([
+                    action.kind,
+                    os.fspath(action.path),
+                    None if action.target is None else os.fspath(action.target),
+                    action.idx,
+                    action.size,
+                    action.mtime_ns,
+                    action.target_idx,
+                    action.target_size,
+                    action.target_mtime_ns,
+                ]) + "\n")
+
+    @classmethod
+    def load(cls, path: PathOrStr) -> "Plan":
+        actions = []
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                kind, file_path, target, *rest = json.loads(line)
+                actions.append(Action(
+                    kind, Path(file_path), None if target is None else Path(target), *rest
+                ))
+        return cls(actions)
+
+
+def _target_text(action: Action) -> str:
+    if action.target is None:
+        return ""
+    if action.kind == "delete":
+        return f", kept {action.target}"
+    return f" -> {action.target}"
+
+
+class PlanResult(NamedTuple):
+    """Executed actions and failed ones with reason."""
+
+    done: list[Action]
+    failed: list[tuple[Action, str]]
+
+
+def move_file(src: Path, dst: Path) -> None:
+    """Rename src to dst, across devices copy to temp name near dst,
+    compare content with src, rename temp to dst and remove src.
+    """
+    if dst.exists():
+        raise FileExistsError(errno.EEXIST, "Destination exists", os.fspath(dst))
+    try:
+        os.rename(src, dst)
+        return
+    except OSError as exception:
+        if exception.errno != errno.EXDEV:
+            raise
+    tmp_path = _tmp_name(dst)
+    try:
+        shutil.copy2(src, tmp_path)
+        if not compare_files([src, tmp_path]):
+            raise OSError(errno.EIO, "Copy differs from source", os.fspath(src))
+        os.replace(tmp_path, dst)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    src.unlink()
+
+
+def run_action(action: Action) -> None:
+    """Execute action, raise OSError if file or kept copy changed since planning
+    or action failed.
+    """
+    stat = action.path.lstat()
+    if stat.st_size != action.size or stat.st_mtime_ns != action.mtime_ns:
+        raise OSError(errno.ESTALE, "Changed after planning", os.fspath(action.path))
+    if action.kind != "move" and action.target is not None and action.target_size is not None:
+        stat = action.target.lstat()
+        if stat.st_size != action.target_size or stat.st_mtime_ns != action.target_mtime_ns:
+            raise OSError(
+                errno.ESTALE, "Kept copy changed after planning", os.fspath(action.target)
+            )
+    if action.kind == "move":
+        assert action.target is not None
+        move_file(action.path, action.target)
+    elif action.kind == "delete":
+        action.path.unlink()
+    else:
+        assert action.target is not None
+        replace_with_link(action.target, action.path, action.kind)
+
+
+def _run_action(action: Action) -> str | None:
+    try:
+        run_action(action)
+    except OSError as exception:
+        return str(exception)
+    return None
+
+
+def make_dirs(plan: Plan) -> list[tuple[Action, str]]:
+    """Create parent dirs of move targets, every dir once.
+    Return moves which dir can't be created.
+    """
+    dirs: dict[Path, list[Action]] = {}
+    for action in plan:
+        if action.kind == "move" and action.target is not None:
+            dirs.setdefault(action.target.parent, []).append(action)
+    failed: list[tuple[Action, str]] = []
+    for dir_path in sorted(dirs):  # parents before children
+        try:
+            dir_path.mkdir(parents=True, exist_ok=True)
+        except OSError as exception:
+            failed.extend((action, str(exception)) for action in dirs[dir_path])
+    return failed
+
+
+def execute_plan(
+    plan: Plan,
+    workers: int | None = None,
+    dry_run: bool = False,
+) -> PlanResult:
+    """Execute plan: create dirs, run actions at thread pool if workers > 1.
+    Failed actions don't stop execution, returned with reason.
+    dry_run - only print plan, nothing executed.
+    """
+    if dry_run:
+        plan.show()
+        return PlanResult([], [])
+    failed = make_dirs(plan)
+    skip = {id(action) for action, _ in failed}
+    actions = [action for action in plan if id(action) not in skip]
+    if workers is not None and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            errors: Iterable[str | None] = list(pool.map(_run_action, actions))
+    else:
+        errors = map(_run_action, actions)
+    done: list[Action] = []
+    for action, error in zip(actions, errors):
+        if error is None:
+            done.append(action)
+        else:
+            failed.append((action, error))
+    return PlanResult(done, failed)
@@ -1,6 +1,325 @@
+"""Command line interface: `dup_finder <command> path ...`.
+Only argparse and json imported at start, file list machinery (and rich
+for progress bars) imported when command runs, so `--help`, `--version`
+and scripted calls start fast.
+Output - text for humans or JSON Lines (`--format jsonl`), one group per
+line, written and flushed as soon as found.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
 from .version import __version__
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .core import FileList
+
+FORMATS = ("text", "jsonl")
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+
+def parse_size(value: str) -> int:
+    """Size from string, binary units: 100, 64k, 1.5M, 2G."""
+    value = value.strip().lower().removesuffix("ib").removesuffix("b")
+    unit = value[-1:] if value[-1:] in SIZE_UNITS else ""
+    try:
+        return int(float(value[:len(value) - len(unit)]) * SIZE_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}") from None
+
+
+def _stages(value: str) -> tuple[str, ...]:
+    return tuple(stage for stage in value.split(",") if stage)
+
+
+class Output:
+    """Write records as text or json lines, flush every record,
+    so output can be piped and read while search runs.
+    """
+
+    def __init__(self, output_format: str, stream: Any = None) -> None:
+        self.format = output_format
+        self.stream = stream or sys.stdout
+
+    def write(self, record: dict[str, Any], text: str) -> None:
+        if self.format == "jsonl":
+            line = json.dumps(record, ensure_ascii=False, default=os.fspath)
+        else:
+            line = text
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+def _paths_text(size: int, paths: Sequence[Any], header: str = "") -> str:
+    from .helpers import bytes_human
+
+    lines = [f"{bytes_human(size)} {header}".rstrip(), *(f"  {path}" for path in paths)]
+    return "\n".join(lines) + "\n"
+
+
+def _add_list_args(parser: argparse.ArgumentParser) -> None:
+    """Args for FileList: scan, hashing and filter."""
+    scan = parser.add_argument_group("scan")
+    scan.add_argument("--no-recursive", dest="recursive", action="store_false",
+                      help="don't descend to subdirs")
+    scan.add_argument("--follow-symlinks", action="store_true",
+                      help="follow symlinks to files and dirs")
+    scan.add_argument("--same-device", action="store_true", help="don't cross mount points")
+    scan.add_argument("--snapshot", metavar="PATH",
+                      help="incremental scan from snapshot, snapshot updated at end")
+    filters = parser.add_argument_group("filter")
+    filters.add_argument("--min-size", type=parse_size, default=0, metavar="SIZE",
+                         help="skip smaller files, e.g. 4k, 1M")
+    filters.add_argument("--max-size", type=parse_size, metavar="SIZE",
+                         help="skip bigger files")
+    filters.add_argument("--include", action="append", default=[], metavar="GLOB",
+                         help="keep only files with names matched, repeatable")
+    filters.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                         help="skip files and dirs with names matched, repeatable")
+    filters.add_argument("--exclude-dir", action="append", default=[], metavar="GLOB",
+                         help="skip dirs with names matched, e.g. .git, repeatable")
+    filters.add_argument("--exclude-regex", action="append", default=[], metavar="REGEX",
+                         help="skip files and dirs with path matched, repeatable")
+    hashing = parser.add_argument_group("hashing")
+    hashing.add_argument("--cache", metavar="PATH", help="hash cache db, reused between runs")
+    hashing.add_argument("-w", "--workers", type=int, help="parallel workers")
+    hashing.add_argument("--executor", choices=("thread", "process"),
+                         help="executor for parallel hashing, default thread")
+    hashing.add_argument("--schedule", action="store_true",
+                         help="read by device queues, ordered by physical layout")
+    hashing.add_argument("--hash", dest="hash_name", help="full hash name")
+    hashing.add_argument("--stage-hash", dest="stage_hash_name",
+                         help="hash name for head, tail and sample")
+    output = parser.add_argument_group("output")
+    output.add_argument("-f", "--format", choices=FORMATS, default="text",
+                        help="text or json lines, one record per line")
+    output.add_argument("-q", "--quiet", action="store_true",
+                        help="no messages and progress, only results")
+    output.add_argument("--no-progress", dest="progress", action="store_false",
+                        help="no progress bars")
+
+
+def _add_search_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--stages", type=_stages, default=("head",), metavar="LIST",
+                        help="partial hashes before full, comma separated: "
+                             "head, tail, sample (default head)")
+    parser.add_argument("--method", choices=("auto", "hash", "compare"), default="auto",
+                        help="hash files or compare content of small groups")
+    parser.add_argument("--compare-max", type=int, metavar="NUM",
+                        help="max files at group to compare with auto method")
+
+
+def _file_list(args: argparse.Namespace, path: str) -> "FileList":
+    from .core import FileList
+    from .filters import ScanFilter
+    from .hashers import DEFAULT_HASH, DEFAULT_STAGE_HASH
+
+    scan_filter = None
+    if (
+        args.min_size or args.max_size is not None or args.include or args.exclude
+        or args.exclude_dir or args.exclude_regex
+    ):
+        scan_filter = ScanFilter(
+            min_size=args.min_size,
+            max_size=args.max_size,
+            include=args.include,
+            exclude=args.exclude,
+            exclude_dirs=args.exclude_dir,
+            exclude_regex=args.exclude_regex,
+        )
+    scheduler = None
+    if args.schedule:
+        from .schedule import DeviceScheduler
+
+        scheduler = DeviceScheduler(ssd_workers=args.workers)
+    return FileList(
+        path,
+        recursive=args.recursive,
+        cache=args.cache,
+        workers=args.workers,
+        executor=args.executor,
+        follow_symlinks=args.follow_symlinks,
+        same_device=args.same_device,
+        hash_name=args.hash_name or DEFAULT_HASH,
+        stage_hash_name=args.stage_hash_name or DEFAULT_STAGE_HASH,
+        snapshot=args.snapshot,
+        scan_filter=scan_filter,
+        scheduler=scheduler,
+        # messages at stdout would break json lines
+        verbose=not args.quiet and args.format == "text",
+        progress=args.progress,
+    )
+
+
+def _compare_kwargs(args: argparse.Namespace) -> dict[str, Any]:
+    if args.compare_max is None:
+        return {"method": args.method}
+    return {"method": args.method, "compare_max": args.compare_max}
+
+
+def cmd_scan(args: argparse.Namespace, output: Output) -> None:
+    from .helpers import bytes_human
+
+    file_list = _file_list(args, args.path)
+    sizes = file_list.sizes
+    record = {
+        "path": os.fspath(file_list.path),
+        "files": file_list.len,
+        "size": sum(file.size for file in file_list.file_list),
+        "max_size": sizes[0] if sizes else 0,
+        "same_size_files": sum(
+            len(idx_list) for idx_list in file_list.size2idx.values() if len(idx_list) > 1
+        ),
+    }
+    if file_list.changed_sizes is not None:
+        record["changed_sizes"] = len(file_list.changed_sizes)
+    text = (
+        f"{record['path']}: {record['files']} files, {bytes_human(record['size'])}, "
+        f"{record['same_size_files']} files with same sizes"
+    )
+    output.write(record, text)
+    if args.snapshot:
+        file_list.save_snapshot()
+
+
+def cmd_candidates(args: argparse.Namespace, output: Output) -> None:
+    file_list = _file_list(args, args.path)
+    file_list.find_dups_candidates(num=args.num, stages=args.stages)
+    for size, groups in file_list._size_head_hash_candidates.items():
+        for key, idx_list in groups.items():
+            paths = [file_list.file_list[idx].path for idx in idx_list]
+            output.write(
+                {"size": size, "key": key, "paths": paths},
+                _paths_text(size, paths, f"{len(paths)} files"),
+            )
+    if args.snapshot:
+        file_list.save_snapshot()
+
+
+def cmd_dups(args: argparse.Namespace, output: Output) -> None:
+    file_list = _file_list(args, args.path)
+    sizes = file_list.changed_sizes if args.changed else None
+    if args.changed and sizes is None:
+        raise SystemExit("--changed needs existing --snapshot")
+    for group in file_list.iter_dups(args.stages, sizes=sizes, **_compare_kwargs(args)):
+        output.write(
+            group._asdict(),
+            _paths_text(group.size, group.paths, group.hash or group.compare_key or ""),
+        )
+    if args.snapshot:
+        file_list.save_snapshot()
+
+
+def cmd_compare_with(args: argparse.Namespace, output: Output) -> None:
+    from .core import DupGroup
+
+    file_list = _file_list(args, args.path)
+    other = _file_list(args, args.other)
+    file_list.find_dups_candidates_with(other)
+    file_list.find_dups_with(other, **_compare_kwargs(args))
+    for size in file_list.dups_sizes_other or []:
+        for hash_val, idx_list in file_list.dups_other[size].items():
+            paths = [file_list.file_list[idx].path for idx in idx_list]
+            other_paths = [
+                other.file_list[idx].path for idx in other.dups_other[size][hash_val]
+            ]
+            group = DupGroup.from_key(size, hash_val, paths, file_list.hash_names["full"])
+            output.write(
+                {**group._asdict(), "other_paths": other_paths},
+                _paths_text(size, paths, group.hash or group.compare_key or "")
+                + "\n".join(f"  = {path}" for path in other_paths) + "\n",
+            )
+
+
+def cmd_move(args: argparse.Namespace, output: Output) -> None:
+    file_list = _file_list(args, args.path)
+    if args.other is None:
+        file_list.find_dups_candidates(stages=args.stages)
+        file_list.find_dups(**_compare_kwargs(args))
+        plan = file_list.plan_dups("move", args.dest)
+    else:
+        other = _file_list(args, args.other)
+        file_list.find_dups_candidates_with(other)
+        file_list.find_dups_with(other, **_compare_kwargs(args))
+        plan = file_list.plan_dups_other("move", args.dest)
+    if args.dry_run:  # plan written as records, not printed by executor
+        done, failed = list(plan), []
+    else:
+        done, failed = file_list.apply_plan(plan)
+    for action in done:
+        output.write(
+            {"action": action.kind, "path": action.path, "target": action.target,
+             "size": action.size, "dry_run": args.dry_run},
+            f"{action.path} -> {action.target}",
+        )
+    for action, error in failed:
+        output.write(
+            {"action": action.kind, "path": action.path, "target": action.target,
+             "size": action.size, "error": str(error)},
+            f"failed {action.path}: {error}",
+        )
+    if args.snapshot and not args.dry_run:
+        file_list.save_snapshot()
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="dup_finder", description="Find duplicate files.")
+    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {__version__}")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    def add_command(
+        name: str, func: Callable[[argparse.Namespace, Output], None], help_text: str
+    ) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help_text, description=help_text)
+        command.set_defaults(func=func)
+        command.add_argument("path", help="dir to scan")
+        return command
+
+    scan = add_command("scan", cmd_scan, "scan dir, print summary")
+    _add_list_args(scan)
+
+    candidates = add_command("candidates", cmd_candidates,
+                             "groups of files with same size and partial hashes")
+    candidates.add_argument("-n", "--num", type=int, help="check only num biggest sizes")
+    candidates.add_argument("--stages", type=_stages, default=("head",), metavar="LIST",
+                            help="partial hashes, comma separated: head, tail, sample")
+    _add_list_args(candidates)
+
+    dups = add_command("dups", cmd_dups, "stream groups of duplicates, biggest size first")
+    _add_search_args(dups)
+    dups.add_argument("--changed", action="store_true",
+                      help="check only sizes changed since --snapshot")
+    _add_list_args(dups)
+
+    compare_with = add_command("compare-with", cmd_compare_with,
+                               "files at path with duplicates at other dir")
+    compare_with.add_argument("other", help="dir to compare with")
+    _add_search_args(compare_with)
+    _add_list_args(compare_with)
+
+    move = add_command("move", cmd_move,
+                       "move duplicates (all but one of group, or copies of files "
+                       "at --other) to dest dir")
+    move.add_argument("--dest", help="dir to move to, default - `dups` near path")
+    move.add_argument("--other", metavar="PATH",
+                      help="move files at path that have copies at other dir")
+    move.add_argument("-n", "--dry-run", action="store_true", help="show plan only")
+    _add_search_args(move)
+    _add_list_args(move)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = make_parser().parse_args(argv)
+    try:
+        args.func(args, Output(args.format))
+    except BrokenPipeError:  # output closed, e.g. piped to `head`
+        # don't fail again on flush at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        raise SystemExit(0) from None
+
 
-def dummy_func():
-    """Dummy func. Just print version."""
-    print(f"Repo temlate. Version: {__version__}")
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Protocol
+
+from .helpers import PathOrStr
+
+
+class Hashable(Protocol):
+    """Attributes used as hash cache key."""
+
+    dev: int
+    ino: int
+    size: int
+    mtime_ns: int
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    algo TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    seen INTEGER NOT NULL,
+    PRIMARY KEY (dev, ino, size, mtime_ns, algo, kind)
+) WITHOUT ROWID
+"""
+
+COMMIT_EVERY = 1000
+DEFAULT_ALGO = "md5"
+
+
+class HashCache:
+    """Persistent hash cache, stored at sqlite db.
+    Key is (st_dev, st_ino, size, mtime_ns, algo, kind), so any change of file
+    makes old entry stale - it is never returned and removed by `evict`.
+    """
+
+    def __init__(self, path: PathOrStr) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+        self._pending = 0
+        self._seen: list[tuple[int, int, int, int, str, str]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"HashCache {self.path}: hits {self.hits}, misses {self.misses}"
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def get(self, file: Hashable, kind: str, algo: str = DEFAULT_ALGO) -> str | None:
+        """Return cached hash for file or None."""
+        key = (file.dev, file.ino, file.size, file.mtime_ns, algo, kind)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash FROM hashes WHERE dev=? AND ino=? AND size=? "
+                "AND mtime_ns=? AND algo=? AND kind=?",
+                key,
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._seen.append(key)
+            if len(self._seen) >= COMMIT_EVERY:
+                self._flush_seen()
+            return row[0]
+
+    def set(
+        self,
+        file: Hashable,
+        kind: str,
+        hash_val: str,
+        algo: str = DEFAULT_ALGO,
+    ) -> None:
+        """Store hash for file."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    file.dev, file.ino, file.size, file.mtime_ns,
+                    algo, kind, hash_val, int(time.time()),
+                ),
+            )
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+
+    def _flush_seen(self) -> None:
+        """Update last seen time for hits. Lock must be held."""
+        if self._seen:
+            now = int(time.time())
+            self._conn.executemany(
+                "UPDATE hashes SET seen=? WHERE dev=? AND ino=? AND size=? "
+                "AND mtime_ns=? AND algo=? AND kind=?",
+                [(now, *key) for key in self._seen],
+            )
+            self._seen = []
+        self._conn.commit()
+        self._pending = 0
+
+    def flush(self) -> None:
+        """Write pending changes to disk."""
+        with self._lock:
+            self._flush_seen()
+
+    def evict(self, max_age: float = 30 * 24 * 3600) -> int:
+        """Remove entries not used for max_age seconds, return number of removed."""
+        with self._lock:
+            self._flush_seen()
+            cursor = self._conn.execute(
+                "DELETE FROM hashes WHERE seen < ?", (int(time.time() - max_age),)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def evict_stale(self, files: list[Hashable]) -> int:
+        """Remove entries for given files (by dev, ino) with other size or mtime."""
+        with self._lock:
+            self._flush_seen()
+            removed = 0
+            for file in files:
+                cursor = self._conn.execute(
+                    "DELETE FROM hashes WHERE dev=? AND ino=? "
+                    "AND (size!=? OR mtime_ns!=?)",
+                    (file.dev, file.ino, file.size, file.mtime_ns),
+                )
+                removed += cursor.rowcount
+            self._conn.commit()
+            return removed
+
+    def compact(self) -> None:
+        """Rebuild db file, reclaim space after eviction."""
+        with self._lock:
+            self._flush_seen()
+            self._conn.execute("VACUUM")
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_seen()
+            self._conn.close()
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,315 @@
+import os
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .cache import HashCache
+from .core import HASH_NAMES, File, FileList
+from .helpers import bytes_human
+from .parallel import HASH_ATTRS
+from .scanner import Entry, Scanner
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+# File attribute: (FileArray column, array typecode, stat attribute)
+COLUMNS = {
+    "size": ("sizes", "q", "st_size"),
+    "dev": ("devs", "Q", "st_dev"),
+    "ino": ("inos", "Q", "st_ino"),
+    "mtime_ns": ("mtimes", "q", "st_mtime_ns"),
+    "nlink": ("nlinks", "L", "st_nlink"),
+}
+
+
+class FileArray:
+    """Columnar file storage: paths as offsets at one bytes buffer,
+    size, dev, ino, mtime, nlink at typed arrays. Hashes stored only for hashed files.
+    """
+
+    sizes: array
+    devs: array
+    inos: array
+    mtimes: array
+    nlinks: array
+
+    def __init__(self, entries: Iterable[Entry] = ()) -> None:
+        self._paths = bytearray()
+        self._offsets = array("Q", [0])
+        for column, typecode, _ in COLUMNS.values():
+            setattr(self, column, array(typecode))
+        self.hashes: dict[str, dict[int, str]] = {kind: {} for kind in HASH_ATTRS}
+        self.cache: HashCache | None = None
+        self.hash_names = HASH_NAMES
+        for entry in entries:
+            self.append(entry.path, entry.stat)
+
+    def append(self, path: str, stat: os.stat_result) -> None:
+        self._paths += os.fsencode(path)
+        self._offsets.append(len(self._paths))
+        for column, _, stat_attr in COLUMNS.values():
+            getattr(self, column).append(getattr(stat, stat_attr))
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def __getitem__(self, idx: int) -> "FileView":
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return FileView(self, idx)
+
+    def __iter__(self) -> Iterator["FileView"]:
+        return (FileView(self, idx) for idx in range(len(self)))
+
+    def path(self, idx: int) -> Path:
+        path = bytes(self._paths[self._offsets[idx]:self._offsets[idx + 1]])
+        return Path(os.fsdecode(path))
+
+    def take(self, order: Iterable[int]) -> "FileArray":
+        """Return new FileArray with items at order."""
+        result = FileArray()
+        result.cache = self.cache
+        result.hash_names = self.hash_names
+        for new_idx, idx in enumerate(order):
+            result._paths += self._paths[self._offsets[idx]:self._offsets[idx + 1]]
+            result._offsets.append(len(result._paths))
+            for column, _, _ in COLUMNS.values():
+                getattr(result, column).append(getattr(self, column)[idx])
+            for kind, hashes in self.hashes.items():
+                if idx in hashes:
+                    result.hashes[kind][new_idx] = hashes[idx]
+        return result
+
+    def sort_by_size(self) -> "FileArray":
+        """Return FileArray sorted by size, descending."""
+        if np is not None:
+            sizes = np.frombuffer(self.sizes, dtype=np.int64)
+            order: Iterable[int] = np.argsort(-sizes, kind="stable").tolist()
+        else:
+            order = sorted(range(len(self)), key=self.sizes.__getitem__, reverse=True)
+        return self.take(order)
+
+    def nbytes(self) -> int:
+        """Memory used by arrays and path buffer."""
+        return len(self._paths) + sum(
+            item.itemsize * len(item)
+            for item in [self._offsets]
+            + [getattr(self, column) for column, _, _ in COLUMNS.values()]
+        )
+
+
+class FileView(File):
+    """File at FileArray. Attributes read from and hashes stored at array."""
+
+    def __init__(self, file_array: FileArray, idx: int) -> None:
+        self._array = file_array
+        self.idx = idx
+
+    @property
+    def path(self) -> Path:  # type: ignore[override]
+        return self._array.path(self.idx)
+
+    @property
+    def cache(self):  # type: ignore[override]
+        return self._array.cache
+
+    @property
+    def hash_names(self) -> dict[str, str]:  # type: ignore[override]
+        return self._array.hash_names
+
+
+def _hash_property(kind: str) -> property:
+    """Property for hash of kind, stored at FileArray."""
+
+    def get_hash(self: FileView) -> str | None:
+        return self._array.hashes[kind].get(self.idx)
+
+    def set_hash(self: FileView, hash_val: str) -> None:
+        self._array.hashes[kind][self.idx] = hash_val
+
+    return property(get_hash, set_hash)
+
+
+def _column_property(column: str) -> property:
+    """Property for stat attribute, stored at FileArray column."""
+
+    def get_value(self: FileView) -> int:
+        return getattr(self._array, column)[self.idx]
+
+    def set_value(self: FileView, value: int) -> None:
+        getattr(self._array, column)[self.idx] = value
+
+    return property(get_value, set_value)
+
+
+for _kind, _attr in HASH_ATTRS.items():
+    setattr(FileView, _attr, _hash_property(_kind))
+for _attr, (_column, _, _) in COLUMNS.items():
+    setattr(FileView, _attr, _column_property(_column))
+
+
+class SizeIndex(Mapping):
+    """Size to index range for array sorted by size, descending.
+    Files with same size are contiguous, so every size maps to range.
+    Sizes with collapsed hardlinks map to list of indexes at `reduced`.
+    """
+
+    def __init__(self, sizes: array) -> None:
+        self.reduced: dict[int, list[int]] = {}
+        self.sizes = array("q")
+        self.starts = array("Q")
+        self.counts = array("Q")
+        if np is not None and len(sizes):
+            values = np.frombuffer(sizes, dtype=np.int64)
+            # sizes sorted, so change points mark groups starts
+            starts = np.flatnonzero(np.diff(values, prepend=values[0] + 1))
+            counts = np.diff(starts, append=len(values))
+            self.sizes.frombytes(values[starts].tobytes())
+            self.starts.frombytes(starts.astype(np.uint64).tobytes())
+            self.counts.frombytes(counts.astype(np.uint64).tobytes())
+        else:
+            for idx, size in enumerate(sizes):
+                if self.sizes and self.sizes[-1] == size:
+                    self.counts[-1] += 1
+                else:
+                    self.sizes.append(size)
+                    self.starts.append(idx)
+                    self.counts.append(1)
+
+    def _pos(self, size: int) -> int:
+        pos = bisect_left(self.sizes, -size, key=lambda item: -item)
+        if pos == len(self.sizes) or self.sizes[pos] != size:
+            raise KeyError(size)
+        return pos
+
+    def __getitem__(self, size: int) -> range | list[int]:  # type: ignore[override]
+        if size in self.reduced:
+            return self.reduced[size]
+        pos = self._pos(size)
+        return range(self.starts[pos], self.starts[pos] + self.counts[pos])
+
+    def __contains__(self, size: object) -> bool:
+        try:
+            self._pos(size)  # type: ignore[arg-type]
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.sizes)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+
+class CompactFileList(FileList):
+    """FileList with columnar FileArray storage instead of list of File objects,
+    size grouping by sorted arrays instead of dict of lists.
+    Vectorized with numpy if installed.
+    """
+
+    file_list: FileArray  # type: ignore[assignment]
+    size2idx: SizeIndex  # type: ignore[assignment]
+
+    def _scan(  # type: ignore[override]
+        self,
+        recursive: bool,
+        follow_symlinks: bool,
+        same_device: bool,
+    ) -> FileArray:
+        """Scan streamed to FileArray dir by dir, so no Entry kept for all files.
+        Incremental scan (snapshot loaded) collects entries first.
+        """
+        if self.snapshot is not None:
+            return FileArray(super()._scan(recursive, follow_symlinks, same_device))
+        scanner = Scanner(
+            follow_symlinks=follow_symlinks,
+            same_device=same_device,
+            workers=self.workers,
+            scan_filter=self.scan_filter,
+        )
+        root = os.fspath(self.path)
+        self.dir_mtimes[root] = os.stat(root).st_mtime_ns
+        file_array = FileArray()
+        for dirs, files in scanner.walk(root, recursive=recursive):
+            self.dir_mtimes.update((entry.path, entry.stat.st_mtime_ns) for entry in dirs)
+            for entry in files:
+                file_array.append(entry.path, entry.stat)
+        return file_array
+
+    @staticmethod
+    def _scanned_devs(files: FileArray) -> Iterable[int]:  # type: ignore[override]
+        return files.devs
+
+    def _set_files(self, entries: FileArray | list[Entry]) -> None:  # type: ignore[override]
+        file_array = entries if isinstance(entries, FileArray) else FileArray(entries)
+        file_array.cache = self.cache
+        file_array.hash_names = self.hash_names
+        self.file_list = file_array.sort_by_size()
+
+    def _remove_files(self, idx_list: list[int]) -> None:
+        removed = set(idx_list)
+        self.file_list = self.file_list.take(
+            idx for idx in range(len(self.file_list)) if idx not in removed
+        )
+        self._set_sizes()
+
+    def _set_sizes(self) -> None:
+        sizes = self.file_list.sizes
+        if np is not None:
+            self.size_all = int(np.frombuffer(sizes, dtype=np.int64).sum())
+        else:
+            self.size_all = sum(sizes)
+        self.size2idx = SizeIndex(sizes)
+        self.sizes = self.size2idx.sizes  # type: ignore[assignment]
+        self.links = {}
+        if self.collapse_links:
+            self._collapse_links()
+
+    def _collapse_links(self) -> None:
+        """Keep first of hardlinks to same inode at size2idx, others at links."""
+        self.links = {}
+        nlinks = self.file_list.nlinks
+        devs, inos = self.file_list.devs, self.file_list.inos
+        size2idx = self.size2idx
+        for size, start, count in zip(size2idx.sizes, size2idx.starts, size2idx.counts):
+            if count < 2:
+                continue
+            group = range(start, start + count)
+            if all(nlinks[idx] == 1 for idx in group):
+                continue
+            inode2idx: dict[tuple[int, int], int] = {}
+            keep = []
+            for idx in group:
+                if nlinks[idx] > 1:
+                    first = inode2idx.setdefault((devs[idx], inos[idx]), idx)
+                    if first != idx:
+                        self.links.setdefault(first, []).append(idx)
+                        continue
+                keep.append(idx)
+            size2idx.reduced[size] = keep
+
+    def check_sizes(self) -> None:
+        reduced = self.size2idx.reduced
+        self._size_candidates = [
+            size
+            for size, count in zip(self.size2idx.sizes, self.size2idx.counts)
+            if (len(reduced[size]) if size in reduced else count) > 1
+        ]
+        if self._size_candidates:
+            self._print(f"found {len(self._size_candidates)} size candidates.")
+        else:
+            self._print("No files with same sizes.")
+
+    def __repr__(self) -> str:
+        return (
+            super().__repr__()
+            + f"mem {bytes_human(self.file_list.nbytes())}"
+        )
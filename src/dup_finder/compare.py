@@ -0,0 +1,58 @@
+from collections import defaultdict
+from contextlib import ExitStack
+from typing import Sequence
+
+from .helpers import PathOrStr
+
+COMPARE_BUF_SIZE = 1048576
+COMPARE_MAX = 3  # auto mode - compare groups up to this size, hash bigger
+COMPARE_MAX_OPEN = 64  # bigger groups - files reopened for every chunk
+
+
+def _read_at(path: PathOrStr, offset: int, size: int) -> bytes:
+    with open(path, "rb") as file:
+        file.seek(offset)
+        return file.read(size)
+
+
+def compare_files(
+    paths: Sequence[PathOrStr],
+    buf_size: int = COMPARE_BUF_SIZE,
+    max_open: int = COMPARE_MAX_OPEN,
+) -> list[list[int]]:
+    """Compare files content by reading in lockstep chunks.
+    Return groups of identical files as lists of indexes at paths, only groups
+    with more than one file. Group split as soon as content differs, files that
+    became unique are not read further.
+    Up to max_open files kept open, more files opened at offset for every chunk,
+    with chunk size lowered so memory stays at max_open * buf_size.
+    """
+    keep_open = len(paths) <= max_open
+    if not keep_open:
+        buf_size = max(4096, buf_size * max_open // len(paths))
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(path, "rb")) for path in paths] if keep_open else []
+        result: list[list[int]] = []
+        active: list[list[int]] = [list(range(len(paths)))] if len(paths) > 1 else []
+        offset = 0
+        while active:
+            next_active: list[list[int]] = []
+            for group in active:
+                chunks: dict[bytes, list[int]] = defaultdict(list)
+                for idx in group:
+                    if keep_open:
+                        chunk = files[idx].read(buf_size)
+                    else:
+                        chunk = _read_at(paths[idx], offset, buf_size)
+                    chunks[chunk].append(idx)
+                for chunk, members in chunks.items():
+                    if len(members) < 2:
+                        if keep_open:
+                            files[members[0]].close()
+                    elif chunk:
+                        next_active.append(members)
+                    else:  # end of files
+                        result.append(members)
+            active = next_active
+            offset += buf_size
+    return result
@@ -1,11 +1,37 @@
+import os
+import weakref
 from collections import OrderedDict, defaultdict
+from concurrent.futures import Executor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional
+from typing import (TYPE_CHECKING, AsyncIterator, Iterable, Iterator, NamedTuple,
+                    Optional, Sequence)
 
-from rich.progress import Progress
+from .actions import ACTIONS, Action, Plan, PlanResult, execute_plan
+from .cache import HashCache
+from .compare import COMPARE_MAX, compare_files
+from .helpers import PathOrStr, bytes_human
+from .links import LINK_MODES
+from .hashers import DEFAULT_HASH, DEFAULT_STAGE_HASH, get_hasher
+from .parallel import (HASH_ATTRS, HASH_FUNCS, READ_SIZE, ExecutorOrName,
+                       hash_files, make_executor)
+from .filters import ScanFilter
+from .scanner import Entry, Scanner
+from .schedule import DeviceScheduler
+from .snapshot import IncrementalScanner, Snapshot
+from .stats import RunStats, StageHook
 
-from .helpers import (PathOrStr, bytes_human, get_dirs_files, hash_file,
-                      hash_header)
+if TYPE_CHECKING:  # pragma: no cover
+    from rich.progress import Progress
+
+STAGES = ("head", "tail", "sample")
+METHODS = ("auto", "hash", "compare")
+COMPARE_PREFIX = "cmp-"  # key of groups found by compare at dups dicts
+ITER_WINDOW = 256  # iter_dups - files of size buckets hashed at one batch
+HASH_NAMES = {
+    "full": DEFAULT_HASH,
+    **{kind: DEFAULT_STAGE_HASH for kind in STAGES},
+}
 
 
 def count_items(dict_size_hash: dict[int, dict[str, list[int]]]) -> int:
@@ -26,26 +52,111 @@ def count_size(dict_size_hash: dict[int, dict[str, list[int]]]) -> int:
     )
 
 
+def count_dups_size(dict_size_hash: dict[int, dict[str, list[int]]]) -> int:
+    """Calculate size of dups - all items except one at every group."""
+    return sum(
+        (len(idx_list) - 1) * size
+        for size in dict_size_hash
+        for idx_list in dict_size_hash[size].values()
+    )
+
+
+class DupGroup(NamedTuple):
+    """Group of duplicates: files size, full hash and paths, hash_name - name
+    of hash function (from hashers registry).
+    Groups confirmed by content compare have no hash (None), identified
+    by compare_key ("cmp-...") instead.
+    """
+
+    size: int
+    hash: str | None
+    paths: list[Path]
+    compare_key: str | None = None
+    hash_name: str | None = None
+
+    @classmethod
+    def from_key(
+        cls,
+        size: int,
+        key: str,
+        paths: list[Path],
+        hash_name: str | None = None,
+    ) -> "DupGroup":
+        """Group from key of dups dict - full hash or compare key."""
+        if key.startswith(COMPARE_PREFIX):
+            return cls(size, None, paths, key)
+        return cls(size, key, paths, hash_name=hash_name)
+
+
 class File:
 
     _hash: str | None = None
     _head_hash: str | None = None
+    _tail_hash: str | None = None
+    _sample_hash: str | None = None
+    cache: HashCache | None = None
+    hash_names: dict[str, str] = HASH_NAMES
 
-    def __init__(self, path: PathOrStr) -> None:
+    def __init__(
+        self,
+        path: PathOrStr,
+        cache: HashCache | None = None,
+        stat: os.stat_result | None = None,
+        hash_names: dict[str, str] | None = None,
+    ) -> None:
         self.path = Path(path)
-        self.size = self.path.stat().st_size
+        self.set_stat(stat or self.path.stat())
+        if cache is not None:
+            self.cache = cache
+        if hash_names is not None:
+            self.hash_names = hash_names
+
+    def set_stat(self, stat: os.stat_result) -> None:
+        self.size = stat.st_size
+        self.dev = stat.st_dev
+        self.ino = stat.st_ino
+        self.mtime_ns = stat.st_mtime_ns
+        self.nlink = stat.st_nlink
+
+    def cached_hash(self, kind: str) -> str | None:
+        """Return hash of kind ("full", "head", "tail" or "sample") if known or cached."""
+        attr = HASH_ATTRS[kind]
+        hash_val = getattr(self, attr)
+        if hash_val is None and self.cache is not None:
+            hash_val = self.cache.get(self, kind, self.hash_names[kind])
+            if hash_val is not None:
+                setattr(self, attr, hash_val)
+        return hash_val
+
+    def set_hash(self, kind: str, hash_val: str) -> None:
+        """Set hash of kind, store it to cache."""
+        setattr(self, HASH_ATTRS[kind], hash_val)
+        if self.cache is not None:
+            self.cache.set(self, kind, hash_val, self.hash_names[kind])
+
+    def get_hash(self, kind: str) -> str:
+        """Return hash of kind, calculate if needed."""
+        hash_val = self.cached_hash(kind)
+        if hash_val is None:
+            hash_val = HASH_FUNCS[kind](self.path, self.hash_names[kind])
+            self.set_hash(kind, hash_val)
+        return hash_val
 
     @property
     def hash(self) -> str:
-        if self._hash is None:
-            self._hash = hash_file(self.path)
-        return self._hash
+        return self.get_hash("full")
 
     @property
     def head_hash(self) -> str:
-        if self._head_hash is None:
-            self._head_hash = hash_header(self.path)
-        return self._head_hash
+        return self.get_hash("head")
+
+    @property
+    def tail_hash(self) -> str:
+        return self.get_hash("tail")
+
+    @property
+    def sample_hash(self) -> str:
+        return self.get_hash("sample")
 
     def __repr__(self) -> str:
         return f"{self.path} size: {bytes_human(self.size)}"
@@ -58,6 +169,7 @@ class FileList:
     _size_head_hash_candidates: dict[int, dict[str, list[int]]]
     _dups: dict[int, dict[str, list[int]]]
     _dups_sizes: list[int]
+    stats: RunStats
     size_candidates_other: dict[int, list[int]]
     size_head_hash_candidates_other: dict[int, dict[str, list[int]]]  # = {}
     dups_other: dict[int, dict[str, list[int]]]
@@ -68,28 +180,221 @@ class FileList:
         self,
         path: PathOrStr,
         recursive: bool = True,
+        cache: HashCache | PathOrStr | None = None,
+        workers: int | None = None,
+        executor: ExecutorOrName = None,
+        follow_symlinks: bool = False,
+        same_device: bool = False,
+        hash_name: str = DEFAULT_HASH,
+        stage_hash_name: str = DEFAULT_STAGE_HASH,
+        collapse_links: bool = True,
+        snapshot: PathOrStr | None = None,
+        verify_files: bool = False,
+        scan_filter: ScanFilter | None = None,
+        scheduler: DeviceScheduler | None = None,
+        verbose: bool = True,
+        progress: bool = True,
+        hooks: Iterable[StageHook] = (),
     ) -> None:
+        """File list for path.
+        cache - HashCache or path to cache db, hashes stored and reused between runs.
+        workers, executor - parallel hashing: number of workers and
+        "thread" (default if workers > 1), "process" or Executor instance.
+        Pool created once, on first parallel hashing, used by all stages,
+        shut down by `close` (or with list).
+        Dirs listed at thread pool if workers > 1.
+        follow_symlinks - follow symlinks to files and dirs, skipped by default.
+        same_device - don't cross mount points.
+        hash_name - hash for full hash, stage_hash_name - for head, tail and sample,
+        names from hashers registry.
+        collapse_links - hardlinks to same inode hashed once and not reported as dups,
+        other links to inode kept at `links`.
+        snapshot - path to snapshot saved by `save_snapshot`. If exists, only dirs
+        changed since snapshot are listed, hashes of unchanged files restored,
+        sizes of added, removed and changed files collected at `changed_sizes`.
+        verify_files - stat files at unchanged dirs, to find files changed in place.
+        scan_filter - size, name, path and age filter applied while scanning,
+        excluded dirs not listed, excluded files not kept. Snapshot should be
+        used with same filter.
+        scheduler - hash by device queues, ordered by physical layout, with
+        per device limits, instead of workers and executor.
+        verbose - print messages, progress - show progress bars (only if verbose).
+        hooks - called with StageStats at end of every stage, stats of stages
+        (time, files, bytes, cache hits, devices) collected at `stats`.
+        """
+        self.verbose = verbose
+        self.progress = progress
+        self.stats = RunStats(hooks)
+        self.collapse_links = collapse_links
+        get_hasher(hash_name)
+        get_hasher(stage_hash_name)
+        self.hash_names = {
+            "full": hash_name,
+            **{kind: stage_hash_name for kind in STAGES},
+        }
         self.path = Path(path)
-        _, files = get_dirs_files(path, recursive=recursive)
-        self.file_list: list[File] = sorted(
-            [File(item) for item in files],
+        self.workers = workers
+        self.executor = executor
+        self.scheduler = scheduler
+        self._pool: Executor | None = None
+        if cache is not None and not isinstance(cache, HashCache):
+            cache = HashCache(cache)
+        self.cache = cache
+        self.snapshot_path = snapshot
+        self.snapshot: Snapshot | None = None
+        if snapshot is not None and Path(snapshot).exists():
+            self.snapshot = Snapshot.load(snapshot)
+        self.verify_files = verify_files
+        self.scan_filter = scan_filter
+        self.dir_mtimes: dict[str, int] = {}
+        self.changed_sizes: set[int] | None = None if self.snapshot is None else set()
+        # empty until found, so methods called in any order see no results
+        self._size_head_hash_candidates = {}
+        self._dups = {}
+        self._dups_sizes = []
+        self.size_head_hash_candidates_other = {}
+        self.dups_other = {}
+        with self.stats.stage("scan") as stats:
+            files = self._scan(recursive, follow_symlinks, same_device)
+            for dev in self._scanned_devs(files):  # files listed, nothing read
+                stats.add(dev, 0)
+        with self.stats.stage("group") as stats:
+            self._set_files(files)
+            if self.snapshot is not None:
+                self._restore_hashes(self.snapshot)
+            self._set_sizes()
+            stats.files += len(self.file_list)
+        self._print(self.__repr__())
+
+    def _print(self, *args: object) -> None:
+        if self.verbose:
+            print(*args)
+
+    def _progress(self) -> "Progress | nullcontext":
+        """Progress bars, or nullcontext (None) if quiet or progress off.
+        rich imported on first use, so quiet runs don't load it.
+        """
+        if self.verbose and self.progress:
+            from rich.progress import Progress
+
+            return Progress(transient=True)
+        return nullcontext()
+
+    def _scan(
+        self,
+        recursive: bool,
+        follow_symlinks: bool,
+        same_device: bool,
+    ) -> list[Entry]:
+        return self._scan_root(self.path, recursive, follow_symlinks, same_device)
+
+    @staticmethod
+    def _scanned_devs(files: list[Entry]) -> Iterable[int]:
+        return (entry.stat.st_dev for entry in files)
+
+    def _scan_root(
+        self,
+        root: PathOrStr,
+        recursive: bool,
+        follow_symlinks: bool,
+        same_device: bool,
+    ) -> list[Entry]:
+        """Scan root, incremental if snapshot loaded, keep dirs mtimes."""
+        kwargs = dict(
+            follow_symlinks=follow_symlinks,
+            same_device=same_device,
+            workers=self.workers,
+            scan_filter=self.scan_filter,
+        )
+        if self.snapshot is None:
+            scanner = Scanner(**kwargs)
+        else:
+            scanner = IncrementalScanner(self.snapshot, self.verify_files, **kwargs)
+        # root mtime taken before listing, so change during scan found at next one
+        self.dir_mtimes[os.fspath(root)] = os.stat(root).st_mtime_ns
+        dirs, files = scanner.scan(root, recursive=recursive)
+        self.dir_mtimes.update((entry.path, entry.stat.st_mtime_ns) for entry in dirs)
+        if isinstance(scanner, IncrementalScanner) and self.changed_sizes is not None:
+            self.changed_sizes.update(scanner.changed_sizes)
+            self._print(
+                f"{os.fspath(root)}: listed {len(scanner.listed_dirs)} "
+                f"of {len(scanner.seen_dirs)} dirs."
+            )
+        return files
+
+    def _restore_hashes(self, snapshot: Snapshot) -> None:
+        """Set hashes from snapshot for unchanged files."""
+        kinds = [
+            kind for kind, hash_name in self.hash_names.items()
+            if snapshot.hash_names.get(kind) == hash_name
+        ]
+        for file in self.file_list:
+            path = os.fspath(file.path)
+            hashes = snapshot.hashes.get(path)
+            if hashes is None:
+                continue
+            snap_stat = snapshot.file_stat(path)
+            if snap_stat is None or (file.size, file.ino, file.mtime_ns) != (
+                snap_stat.st_size, snap_stat.st_ino, snap_stat.st_mtime_ns
+            ):
+                continue
+            for kind in kinds:
+                if kind in hashes:
+                    setattr(file, HASH_ATTRS[kind], hashes[kind])
+
+    def save_snapshot(self, path: PathOrStr | None = None) -> None:
+        """Save scan and calculated hashes to snapshot file, default - to loaded one."""
+        path = path or self.snapshot_path
+        if path is None:
+            raise ValueError("No snapshot path.")
+        snapshot = Snapshot.from_file_list(self)
+        snapshot.save(path)
+        self._print(f"Saved {snapshot} to {path}")
+
+    def _set_files(self, entries: list[Entry]) -> None:
+        self.file_list = sorted(
+            [
+                File(entry.path, self.cache, entry.stat, self.hash_names)
+                for entry in entries
+            ],
             key=lambda item: item.size,
             reverse=True,
         )
+
+    def _remove_files(self, idx_list: list[int]) -> None:
+        """Remove files at idx_list, reset sizes."""
+        removed = set(idx_list)
+        self.file_list = [
+            file for idx, file in enumerate(self.file_list) if idx not in removed
+        ]
         self._set_sizes()
-        print(self.__repr__())
 
     def _set_sizes(self) -> None:
         self.size_all = sum(file.size for file in self.file_list)
         self.size2idx: dict[int, list[int]] = defaultdict(list)
+        self.links: dict[int, list[int]] = {}
+        inode2idx: dict[tuple[int, int], int] = {}
         for idx, file in enumerate(self.file_list):
+            if self.collapse_links and file.nlink > 1:
+                first = inode2idx.setdefault((file.dev, file.ino), idx)
+                if first != idx:
+                    self.links.setdefault(first, []).append(idx)
+                    continue
             self.size2idx[file.size].append(idx)
         self.sizes: list[int] = sorted(self.size2idx.keys(), reverse=True)
 
+    def _with_links(self, idx_list: list[int]) -> list[int]:
+        """Indexes with indexes of other links to same inodes."""
+        return [
+            link_idx
+            for idx in idx_list
+            for link_idx in [idx, *self.links.get(idx, [])]
+        ]
+
     def __repr__(self) -> str:
         return (
             f"{self.path.name}: {self.len} files, {bytes_human(self.size_all)}, "
-            f"max size {bytes_human(self.sizes[0])} "
+            f"max size {bytes_human(self.sizes[0] if self.sizes else 0)} "
         )
 
     def __getitem__(self, index: int) -> File:
@@ -103,6 +408,43 @@ class FileList:
         """Length of file list."""
         return len(self.file_list)
 
+    def _executor(self) -> Executor | None:
+        """Pool for hashing, created once, None for serial hashing or scheduler."""
+        if self._pool is None and self.scheduler is None:
+            self._pool = make_executor(self.workers, self.executor)
+            if self._pool is not None and self._pool is not self.executor:
+                self._pool_finalizer = weakref.finalize(self, self._pool.shutdown, False)
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down hashing pool if created by list."""
+        if self._pool is not None and self._pool is not self.executor:
+            self._pool_finalizer()
+        self._pool = None
+
+    def __enter__(self) -> "FileList":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _hash_idx(self, idx_list: list[int], kind: str) -> Iterator[int]:
+        """Hash files at idx_list, yield idx in same order when hash ready."""
+        files = hash_files(
+            (self.file_list[idx] for idx in idx_list),
+            kind,
+            workers=self.workers,
+            executor=self._executor(),
+            scheduler=self.scheduler,
+        )
+        return (idx for idx, _ in zip(idx_list, files))
+
+    def _flush_cache(self) -> None:
+        """Write cache to disk, print cache stats."""
+        if self.cache is not None:
+            self.cache.flush()
+            self._print(self.cache)
+
     def show_size(self, size: int) -> None:
         """print files with given size."""
         if size in self.size2idx:
@@ -116,81 +458,191 @@ class FileList:
             size for size in self.sizes if len(self.size2idx[size]) > 1
         ]
         if self._size_candidates:
-            print(f"found {len(self._size_candidates)} size candidates.")
+            self._print(f"found {len(self._size_candidates)} size candidates.")
         else:
-            print("No files with same sizes.")
+            self._print("No files with same sizes.")
 
-    def find_dups_candidates(
+    def _split_groups(
         self,
-        num: int | None = None,
-        min_size: int = 1048576,
-    ):
-        """Find dups candidates limited by num or min size."""
-        self.check_sizes()
-        num = num or len(self._size_candidates)
-        # if self._size_candidates[-1] < min_size:
-        #     sizes_to_check = [
-        #         size
-        #         for size in self._size_candidates[:num]
-        #         if size >= min_size
-        #     ]
-        # else:
-        #     sizes_to_check = self._size_candidates[:num]
-        sizes_to_check = self._size_candidates[:num]
-        self._size_head_hash_candidates = OrderedDict()
-        num_files = sum(len(self.size2idx[size]) for size in sizes_to_check)
-        with Progress(transient=True) as progress:
-            task = progress.add_task("Files:", total=num_files)
-            for size in sizes_to_check:
+        groups: dict[int, dict[str, list[int]]],
+        kind: str,
+        done: Sequence[str],
+        progress: "Progress | None" = None,
+        min_len: int = 2,
+    ) -> dict[int, dict[str, list[int]]]:
+        """Split groups by hash of kind, drop groups shorter than min_len.
+        Sizes already read in full by done stages are kept unchanged.
+        """
+        to_split = {
+            size for size in groups
+            if not any(READ_SIZE[prev](size) >= size for prev in done)
+        }
+        idx_list = [
+            idx
+            for size, size_groups in groups.items() if size in to_split
+            for group in size_groups.values()
+            for idx in group
+        ]
+        if progress is not None:
+            task = progress.add_task(f"{kind}:", total=len(idx_list))
+        result: dict[int, dict[str, list[int]]] = OrderedDict()
+        with self.stats.stage(kind, self.cache) as stats:
+            stats.add_many((self.file_list[idx] for idx in idx_list), READ_SIZE[kind])
+            hashed = self._hash_idx(idx_list, kind)
+            for size, size_groups in groups.items():
+                if size not in to_split:
+                    result[size] = size_groups
+                    continue
                 hashes: dict[str, list[int]] = defaultdict(list)
-                for idx in self.size2idx[size]:
-                    hashes[self.file_list[idx].head_hash].append(idx)
-                    progress.advance(task)
+                for key, group in size_groups.items():
+                    # zip stops at end of group, rest of hashed left for next groups
+                    for idx, _ in zip(group, hashed):
+                        hash_val = self.file_list[idx].get_hash(kind)
+                        hashes[f"{key}-{hash_val}" if key else hash_val].append(idx)
+                    if progress is not None:
+                        progress.advance(task, advance=len(group))
+                for group in hashes.values():
+                    if len(group) < min_len:
+                        stats.dropped += len(group)
+                        stats.saved += len(group) * size
                 hashes = {
-                    hash_val: idx_list
-                    for hash_val, idx_list in hashes.items()
-                    if len(idx_list) > 1
+                    hash_val: group
+                    for hash_val, group in hashes.items()
+                    if len(group) >= min_len
                 }
                 if hashes:
-                    self._size_head_hash_candidates[size] = hashes
+                    result[size] = hashes
+        return result
+
+    def find_dups_candidates(
+        self,
+        num: int | None = None,
+        min_size: int = 0,
+        stages: Sequence[str] = ("head",),
+        max_size: int | None = None,
+    ):
+        """Find dups candidates limited by num (biggest sizes) and size bounds, inclusive.
+        stages - hashes to split groups by, in order, any of "head", "tail", "sample".
+        Every stage drops unique files, so next stages and full hash read less.
+        """
+        for kind in stages:
+            if kind not in STAGES:
+                raise ValueError(f"Unknown stage: {kind}, expected one of {STAGES}")
+        self.check_sizes()
+        sizes_to_check = [
+            size
+            for size in self._size_candidates
+            if size >= min_size and (max_size is None or size <= max_size)
+        ]
+        sizes_to_check = sizes_to_check[:num or len(sizes_to_check)]
+        groups: dict[int, dict[str, list[int]]] = OrderedDict(
+            (size, {"": list(self.size2idx[size])}) for size in sizes_to_check
+        )
+        with self._progress() as progress:
+            for num_stage, kind in enumerate(stages):
+                groups = self._split_groups(groups, kind, stages[:num_stage], progress)
+        self._size_head_hash_candidates = groups
+        self._flush_cache()
+        for kind in stages:
+            stats = self.stats[kind]
+            self._print(
+                f"{stats}, dropped {stats.dropped} files, saved {bytes_human(stats.saved)}"
+            )
         len_candid = count_items(self._size_head_hash_candidates)
         if len_candid:
             size_candid = count_size(self._size_head_hash_candidates)
-            print(
+            self._print(
                 f"Found {len_candid} candidates. "
                 f"Potential {bytes_human(size_candid)} dups."
             )
         else:
-            print("No candidates.")
+            self._print("No candidates.")
+
+    def _use_compare(self, files: list[File], method: str, compare_max: int) -> bool:
+        """Compare group content or hash it.
+        Auto - compare small groups, if not all hashes already known.
+        With cache - hash, compare stores no hash, so every run would read
+        group again.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method}, expected one of {METHODS}")
+        if method == "auto":
+            return self.cache is None and len(files) <= compare_max and any(
+                file.cached_hash("full") is None for file in files
+            )
+        return method == "compare"
 
     def find_dups(
         self,
         num: int | None = None,
         min_size: int = 0,
         max_size: int | None = None,
+        method: str = "auto",
+        compare_max: int = COMPARE_MAX,
     ):
+        """Find dups at candidates, limited by num (biggest sizes) and size bounds, inclusive.
+        method - "hash" - full hash, "compare" - compare files content in lockstep,
+        stop reading files as soon as they differ, "auto" - compare groups up to
+        compare_max files, hash bigger (always hash if cache set).
+        Groups found by compare have keys "cmp-...".
+        """
         if len(self._size_head_hash_candidates) == 0:
-            print("No head hash candidates to find from...")
+            self._print("No head hash candidates to find from...")
         else:
-            num = num or len(self._size_head_hash_candidates)
-            size_list = list(self._size_head_hash_candidates.keys())[:num]
-            # if min_size or max_size is not None:
-            #     max_size = max_size or size_list[0]
-            #     size_list = [size for size in size_list if size > min_size and size < max_size]
-            full_size_to_check = count_size(self._size_head_hash_candidates)
-            num_files = count_items(self._size_head_hash_candidates)
-            print(f"To hash: {bytes_human(full_size_to_check)} in {num_files} files.")
+            size_list = [
+                size
+                for size in self._size_head_hash_candidates
+                if size >= min_size and (max_size is None or size <= max_size)
+            ]
+            size_list = size_list[:num or len(size_list)]
+            candidates = {size: self._size_head_hash_candidates[size] for size in size_list}
+            full_size_to_check = count_size(candidates)
+            num_files = count_items(candidates)
+            self._print(
+                f"To hash: {bytes_human(full_size_to_check)} in {num_files} files, "
+                f"hash: {self.hash_names['full']}."
+            )
             self._dups = {}
-            with Progress(transient=True) as progress:
-                task = progress.add_task("Size", total=full_size_to_check)
-                task_num_files = progress.add_task("files:", total=num_files)
+            to_compare = {
+                (size, key)
+                for size in size_list
+                for key, idx_list in self._size_head_hash_candidates[size].items()
+                if self._use_compare(
+                    [self.file_list[idx] for idx in idx_list], method, compare_max
+                )
+            }
+            hashed = self._hash_idx(
+                [
+                    idx
+                    for size in size_list
+                    for key, idx_list in self._size_head_hash_candidates[size].items()
+                    if (size, key) not in to_compare
+                    for idx in idx_list
+                ],
+                "full",
+            )
+            with self._progress() as progress, self.stats.stage("full", self.cache) as stats:
+                if progress is not None:
+                    task = progress.add_task("Size", total=full_size_to_check)
+                    task_num_files = progress.add_task("files:", total=num_files)
                 for size in size_list:
                     hash_dict: dict[str, list[int]] = defaultdict(list)
-                    for idx_list in self._size_head_hash_candidates[size].values():
-                        for idx in idx_list:
-                            hash_dict[self.file_list[idx].hash].append(idx)
-                            progress.advance(task, advance=self.file_list[idx].size)
-                            progress.advance(task_num_files)
+                    for key, idx_list in self._size_head_hash_candidates[size].items():
+                        stats.add_many((self.file_list[idx] for idx in idx_list), READ_SIZE["full"])
+                        if (size, key) in to_compare:
+                            groups = compare_files(
+                                [self.file_list[idx].path for idx in idx_list]
+                            )
+                            for num_group, group in enumerate(groups):
+                                hash_dict[f"{COMPARE_PREFIX}{key}-{num_group}"] = [
+                                    idx_list[pos] for pos in group
+                                ]
+                        else:
+                            for idx, _ in zip(idx_list, hashed):
+                                hash_dict[self.file_list[idx].hash].append(idx)
+                        if progress is not None:
+                            progress.advance(task, advance=size * len(idx_list))
+                            progress.advance(task_num_files, advance=len(idx_list))
                     hash_dict = {
                         hash_val: idx_list
                         for hash_val, idx_list in hash_dict.items()
@@ -198,10 +650,147 @@ class FileList:
                     }
                     if hash_dict:
                         self._dups[size] = hash_dict
+            self._flush_cache()
             self._dups_sizes = list(self._dups.keys())
-            print(f"Len of dups dict: {len(self._dups)}")
-            dups_size = bytes_human(count_size(self._dups) - sum(self._dups_sizes)) 
-            print(f"size of dups {dups_size}")
+            self._print(f"Len of dups dict: {len(self._dups)}")
+            dups_size = bytes_human(count_dups_size(self._dups))
+            self._print(f"size of dups {dups_size}")
+
+    def _confirm_groups(
+        self,
+        groups: dict[int, dict[str, list[int]]],
+        method: str,
+        compare_max: int,
+    ) -> Iterator[tuple[int, dict[str, list[int]]]]:
+        """Split candidates groups by full hash or content compare, yield size and
+        dups groups for every candidates group, in order.
+        Files of all groups to hash go to pool at once, so workers are busy.
+        """
+        to_compare = {
+            (size, key)
+            for size, size_groups in groups.items()
+            for key, idx_list in size_groups.items()
+            if self._use_compare([self.file_list[idx] for idx in idx_list], method, compare_max)
+        }
+        hashed = self._hash_idx(
+            [
+                idx
+                for size, size_groups in groups.items()
+                for key, idx_list in size_groups.items()
+                if (size, key) not in to_compare
+                for idx in idx_list
+            ],
+            "full",
+        )
+        for size, size_groups in groups.items():
+            for key, idx_list in size_groups.items():
+                # stage timed per group, without time consumer holds iteration
+                with self.stats.stage("full", self.cache) as stats:
+                    stats.add_many((self.file_list[idx] for idx in idx_list), READ_SIZE["full"])
+                    if (size, key) in to_compare:
+                        compared = compare_files([self.file_list[idx].path for idx in idx_list])
+                        dups = {
+                            f"{COMPARE_PREFIX}{key}-{num_group}": [idx_list[pos] for pos in group]
+                            for num_group, group in enumerate(compared)
+                        }
+                    else:
+                        hash_dict: dict[str, list[int]] = defaultdict(list)
+                        # zip stops at end of group, rest of hashed left for next groups
+                        for idx, _ in zip(idx_list, hashed):
+                            hash_dict[self.file_list[idx].hash].append(idx)
+                        dups = {
+                            hash_val: group
+                            for hash_val, group in hash_dict.items()
+                            if len(group) > 1
+                        }
+                yield size, dups
+
+    def _size_windows(self, sizes: Iterable[int], window: int) -> Iterator[list[int]]:
+        """Sizes with more than one file, in order, batched by up to window files
+        (at least one size at batch).
+        """
+        batch: list[int] = []
+        num_files = 0
+        for size in sizes:
+            if len(self.size2idx[size]) < 2:
+                continue
+            batch.append(size)
+            num_files += len(self.size2idx[size])
+            if num_files >= window:
+                yield batch
+                batch = []
+                num_files = 0
+        if batch:
+            yield batch
+
+    def iter_dups(
+        self,
+        stages: Sequence[str] = ("head",),
+        method: str = "auto",
+        compare_max: int = COMPARE_MAX,
+        sizes: Iterable[int] | None = None,
+        window: int = ITER_WINDOW,
+    ) -> Iterator[DupGroup]:
+        """Yield groups of duplicates as soon as found, size by size from biggest.
+        Only current window of size buckets kept at memory, results not stored at `_dups`.
+        sizes - check only this sizes, e.g. `changed_sizes` after incremental scan.
+        window - files of next size buckets hashed at one batch, so parallel
+        hashing has enough files to read. Stop iteration at any moment - files
+        after current window are not read.
+        """
+        if sizes is None:
+            sizes = self.sizes
+        else:
+            sizes = sorted((size for size in sizes if size in self.size2idx), reverse=True)
+        try:
+            for batch in self._size_windows(sizes, window):
+                groups: dict[int, dict[str, list[int]]] = OrderedDict(
+                    (size, {"": list(self.size2idx[size])}) for size in batch
+                )
+                for num_stage, kind in enumerate(stages):
+                    groups = self._split_groups(groups, kind, stages[:num_stage])
+                for size, dups in self._confirm_groups(groups, method, compare_max):
+                    for key, group in dups.items():
+                        yield DupGroup.from_key(
+                            size,
+                            key,
+                            [self.file_list[idx].path for idx in group],
+                            self.hash_names["full"],
+                        )
+        finally:
+            if self.cache is not None:
+                self.cache.flush()
+
+    async def aiter_dups(
+        self,
+        stages: Sequence[str] = ("head",),
+        method: str = "auto",
+        compare_max: int = COMPARE_MAX,
+        sizes: Iterable[int] | None = None,
+        window: int = ITER_WINDOW,
+    ) -> AsyncIterator[DupGroup]:
+        """Async variant of `iter_dups`, hashing runs at worker thread,
+        next group searched only when consumer asks for it.
+        Cancelled consumer waits for current step at worker thread to finish,
+        then iteration closed.
+        """
+        import asyncio
+
+        dups = self.iter_dups(stages, method, compare_max, sizes, window)
+        step: asyncio.Future[DupGroup | None] | None = None
+        try:
+            while True:
+                # shielded - step keeps running if consumer cancelled
+                step = asyncio.ensure_future(asyncio.to_thread(next, dups, None))
+                group = await asyncio.shield(step)
+                if group is None:
+                    return
+                yield group
+        finally:
+            if step is not None and not step.done():
+                # generator can't be closed while it runs at worker thread
+                await asyncio.wait([step])
+            await asyncio.to_thread(dups.close)
 
     def _dup_list(self) -> list[list[int]]:
         """return dups id's of size at idx position"""
@@ -214,7 +803,7 @@ class FileList:
     def show_dup(self, idx: int = 0) -> list[list[File]]:
         """return dups at indexed size"""
         if not self._dups:
-            print("No duplicates list.")
+            self._print("No duplicates list.")
             return
         return list(
             [self.file_list[file_idx] for file_idx in idx_list]
@@ -224,7 +813,7 @@ class FileList:
     def show_dup_list(self, num: int | None = None) -> list[list[File]]:
         """return list of dups, if num - limited to num items"""
         if not self._dups:
-            print("No duplicates list.")
+            self._print("No duplicates list.")
             return []
         num = num or len(self._dups_sizes)
         return [
@@ -233,64 +822,171 @@ class FileList:
             for idx_list in self._dups[size].values()
         ]
 
-    def move_dups(self, dest: PathOrStr | None = None) -> None:
-        """move duplicates to dest dir."""
+    def _dest_path(self, dest: PathOrStr | None = None) -> Path:
+        """Dir to move dups to, default - "dups" near path (inside, if path is mount)."""
         if dest is not None:
-            dest_path = Path(dest) / self.path.name
+            return Path(dest) / self.path.name
+        if self.path.is_mount():
+            return self.path / "dups" / self.path.name
+        return self.path.parent / "dups" / self.path.name
+
+    def _plan(
+        self,
+        groups: Iterable[list[int]],
+        kind: str,
+        dest: PathOrStr | None = None,
+        keep_first: bool = True,
+    ) -> Plan:
+        """Plan action of kind for files of groups and other links to same inodes.
+        keep_first - file with shortest path at every group kept, others
+        linked to it for "hardlink" and "reflink". Stat of kept file stored
+        at actions, actions skipped if it changed before execution.
+        """
+        if kind not in ACTIONS:
+            raise ValueError(f"Unknown action: {kind}, expected one of {ACTIONS}")
+        dest_path = self._dest_path(dest)
+        actions = []
+        for group in groups:
+            group = sorted(group, key=lambda idx: len(str(self.file_list[idx].path)))
+            keep_idx = group[0]
+            keep = self.file_list[keep_idx]
+            # other links to same inode too, else space is not freed
+            for idx in self._with_links(group[1:] if keep_first else group):
+                file = self.file_list[idx]
+                if kind == "move":
+                    actions.append(Action(
+                        kind, file.path, dest_path / file.path.relative_to(self.path),
+                        idx, file.size, file.mtime_ns,
+                    ))
+                    continue
+                if kind == "hardlink" and file.dev != keep.dev:
+                    self._print(f"skip {file.path}: other device")
+                    continue
+                if kind == "delete" and not keep_first:  # kept copy not at this list
+                    actions.append(Action(kind, file.path, None, idx, file.size, file.mtime_ns))
+                    continue
+                actions.append(Action(
+                    kind, file.path, keep.path, idx, file.size, file.mtime_ns,
+                    keep_idx, keep.size, keep.mtime_ns,
+                ))
+        return Plan(actions)
+
+    def plan_dups(self, kind: str = "move", dest: PathOrStr | None = None) -> Plan:
+        """Plan for dups found by `find_dups`: file with shortest path at every
+        group kept, others moved to dest, deleted, or replaced by hardlinks
+        or reflinks to kept one.
+        """
+        if not self._dups:
+            self._print("No duplicates list.")
+            return Plan()
+        return self._plan(self._dup_list(), kind, dest)
+
+    def apply_plan(
+        self,
+        plan: Plan,
+        dry_run: bool = False,
+        workers: int | None = None,
+    ) -> PlanResult:
+        """Execute plan made by this list, update list in one pass.
+        Dirs for moves created once, actions run at thread pool if workers > 1
+        (default - list workers), moves across devices copied and verified.
+        dry_run - print plan only.
+        """
+        kinds = {"link" if action.kind in LINK_MODES else action.kind for action in plan}
+        stage = kinds.pop() if len(kinds) == 1 else "actions"
+        with self.stats.stage(stage) as stats:
+            result = execute_plan(plan, workers or self.workers, dry_run)
+            for action in result.done:
+                stats.add(self.file_list[action.idx].dev, action.size)
+        for action, error in result.failed:
+            self._print(f"skip {action.path}: {error}")
+        if not result.done:
+            return result
+        linked = [action for action in result.done if action.kind in LINK_MODES]
+        for idx in {
+            idx for action in linked for idx in (action.idx, action.target_idx)
+            if idx is not None
+        }:
+            self.file_list[idx].set_stat(self.file_list[idx].path.stat())
+        removed = [action.idx for action in result.done if action.kind not in LINK_MODES]
+        if removed:
+            self._remove_files(removed)
         else:
-            if self.path.is_mount():
-                dest_path = self.path / "dups" / self.path.name
-            else:
-                dest_path = self.path.parent / "dups" / self.path.name
-        try:
-            dest_path.mkdir(exist_ok=True, parents=True)
-        except Exception as exception:
-            print("cant create destination dir, exception:")
-            print(exception)
-            return
-        print(f"Dest dir: {dest_path}")
-        dups_list = self._dup_list()
-        removed_idx: list[int] = []
-        for pair in dups_list:
-            pair.sort(key=lambda idx: len(str(self.file_list[idx].path)))  # sort by path length
-            pair.pop(0)  # leave shortest
-            for file_idx in pair:
-                new_name = dest_path / self.file_list[file_idx].path.relative_to(self.path)
-                new_name.parent.mkdir(exist_ok=True, parents=True)
-                self.file_list[file_idx].path.rename(new_name)
-                removed_idx.append(file_idx)
-        removed_idx.sort(reverse=True)
-        # pop items from biggest index
-        for idx in removed_idx:
-            self.file_list.pop(idx)
-        self._set_sizes()
+            self._set_sizes()
         self._dups = {}
         self._size_head_hash_candidates = {}
+        return result
+
+    def move_dups(
+        self,
+        dest: PathOrStr | None = None,
+        dry_run: bool = False,
+        workers: int | None = None,
+    ) -> PlanResult:
+        """move duplicates to dest dir."""
+        plan = self.plan_dups("move", dest)
+        self._print(f"Dest dir: {self._dest_path(dest)}")
+        return self.apply_plan(plan, dry_run, workers)
+
+    def link_dups(
+        self,
+        mode: str = "hardlink",
+        dry_run: bool = False,
+        workers: int | None = None,
+    ) -> PlanResult:
+        """Replace duplicates with hardlinks or reflinks (copy-on-write clones)
+        to file with shortest path. Files changed after hashing are skipped.
+        """
+        if mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {mode}, expected one of {LINK_MODES}")
+        plan = self.plan_dups(mode)
+        # space freed only when all links to inode replaced
+        inodes = {
+            (self.file_list[action.idx].dev, self.file_list[action.idx].ino): action.size
+            for action in plan
+        }
+        result = self.apply_plan(plan, dry_run, workers)
+        for action, _ in result.failed:
+            inodes.pop((self.file_list[action.idx].dev, self.file_list[action.idx].ino), None)
+        if not dry_run:
+            self._print(
+                f"Linked {len(result.done)} files, {bytes_human(sum(inodes.values()))}"
+            )
+        return result
 
     def check_sizes_with(self, other: "FileList") -> None:
         """find files with same sizes at both dirs."""
         self._common_sizes = list(set(self.sizes).intersection(other.sizes))
         if self._common_sizes:
-            print(
+            self._print(
                 f"{len(self._common_sizes)} intersections, "
                 f"max size {bytes_human(next(iter(self._common_sizes)))}"
             )
         else:
-            print("No intersections.")
+            self._print("No intersections.")
+
+    def _check_hash_names(self, other: "FileList") -> None:
+        """Hashes from different hash functions can't be compared."""
+        if self.hash_names != other.hash_names:
+            raise ValueError(
+                f"Different hashes: {self.path.name}: {self.hash_names}, "
+                f"{other.path.name}: {other.hash_names}"
+            )
 
     def find_dups_candidates_with(self, other: "FileList") -> None:
         """Check header hash for candidates"""
+        self._check_hash_names(other)
         # check if same path, other is part of self
         if self.path.is_relative_to(other.path):
-            print(f"{self.path.name} is relative with {other.path.name}")
+            self._print(f"{self.path.name} is relative with {other.path.name}")
             return
         if other.path.is_relative_to(self.path):
-            print(f"{self.path.name} is relative with {other.path.name}")
+            self._print(f"{self.path.name} is relative with {other.path.name}")
             return
         if not self._common_sizes:
             self.check_sizes_with(other)
         if not self._common_sizes:
-            print("No files with same sizes in both dirs.")
+            self._print("No files with same sizes in both dirs.")
             return
         self.size_head_hash_candidates_other = OrderedDict()
         other.size_head_hash_candidates_other = OrderedDict()
@@ -302,18 +998,31 @@ class FileList:
             len(other.size2idx[size])
             for size in self._common_sizes
         )
-        with Progress(transient=True) as progress:
-            task_self = progress.add_task("self:", total=num_files_self)
-            task_out = progress.add_task("other:", total=num_files_other)
+        hashed = self._hash_idx(
+            [idx for size in self._common_sizes for idx in self.size2idx[size]], "head"
+        )
+        hashed_other = other._hash_idx(
+            [idx for size in self._common_sizes for idx in other.size2idx[size]], "head"
+        )
+        with self._progress() as progress, self.stats.stage("head", self.cache) as stats:
+            if progress is not None:
+                task_self = progress.add_task("self:", total=num_files_self)
+                task_out = progress.add_task("other:", total=num_files_other)
             for size in self._common_sizes:
                 head_hash: dict[str, list[int]] = defaultdict(list)
                 head_hash_out: dict[str, list[int]] = defaultdict(list)
-                for idx in self.size2idx[size]:
+                for idx, _ in zip(self.size2idx[size], hashed):
                     head_hash[self.file_list[idx].head_hash].append(idx)
-                    progress.advance(task_self)
-                for idx in other.size2idx[size]:
+                for idx, _ in zip(other.size2idx[size], hashed_other):
                     head_hash_out[other.file_list[idx].head_hash].append(idx)
-                    progress.advance(task_out)
+                stats.add_many(
+                    [self.file_list[idx] for idx in self.size2idx[size]]
+                    + [other.file_list[idx] for idx in other.size2idx[size]],
+                    READ_SIZE["head"],
+                )
+                if progress is not None:
+                    progress.advance(task_self, advance=len(self.size2idx[size]))
+                    progress.advance(task_out, advance=len(other.size2idx[size]))
                 hash_intersection = set(head_hash).intersection(head_hash_out)
                 if hash_intersection:
                     self.size_head_hash_candidates_other[size] = {
@@ -322,21 +1031,35 @@ class FileList:
                     other.size_head_hash_candidates_other[size] = {
                         hash_val: head_hash_out[hash_val] for hash_val in hash_intersection
                     }
+        self._flush_cache()
+        other._flush_cache()
         if self.size_head_hash_candidates_other:
             num_inters = count_items(self.size_head_hash_candidates_other)
             size_inters = count_size(self.size_head_hash_candidates_other)
             num_inters_out = count_items(other.size_head_hash_candidates_other)
             size_inters_out = count_size(other.size_head_hash_candidates_other)
-            print(f"intersect: {len(self.size_head_hash_candidates_other)}")
-            print(f"{self.path.name}: {num_inters} files, {bytes_human(size_inters)}")
-            print(f"{other.path.name}: {num_inters_out} files, {bytes_human(size_inters_out)}")
+            self._print(f"intersect: {len(self.size_head_hash_candidates_other)}")
+            self._print(f"{self.path.name}: {num_inters} files, {bytes_human(size_inters)}")
+            self._print(
+                f"{other.path.name}: {num_inters_out} files, {bytes_human(size_inters_out)}"
+            )
         else:
-            print("No intersection.")
+            self._print("No intersection.")
 
-    def find_dups_with(self, other: "FileList", num: Optional[int] = None):
-        """Check for duplicates"""
+    def find_dups_with(
+        self,
+        other: "FileList",
+        num: Optional[int] = None,
+        method: str = "auto",
+        compare_max: int = COMPARE_MAX,
+    ):
+        """Check for duplicates.
+        method - "hash", "compare" or "auto", same as at `find_dups`,
+        compare_max - limit for files at both lists.
+        """
+        self._check_hash_names(other)
         if not self.size_head_hash_candidates_other:
-            print("No candidates for find...")
+            self._print("No candidates for find...")
         else:
             num = num or len(self.size_head_hash_candidates_other)
             size_list = list(self.size_head_hash_candidates_other)[:num]
@@ -346,30 +1069,85 @@ class FileList:
             files_size_other = count_size(other_dict)
             num_files_self = count_items(self_dict)
             num_files_other = count_items(other_dict)
-            print(
+            self._print(
                 f"To hash:\n"
                 f"{self.path.name}: {bytes_human(files_size_self)}, {num_files_self} files\n"
                 f"{other.path.name}: {bytes_human(files_size_other)}, {num_files_other} files"
             )
             self.dups_other = {}
             other.dups_other = {}
-            with Progress(transient=True) as progress:
-                task_self_files = progress.add_task("self files", total=num_files_self)
-                task_self_size = progress.add_task("self size", total=files_size_self)
-                task_other_files = progress.add_task("other files", total=num_files_other)
-                task_other_size = progress.add_task("other size", total=files_size_other)
+            to_compare = {
+                (size, hash_val)
+                for size in size_list
+                for hash_val in self_dict[size]
+                if self._use_compare(
+                    [self.file_list[idx] for idx in self_dict[size][hash_val]]
+                    + [other.file_list[idx] for idx in other_dict[size][hash_val]],
+                    method,
+                    compare_max,
+                )
+            }
+            hashed = self._hash_idx(
+                [
+                    idx
+                    for size in size_list
+                    for hash_val, idx_list in self_dict[size].items()
+                    if (size, hash_val) not in to_compare
+                    for idx in idx_list
+                ],
+                "full",
+            )
+            hashed_other = other._hash_idx(
+                [
+                    idx
+                    for size in size_list
+                    for hash_val in self_dict[size]
+                    if (size, hash_val) not in to_compare
+                    for idx in other_dict[size][hash_val]
+                ],
+                "full",
+            )
+            with self._progress() as progress, self.stats.stage("full", self.cache) as stats:
+                if progress is not None:
+                    task_self_files = progress.add_task("self files", total=num_files_self)
+                    task_self_size = progress.add_task("self size", total=files_size_self)
+                    task_other_files = progress.add_task("other files", total=num_files_other)
+                    task_other_size = progress.add_task("other size", total=files_size_other)
                 for size in size_list:
                     hash_dict: dict[str, list[int]] = defaultdict(list)
                     hash_dict_other: dict[str, list[int]] = defaultdict(list)
                     for hash_val in self_dict[size]:
-                        for idx in self_dict[size][hash_val]:
-                            hash_dict[self.file_list[idx].hash].append(idx)
-                            progress.advance(task_self_files)
-                            progress.advance(task_self_size, advance=self.file_list[idx].size)
-                        for idx in other_dict[size][hash_val]:
-                            hash_dict_other[other.file_list[idx].hash].append(idx)
-                            progress.advance(task_other_files)
-                            progress.advance(task_other_size, advance=other.file_list[idx].size)
+                        idx_self = self_dict[size][hash_val]
+                        idx_other = other_dict[size][hash_val]
+                        if (size, hash_val) in to_compare:
+                            groups = compare_files(
+                                [self.file_list[idx].path for idx in idx_self]
+                                + [other.file_list[idx].path for idx in idx_other]
+                            )
+                            for num_group, group in enumerate(groups):
+                                key = f"{COMPARE_PREFIX}{hash_val}-{num_group}"
+                                for pos in group:
+                                    if pos < len(idx_self):
+                                        hash_dict[key].append(idx_self[pos])
+                                    else:
+                                        hash_dict_other[key].append(
+                                            idx_other[pos - len(idx_self)]
+                                        )
+                        else:
+                            for idx, _ in zip(idx_self, hashed):
+                                hash_dict[self.file_list[idx].hash].append(idx)
+                            for idx, _ in zip(idx_other, hashed_other):
+                                hash_dict_other[other.file_list[idx].hash].append(idx)
+                        stats.add_many(
+                            [self.file_list[idx] for idx in idx_self]
+                            + [other.file_list[idx] for idx in idx_other],
+                            READ_SIZE["full"],
+                        )
+                        if progress is not None:
+                            progress.advance(task_self_files, advance=len(idx_self))
+                            progress.advance(task_self_size, advance=size * len(idx_self))
+                            progress.advance(task_other_files, advance=len(idx_other))
+                            progress.advance(task_other_size, advance=size * len(idx_other))
                     intersection = set(hash_dict.keys()).intersection(hash_dict_other)
                     if intersection:
                         self.dups_other[size] = {
@@ -380,6 +1158,8 @@ class FileList:
                             hash_val: hash_dict_other[hash_val]
                             for hash_val in intersection
                         }
+            self._flush_cache()
+            other._flush_cache()
             if self.dups_other:
                 num_pairs = sum(len(item) for item in self.dups_other.values())
                 num_files_self = count_items(self.dups_other)
@@ -388,13 +1168,13 @@ class FileList:
                 files_size_other = count_size(other.dups_other)
                 self.dups_sizes_other = list(self.dups_other.keys())
                 other.dups_sizes_other = list(other.dups_other.keys())
-                print(
+                self._print(
                     f"Got {num_pairs} duplicates pairs.\n"
                     f"{self.path.name}: {num_files_self} files {bytes_human(files_size_self)}\n"
                     f"{other.path.name}: {num_files_other} files {bytes_human(files_size_other)}"
                 )
             else:
-                print("Didn't find any duplicates.")
+                self._print("Didn't find any duplicates.")
 
     def dup_other(self, idx: int = 0) -> dict[str, list[File]]:
         return {
@@ -411,39 +1191,38 @@ class FileList:
             for size_id in range(idx)
         ]
 
-    def move_dups_other(self, dest: PathOrStr | None = None):
-        """Move duplicates to dest folder"""
+    def plan_dups_other(self, kind: str = "move", dest: PathOrStr | None = None) -> Plan:
+        """Plan for dups found by `find_dups_with`: all copies at this list
+        moved to dest or deleted, copies at other list kept.
+        """
+        if kind not in ("move", "delete"):
+            raise ValueError(f"Unknown action for dups with other: {kind}")
         if not self.dups_sizes_other:
-            print("No dups")
-            return
-        if dest is not None:
-            dest_path = Path(dest) / self.path.name
-        else:
-            if self.path.is_mount():
-                dest_path = self.path / "dups" / self.path.name
-            else:
-                dest_path = self.path.parent / "dups" / self.path.name
-        try:
-            dest_path.mkdir(exist_ok=True, parents=True)
-        except Exception as exception:
-            print("cant create destination dir, exception:")
-            print(exception)
-            return
-        print(f"Dest dir: {dest_path}")
-        removed_idx: list[int] = []
-        for size in self.dups_sizes_other:
-            for idx_list in self.dups_other[size].values():
-                for idx in idx_list:
-                    file_path = self.file_list[idx].path
-                    new_name = dest_path / file_path.relative_to(self.path)
-                    new_name.parent.mkdir(exist_ok=True, parents=True)
-                    file_path.rename(new_name)
-                    removed_idx.append(idx)
-        self.dups_sizes_other = None
-        removed_idx.sort(reverse=True)
-        # pop items from biggest index
-        for idx in removed_idx:
-            self.file_list.pop(idx)
-        self._set_sizes()
-        self.dups_other = {}
-        self.size_head_hash_candidates_other = {}
+            self._print("No dups")
+            return Plan()
+        return self._plan(
+            (
+                idx_list
+                for size in self.dups_sizes_other
+                for idx_list in self.dups_other[size].values()
+            ),
+            kind,
+            dest,
+            keep_first=False,
+        )
+
+    def move_dups_other(
+        self,
+        dest: PathOrStr | None = None,
+        dry_run: bool = False,
+        workers: int | None = None,
+    ) -> PlanResult:
+        """Move duplicates to dest folder"""
+        plan = self.plan_dups_other("move", dest)
+        self._print(f"Dest dir: {self._dest_path(dest)}")
+        result = self.apply_plan(plan, dry_run, workers)
+        if result.done:
+            self.dups_sizes_other = None
+            self.dups_other = {}
+            self.size_head_hash_candidates_other = {}
+        return result
@@ -0,0 +1,109 @@
+import fnmatch
+import os
+import re
+import time
+from typing import Iterable, Pattern
+
+
+def _compile_globs(patterns: Iterable[str]) -> Pattern[str] | None:
+    """One regex for all glob patterns, None if no patterns."""
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns))
+
+
+def _compile_regexes(patterns: Iterable[str]) -> Pattern[str] | None:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+class ScanFilter:
+    """Files and dirs to scan, applied while walking: excluded dirs are not
+    listed, excluded files are not stat'ed if excluded by name.
+    min_size, max_size - file size bounds, inclusive.
+    include - glob patterns of file names to keep, default all.
+    exclude - glob patterns of file and dir names to skip, e.g. "*.tmp".
+    exclude_dirs - glob patterns of dir names to skip, e.g. ".git", "node_modules".
+    exclude_regex - regexes searched at full path of files and dirs.
+    min_age, max_age - seconds since modification: skip files modified later
+    than min_age ago or earlier than max_age ago. Age counted from `now`
+    (default - filter creation time).
+    """
+
+    def __init__(
+        self,
+        min_size: int = 0,
+        max_size: int | None = None,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        exclude_dirs: Iterable[str] = (),
+        exclude_regex: Iterable[str] = (),
+        min_age: float | None = None,
+        max_age: float | None = None,
+        now: float | None = None,
+    ) -> None:
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_age = min_age
+        self.max_age = max_age
+        self._include = _compile_globs(include)
+        self._exclude = _compile_globs(exclude)
+        self._exclude_dirs = _compile_globs([*exclude, *exclude_dirs])
+        self._exclude_regex = _compile_regexes(exclude_regex)
+        now = time.time() if now is None else now
+        self._max_mtime_ns = None if min_age is None else int((now - min_age) * 1e9)
+        self._min_mtime_ns = None if max_age is None else int((now - max_age) * 1e9)
+
+    def __repr__(self) -> str:
+        return (
+            f"ScanFilter: size {self.min_size}..{self.max_size}, "
+            f"age {self.min_age}..{self.max_age}"
+        )
+
+    def dir_ok(self, name: str, path: str) -> bool:
+        """Dir to be listed."""
+        if self._exclude_dirs is not None and self._exclude_dirs.match(name):
+            return False
+        return self._exclude_regex is None or not self._exclude_regex.search(path)
+
+    def name_ok(self, name: str, path: str) -> bool:
+        """File passed by name and path, checked before stat."""
+        if self._include is not None and not self._include.match(name):
+            return False
+        if self._exclude is not None and self._exclude.match(name):
+            return False
+        return self._exclude_regex is None or not self._exclude_regex.search(path)
+
+    def stat_ok(self, stat: os.stat_result) -> bool:
+        """File passed by size and mtime."""
+        size = stat.st_size
+        if size < self.min_size or (self.max_size is not None and size > self.max_size):
+            return False
+        if self._max_mtime_ns is not None and stat.st_mtime_ns > self._max_mtime_ns:
+            return False
+        return self._min_mtime_ns is None or stat.st_mtime_ns >= self._min_mtime_ns
+
+    def file_ok(self, name: str, path: str, stat: os.stat_result) -> bool:
+        return self.name_ok(name, path) and self.stat_ok(stat)
+
+    def path_ok(self, path: str, stat: os.stat_result) -> bool:
+        """File at path passed, with all parent dirs names, for already
+        scanned files, e.g. from manifest.
+        """
+        dir_path, name = os.path.split(path)
+        if not self.file_ok(name, path, stat):
+            return False
+        if self._exclude_dirs is None:
+            return True
+        return not any(
+            self._exclude_dirs.match(part) for part in dir_path.split(os.sep) if part
+        )
+
+    def dir_entry_ok(self, entry: os.DirEntry[str]) -> bool:
+        """Check os.DirEntry, dir or file, stat taken only if needed."""
+        if entry.is_dir():
+            return self.dir_ok(entry.name, entry.path)
+        return self.name_ok(entry.name, entry.path) and self.stat_ok(entry.stat())
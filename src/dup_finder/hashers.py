@@ -0,0 +1,69 @@
+import hashlib
+import zlib
+from typing import Callable, Protocol
+
+
+class HashObj(Protocol):
+    """hashlib like hash object."""
+
+    def update(self, data: bytes, /) -> None: ...
+
+    def hexdigest(self) -> str: ...
+
+
+class Crc32:
+    """Crc32 (zlib) with hashlib like interface. Fast, not for final check."""
+
+    name = "crc32"
+
+    def __init__(self, data: bytes = b"") -> None:
+        self._crc = zlib.crc32(data)
+
+    def update(self, data: bytes) -> None:
+        self._crc = zlib.crc32(data, self._crc)
+
+    def hexdigest(self) -> str:
+        return f"{self._crc:08x}"
+
+
+HASHERS: dict[str, Callable[[], HashObj]] = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "blake2b": hashlib.blake2b,
+    "crc32": Crc32,
+}
+
+try:
+    import xxhash
+
+    HASHERS["xxh3"] = xxhash.xxh3_128
+    HASHERS["xxh64"] = xxhash.xxh64
+except ImportError:  # pragma: no cover
+    pass
+
+try:
+    import blake3
+
+    HASHERS["blake3"] = blake3.blake3
+except ImportError:  # pragma: no cover
+    pass
+
+
+# fast hash for head, tail and sample stages, strong one for full hash.
+DEFAULT_STAGE_HASH = "xxh3" if "xxh3" in HASHERS else "crc32"
+DEFAULT_HASH = "blake3" if "blake3" in HASHERS else "blake2b"
+
+
+def get_hasher(name: str) -> Callable[[], HashObj]:
+    """Return hash constructor by name."""
+    try:
+        return HASHERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown hash: {name}, available: {', '.join(HASHERS)}"
+        ) from None
+
+
+def available_hashers() -> list[str]:
+    """Names of available hashes."""
+    return list(HASHERS)
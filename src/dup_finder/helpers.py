@@ -1,8 +1,13 @@
 import hashlib
+import mmap
 import os
+import threading
 
 from pathlib import Path, PosixPath
-from typing import Callable, List, Union
+from typing import Callable, List, Optional, Union
+
+from .filters import ScanFilter
+from .hashers import HashObj, get_hasher
 
 
 PathOrStr = Union[Path, str, os.DirEntry[str]]
@@ -24,22 +29,28 @@ def ld(path: Union[str, PosixPath]) -> List[str]:
     return [item.name for item in os.scandir(path) if item.is_dir()]
 
 
-def _get_dirs_files(path: PathOrStr) -> tuple[ListDirEntry, ListDirEntry]:
+def _get_dirs_files(
+    path: PathOrStr,
+    scan_filter: Optional[ScanFilter] = None,
+) -> tuple[ListDirEntry, ListDirEntry]:
     d_f: dict[bool, ListDirEntry] = {True: [], False: []}
     for dir_entry in os.scandir(path):
-        d_f[dir_entry.is_dir()].append(dir_entry)
+        if scan_filter is None or scan_filter.dir_entry_ok(dir_entry):
+            d_f[dir_entry.is_dir()].append(dir_entry)
     return d_f[True], d_f[False]
 
 
 def get_dirs_files(
     path: PathOrStr,
     recursive: bool = False,
+    scan_filter: Optional[ScanFilter] = None,
 ) -> tuple[ListDirEntry, ListDirEntry]:
-    """return list of dirs and list of files, option - recursive"""
-    dirs, files = _get_dirs_files(path)
+    """return list of dirs and list of files, option - recursive,
+    scan_filter - excluded dirs not listed, excluded files skipped"""
+    dirs, files = _get_dirs_files(path, scan_filter)
     if recursive:
         for dir_name in dirs.copy():
-            ds, fs = get_dirs_files(dir_name, recursive=True)
+            ds, fs = get_dirs_files(dir_name, recursive=True, scan_filter=scan_filter)
             dirs.extend(ds)
             files.extend(fs)
     return dirs, files
@@ -55,32 +66,166 @@ def bytes_human(size: int) -> str:
     return f"{f_size * 1024:.2f}Tb"
 
 
+HashFunc = Union[Callable[[], HashObj], str]
+
+
+def new_hash(hash_func: HashFunc) -> HashObj:
+    """Return new hash object, hash_func - constructor or name from hashers registry."""
+    if isinstance(hash_func, str):
+        return get_hasher(hash_func)()
+    return hash_func()
+
+
 BUF_SIZE = 65536
 HEADER_SIZE = 32768  # may be 16384
+TAIL_SIZE = 32768
+SAMPLE_NUM = 8
+SAMPLE_SIZE = 4096
+
+
+MAX_BUF_SIZE = 1048576
+MMAP_MIN_SIZE = 67108864
+MMAP_CHUNK = 8388608
+DROP_CACHE_CHUNK = 8388608
+
+_local = threading.local()
+
+
+def _get_buffer(size: int) -> memoryview:
+    """Return thread local buffer of size, reused between calls."""
+    buf = getattr(_local, "buf", None)
+    if buf is None or len(buf) < size:
+        buf = _local.buf = bytearray(size)
+    return memoryview(buf)[:size]
+
+
+def adapt_buf_size(file_size: int, buf_size: int = BUF_SIZE) -> int:
+    """Buffer size for file: 1/64 of file, multiple of buf_size, up to MAX_BUF_SIZE."""
+    chunks = max(1, file_size // 64 // buf_size)
+    return min(MAX_BUF_SIZE, chunks * buf_size)
+
+
+def _fadvise(fd: int, offset: int, length: int, advice_name: str) -> None:
+    """posix_fadvise if available, errors ignored - it is only a hint."""
+    advice = getattr(os, advice_name, None)
+    if advice is None:
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
 
 
 def hash_file(
     filename: PathOrStr,
-    hash_func: Callable = hashlib.md5,
+    hash_func: HashFunc = hashlib.md5,
     buf_size: int = BUF_SIZE,
+    use_mmap: bool = False,
+    drop_cache: bool = True,
 ) -> str:
-    result = hash_func()
-    with open(filename, "rb") as file:
-        while True:
-            data = file.read(buf_size)
-            if data:
-                result.update(data)
-            else:
-                return result.hexdigest()
+    """Hash file content.
+    Read by readinto to reused buffer, buffer size adapted to file size.
+    use_mmap - hash files bigger than MMAP_MIN_SIZE through mmap.
+    drop_cache - tell kernel to drop pages already hashed, so hashing big set of
+    files don't evict page cache.
+    """
+    result = new_hash(hash_func)
+    with open(filename, "rb", buffering=0) as file:
+        fd = file.fileno()
+        size = os.fstat(fd).st_size
+        _fadvise(fd, 0, 0, "POSIX_FADV_SEQUENTIAL")
+        if use_mmap and size and size >= MMAP_MIN_SIZE:  # empty file can't be mapped
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, "madvise"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mapped) as view:
+                    for offset in range(0, len(view), MMAP_CHUNK):
+                        result.update(view[offset:offset + MMAP_CHUNK])
+        else:
+            buf = _get_buffer(adapt_buf_size(size, buf_size))
+            done = dropped = 0
+            while True:
+                num = file.readinto(buf)  # type: ignore[attr-defined]
+                if not num:
+                    break
+                result.update(buf[:num])
+                done += num
+                if drop_cache and done - dropped >= DROP_CACHE_CHUNK:
+                    _fadvise(fd, dropped, done - dropped, "POSIX_FADV_DONTNEED")
+                    dropped = done
+        if drop_cache:
+            _fadvise(fd, 0, 0, "POSIX_FADV_DONTNEED")
+    return result.hexdigest()
 
 
 def hash_header(
     filename: PathOrStr,
-    hash_func: Callable = hashlib.md5,
+    hash_func: HashFunc = hashlib.md5,
     header_size: int = HEADER_SIZE,
 ) -> str:
-    result = hash_func()
+    result = new_hash(hash_func)
     with open(filename, "rb") as file:
         data = file.read(header_size)
     result.update(data)
     return result.hexdigest()
+
+
+def hash_tail(
+    filename: PathOrStr,
+    hash_func: HashFunc = hashlib.md5,
+    tail_size: int = TAIL_SIZE,
+) -> str:
+    result = new_hash(hash_func)
+    with open(filename, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        file.seek(max(0, file.tell() - tail_size))
+        data = file.read(tail_size)
+    result.update(data)
+    return result.hexdigest()
+
+
+def sample_offsets(
+    size: int,
+    num: int = SAMPLE_NUM,
+    sample_size: int = SAMPLE_SIZE,
+) -> list[int]:
+    """Offsets of num blocks evenly spaced inside file, not at start and end:
+    first block starts after start, last ends before end of file (blocks
+    may overlap at small files, same offsets given once). One block at 0
+    if file not bigger than sample_size.
+    """
+    span = size - sample_size
+    if span <= 0:
+        return [0]
+    return sorted({span * (idx + 1) // (num + 1) for idx in range(num)})
+
+
+def sample_read_size(
+    size: int,
+    num: int = SAMPLE_NUM,
+    sample_size: int = SAMPLE_SIZE,
+) -> int:
+    """Bytes of file of size read by `hash_sample`, overlapping blocks counted once."""
+    read = 0
+    end = 0
+    for offset in sample_offsets(size, num, sample_size):
+        block_end = min(offset + sample_size, size)
+        read += block_end - max(offset, end)
+        end = block_end
+    return read
+
+
+def hash_sample(
+    filename: PathOrStr,
+    hash_func: HashFunc = hashlib.md5,
+    num: int = SAMPLE_NUM,
+    sample_size: int = SAMPLE_SIZE,
+) -> str:
+    """Hash of num blocks at fixed offsets."""
+    result = new_hash(hash_func)
+    with open(filename, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        for offset in sample_offsets(size, num, sample_size):
+            file.seek(offset)
+            result.update(file.read(sample_size))
+    return result.hexdigest()
@@ -0,0 +1,267 @@
+import gzip
+import hashlib
+import json
+import math
+import os
+import struct
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Union
+
+from .helpers import HEADER_SIZE, PathOrStr, bytes_human, hash_file, hash_header, new_hash
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .core import FileList
+
+INDEX_MAGIC = b"DFIX"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sII")  # magic, version, json header length
+UNKNOWN = ""  # key for files with full hash not calculated yet
+
+PathOrBytes = Union[PathOrStr, bytes, bytearray, memoryview]
+# size -> head hash -> full hash (or UNKNOWN) -> paths
+IndexMaps = dict[int, dict[str, dict[str, list[str]]]]
+
+
+class BloomFilter:
+    """Bloom filter over bytes keys, double hashing from one blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: bytes) -> list[int]:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first, second = struct.unpack("<QQ", digest)
+        return [(first + num * second) % self.num_bits for num in range(self.num_hashes)]
+
+    def add(self, key: bytes) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @classmethod
+    def from_bytes(cls, num_bits: int, num_hashes: int, bits: bytes) -> "BloomFilter":
+        bloom = cls.__new__(cls)
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.bits = bytearray(bits)
+        return bloom
+
+
+def _size_key(size: int) -> bytes:
+    return b"s" + size.to_bytes(8, "little")
+
+
+def _head_key(size: int, head: str) -> bytes:
+    return b"h" + size.to_bytes(8, "little") + head.encode()
+
+
+class _Query(ABC):
+    """Hashes of query, calculated once, on demand."""
+
+    def __init__(self, hash_names: dict[str, str]) -> None:
+        self.hash_names = hash_names
+        self._head: str | None = None
+        self._full: str | None = None
+
+    def head(self) -> str:
+        if self._head is None:
+            self._head = self._hash("head")
+        return self._head
+
+    def full(self) -> str:
+        if self._full is None:
+            self._full = self._hash("full")
+        return self._full
+
+    @abstractmethod
+    def _hash(self, kind: str) -> str:
+        """Hash of kind ("head" or "full") of query content."""
+
+
+class _PathQuery(_Query):
+    def __init__(self, path: str, hash_names: dict[str, str]) -> None:
+        super().__init__(hash_names)
+        self.path = path
+
+    def _hash(self, kind: str) -> str:
+        if kind == "head":
+            return hash_header(self.path, hash_func=self.hash_names["head"])
+        return hash_file(self.path, hash_func=self.hash_names["full"])
+
+
+class _BytesQuery(_Query):
+    def __init__(self, data: bytes, hash_names: dict[str, str]) -> None:
+        super().__init__(hash_names)
+        self.data = data
+
+    def _hash(self, kind: str) -> str:
+        result = new_hash(self.hash_names[kind])
+        result.update(self.data[:HEADER_SIZE] if kind == "head" else self.data)
+        return result.hexdigest()
+
+
+class HashIndex:
+    """Reverse index: size -> head hash -> full hash -> paths, with Bloom filter
+    over sizes and (size, head hash) in front for fast negatives.
+    `lookup` hashes query only as far as needed: stat (or len), head hash,
+    full hash only if head matched. Full hashes of indexed files calculated
+    on first lookup that needs them, if not known when index built.
+    Saved index loaded lazily: Bloom filter at once, maps on first positive.
+    Files added after build (`add`) raise Bloom filter error rate above
+    planned if more than capacity.
+    """
+
+    def __init__(
+        self,
+        hash_names: dict[str, str],
+        maps: IndexMaps | None = None,
+        bloom: BloomFilter | None = None,
+        error_rate: float = 0.01,
+    ) -> None:
+        self.hash_names = hash_names
+        self._maps = maps
+        self._maps_source: tuple[Path, int] | None = None
+        if bloom is None:
+            maps = maps or {}
+            bloom = BloomFilter(
+                sum(1 + len(heads) for heads in maps.values()), error_rate
+            )
+            for size, heads in maps.items():
+                bloom.add(_size_key(size))
+                for head in heads:
+                    bloom.add(_head_key(size, head))
+        self.bloom = bloom
+
+    def __repr__(self) -> str:
+        if self._maps is None:
+            return f"HashIndex: not loaded, bloom {bytes_human(len(self.bloom.bits))}"
+        num_files = sum(
+            len(paths)
+            for heads in self._maps.values()
+            for fulls in heads.values()
+            for paths in fulls.values()
+        )
+        return (
+            f"HashIndex: {num_files} files, {len(self._maps)} sizes, "
+            f"bloom {bytes_human(len(self.bloom.bits))}"
+        )
+
+    @property
+    def maps(self) -> IndexMaps:
+        if self._maps is None:
+            self._maps = self._load_maps()
+        return self._maps
+
+    @classmethod
+    def from_file_list(cls, file_list: "FileList", error_rate: float = 0.01) -> "HashIndex":
+        """Index all files of file_list. Head hashes calculated (in parallel,
+        with cache, as set at file_list), full hashes taken if already known.
+        """
+        maps: IndexMaps = {}
+        files = file_list._hash_idx(list(range(len(file_list.file_list))), "head")
+        for idx in files:
+            file = file_list.file_list[idx]
+            full = file.cached_hash("full") or UNKNOWN
+            maps.setdefault(file.size, {}).setdefault(file.head_hash, {}).setdefault(
+                full, []
+            ).append(os.fspath(file.path))
+        file_list._flush_cache()
+        return cls(dict(file_list.hash_names), maps, error_rate=error_rate)
+
+    def add(self, path: PathOrStr) -> None:
+        """Add file to index, full hash calculated on first lookup."""
+        path = os.fspath(path)
+        size = os.stat(path).st_size
+        head = hash_header(path, hash_func=self.hash_names["head"])
+        self.maps.setdefault(size, {}).setdefault(head, {}).setdefault(
+            UNKNOWN, []
+        ).append(path)
+        self.bloom.add(_size_key(size))
+        self.bloom.add(_head_key(size, head))
+
+    def _query_hashes(self, query: PathOrBytes) -> tuple[int, _Query]:
+        if isinstance(query, (bytes, bytearray, memoryview)):
+            data = bytes(query)
+            return len(data), _BytesQuery(data, self.hash_names)
+        path = os.fspath(query)
+        return os.stat(path).st_size, _PathQuery(path, self.hash_names)
+
+    def lookup(self, query: PathOrBytes) -> list[Path]:
+        """Return indexed files with same content as query (path or bytes)."""
+        size, hashes = self._query_hashes(query)
+        if _size_key(size) not in self.bloom:
+            return []
+        head = hashes.head()
+        if _head_key(size, head) not in self.bloom:
+            return []
+        fulls = self.maps.get(size, {}).get(head)
+        if not fulls:
+            return []
+        if UNKNOWN in fulls:
+            self._resolve(fulls)
+        return [Path(path) for path in fulls.get(hashes.full(), [])]
+
+    def __contains__(self, query: PathOrBytes) -> bool:
+        return bool(self.lookup(query))
+
+    def _resolve(self, fulls: dict[str, list[str]]) -> None:
+        """Calculate full hashes of files added without it, drop removed files."""
+        for path in fulls.pop(UNKNOWN):
+            try:
+                full = hash_file(path, hash_func=self.hash_names["full"])
+            except OSError:
+                continue
+            fulls.setdefault(full, []).append(path)
+
+    def save(self, path: PathOrStr) -> None:
+        """Save as header, Bloom filter bits and gzipped json maps."""
+        header = json.dumps({
+            "hash_names": self.hash_names,
+            "num_bits": self.bloom.num_bits,
+            "num_hashes": self.bloom.num_hashes,
+            "bloom_len": len(self.bloom.bits),
+        }).encode()
+        maps = json.dumps(
+            {str(size): heads for size, heads in self.maps.items()}, separators=(",", ":")
+        ).encode()
+        tmp_path = Path(f"{path}.tmp")
+        with open(tmp_path, "wb") as file:
+            file.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(header)))
+            file.write(header)
+            file.write(self.bloom.bits)
+            file.write(gzip.compress(maps))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: PathOrStr, lazy: bool = True) -> "HashIndex":
+        """Load index, lazy - maps read on first lookup passed Bloom filter."""
+        with open(path, "rb") as file:
+            magic, version, header_len = INDEX_HEADER.unpack(file.read(INDEX_HEADER.size))
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError(f"Unsupported index: {magic!r} version {version}")
+            header = json.loads(file.read(header_len))
+            bloom = BloomFilter.from_bytes(
+                header["num_bits"], header["num_hashes"], file.read(header["bloom_len"])
+            )
+            offset = file.tell()
+        index = cls(header["hash_names"], None, bloom)
+        index._maps_source = (Path(path), offset)
+        if not lazy:
+            index._maps = index._load_maps()
+        return index
+
+    def _load_maps(self) -> IndexMaps:
+        if self._maps_source is None:
+            return {}
+        path, offset = self._maps_source
+        with open(path, "rb") as file:
+            file.seek(offset)
+            data = json.loads(gzip.decompress(file.read()))
+        return {int(size): heads for size, heads in data.items()}
@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+from .helpers import PathOrStr
+
+FICLONE = 0x40049409  # linux ioctl, _IOW(0x94, 9, int)
+LINK_MODES = ("hardlink", "reflink")
+
+
+def _tmp_name(path: Path) -> Path:
+    return path.with_name(f".{path.name}.dup_finder.tmp")
+
+
+def reflink(src: PathOrStr, dst: PathOrStr) -> None:
+    """Create dst as copy-on-write clone of src (FICLONE), raise OSError if not supported."""
+    import fcntl
+
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+
+
+def replace_with_link(src: PathOrStr, dst: PathOrStr, mode: str = "hardlink") -> None:
+    """Replace dst with hardlink or reflink to src.
+    Link created at temp name and renamed over dst, so dst is never lost.
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {mode}, expected one of {LINK_MODES}")
+    dst_path = Path(dst)
+    tmp_path = _tmp_name(dst_path)
+    try:
+        if mode == "hardlink":
+            os.link(src, tmp_path)
+        else:
+            reflink(src, tmp_path)
+            os.chmod(tmp_path, dst_path.stat().st_mode)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
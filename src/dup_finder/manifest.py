@@ -0,0 +1,194 @@
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+from .core import DupGroup, FileList
+from .helpers import PathOrStr
+from .scanner import Entry, scan
+from .snapshot import SnapStat, to_snap_stat
+
+MANIFEST_VERSION = 1
+
+
+def write_manifest(path: PathOrStr, entries: Iterable[Entry]) -> int:
+    """Write entries to manifest (gzipped json lines), return number of entries."""
+    num = 0
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.write(json.dumps({"version": MANIFEST_VERSION}) + "\n")
+        for entry in entries:
+            file.write(json.dumps([entry.path, *to_snap_stat(entry.stat)]) + "\n")
+            num += 1
+    return num
+
+
+def read_manifest(path: PathOrStr) -> Iterator[Entry]:
+    """Yield entries from manifest."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header = json.loads(file.readline())
+        if header.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {header.get('version')}")
+        for line in file:
+            file_path, *stat = json.loads(line)
+            yield Entry(file_path, SnapStat(*stat))  # type: ignore[arg-type]
+
+
+def scan_manifest(root: PathOrStr, path: PathOrStr, **kwargs: Any) -> int:
+    """Scan root, write size manifest to path. kwargs passed to `scan`."""
+    _, files = scan(root, **kwargs)
+    return write_manifest(path, files)
+
+
+def merge_manifests(paths: Sequence[PathOrStr], path: PathOrStr) -> int:
+    """Merge manifests to one, same paths written once."""
+    seen: set[str] = set()
+
+    def entries() -> Iterator[Entry]:
+        for manifest in paths:
+            for entry in read_manifest(manifest):
+                if entry.path not in seen:
+                    seen.add(entry.path)
+                    yield entry
+
+    return write_manifest(path, entries())
+
+
+def partition_manifest(
+    path: PathOrStr,
+    num_shards: int,
+    out_dir: PathOrStr,
+) -> list[Path]:
+    """Split manifest to shards by size ranges, balanced by bytes to hash.
+    Only sizes with more than one inode go to shards, every size to one shard.
+    """
+    inodes: dict[int, set[tuple[int, int]]] = {}
+    for entry in read_manifest(path):
+        inodes.setdefault(entry.stat.st_size, set()).add(
+            (entry.stat.st_dev, entry.stat.st_ino)
+        )
+    sizes = sorted(
+        (size for size, size_inodes in inodes.items() if len(size_inodes) > 1),
+        reverse=True,
+    )
+    weights = {size: size * len(inodes[size]) for size in sizes}
+    del inodes
+    total = sum(weights.values())
+    shard_of: dict[int, int] = {}
+    shard, done = 0, 0
+    for size in sizes:
+        shard_of[size] = shard
+        done += weights[size]
+        if shard < num_shards - 1 and done >= total * (shard + 1) / num_shards:
+            shard += 1
+    out_path = Path(out_dir)
+    out_path.mkdir(exist_ok=True, parents=True)
+    shard_paths = [out_path / f"shard_{num:04d}.jsonl.gz" for num in range(num_shards)]
+    files = [gzip.open(shard_path, "wt", encoding="utf-8") for shard_path in shard_paths]
+    try:
+        for file in files:
+            file.write(json.dumps({"version": MANIFEST_VERSION}) + "\n")
+        for entry in read_manifest(path):
+            num = shard_of.get(entry.stat.st_size)
+            if num is not None:
+                files[num].write(json.dumps([entry.path, *entry.stat]) + "\n")
+    finally:
+        for file in files:
+            file.close()
+    return shard_paths
+
+
+class ManifestFileList(FileList):
+    """FileList from manifest instead of scan."""
+
+    def _scan(
+        self,
+        recursive: bool,
+        follow_symlinks: bool,
+        same_device: bool,
+    ) -> list[Entry]:
+        if self.scan_filter is None:
+            return list(read_manifest(self.path))
+        return [
+            entry for entry in read_manifest(self.path)
+            if self.scan_filter.path_ok(entry.path, entry.stat)  # type: ignore[arg-type]
+        ]
+
+    def __repr__(self) -> str:
+        if not self.sizes:
+            return f"{self.path.name}: empty"
+        return super().__repr__()
+
+
+def hash_shard(
+    path: PathOrStr,
+    out_path: PathOrStr,
+    stages: Sequence[str] = ("head",),
+    **kwargs: Any,
+) -> int:
+    """Find dups at shard, write groups as json lines, return number of groups.
+    kwargs passed to FileList - hash names, cache, workers.
+    """
+    file_list = ManifestFileList(path, **kwargs)
+    num = 0
+    with gzip.open(out_path, "wt", encoding="utf-8") as file:
+        header = {"version": MANIFEST_VERSION, **file_list.hash_names}
+        file.write(json.dumps(header) + "\n")
+        for group in file_list.iter_dups(stages=stages, method="hash"):
+            paths = [os.fspath(group_path) for group_path in group.paths]
+            file.write(json.dumps([group.size, group.hash, paths]) + "\n")
+            num += 1
+    return num
+
+
+def normalize_groups(groups: Iterable[DupGroup]) -> list[DupGroup]:
+    """Groups in canonical order: size descending, hash; paths sorted."""
+    return sorted(
+        (group._replace(paths=sorted(group.paths)) for group in groups),
+        key=lambda group: (-group.size, group.hash or "", group.compare_key or ""),
+    )
+
+
+def merge_results(paths: Sequence[PathOrStr]) -> list[DupGroup]:
+    """Merge shards results to dups groups, check all shards used same hashes."""
+    groups: list[DupGroup] = []
+    hash_names = None
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            header = json.loads(file.readline())
+            if hash_names is None:
+                hash_names = header
+            elif header != hash_names:
+                raise ValueError(f"Shard {path} hashed by other hashes: {header}")
+            for line in file:
+                size, hash_val, group_paths = json.loads(line)
+                groups.append(
+                    DupGroup(
+                        size, hash_val, [Path(p) for p in group_paths],
+                        hash_name=header.get("full"),
+                    )
+                )
+    return normalize_groups(groups)
+
+
+def run_sharded(
+    manifest: PathOrStr,
+    num_shards: int,
+    work_dir: PathOrStr,
+    workers: int | None = None,
+    **kwargs: Any,
+) -> list[DupGroup]:
+    """Partition manifest and hash shards at local process pool, return merged groups.
+    kwargs passed to `hash_shard`.
+    """
+    shards = partition_manifest(manifest, num_shards, work_dir)
+    results = [shard.with_name(shard.name.replace("shard_", "result_")) for shard in shards]
+    workers = workers or min(num_shards, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_hash_shard, shards, results, [kwargs] * len(shards)))
+    return merge_results(results)
+
+
+def _hash_shard(path: Path, out_path: Path, kwargs: dict[str, Any]) -> int:
+    return hash_shard(path, out_path, **kwargs)
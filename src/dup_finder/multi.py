@@ -0,0 +1,115 @@
+import os
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple, Sequence
+
+from .core import DupGroup, FileList
+from .helpers import PathOrStr, bytes_human
+from .scanner import Entry
+
+
+class RootsDupGroup(NamedTuple):
+    """Group of duplicates with paths split by roots."""
+
+    size: int
+    hash: str | None
+    roots: dict[Path, list[Path]]
+    compare_key: str | None = None
+    hash_name: str | None = None
+
+
+class MultiFileList(FileList):
+    """FileList over any number of roots.
+    One size grouping for union of roots, every candidate hashed once,
+    for every dups group reported which roots contain copies.
+    Roots inside other roots are not scanned twice.
+    """
+
+    def __init__(self, paths: Sequence[PathOrStr], **kwargs: Any) -> None:
+        if not paths:
+            raise ValueError("No roots given.")
+        self.roots = list(dict.fromkeys(Path(os.path.abspath(path)) for path in paths))
+        # deepest first, so file belongs to nearest root
+        self._roots_by_depth = sorted(
+            self.roots, key=lambda root: len(root.parts), reverse=True
+        )
+        super().__init__(os.path.commonpath(self.roots), **kwargs)
+
+    def _scan(
+        self,
+        recursive: bool,
+        follow_symlinks: bool,
+        same_device: bool,
+    ) -> list[Entry]:
+        to_scan = [
+            root for root in self.roots
+            if not any(root != other and root.is_relative_to(other) for other in self.roots)
+        ]
+        files: list[Entry] = []
+        for root in to_scan:
+            files.extend(self._scan_root(root, recursive, follow_symlinks, same_device))
+        return files
+
+    def __repr__(self) -> str:
+        return (
+            f"{len(self.roots)} roots: {self.len} files, {bytes_human(self.size_all)}, "
+            f"max size {bytes_human(self.sizes[0] if self.sizes else 0)} "
+        )
+
+    def root_of(self, path: Path) -> Path:
+        """Return root for path."""
+        for root in self._roots_by_depth:
+            if path.is_relative_to(root):
+                return root
+        raise ValueError(f"{path} not in roots")
+
+    def _by_root(self, group: DupGroup) -> RootsDupGroup:
+        roots: dict[Path, list[Path]] = {}
+        for path in group.paths:
+            roots.setdefault(self.root_of(path), []).append(path)
+        return RootsDupGroup(
+            group.size, group.hash, roots, group.compare_key, group.hash_name
+        )
+
+    def dups_by_root(self, cross_only: bool = False) -> list[RootsDupGroup]:
+        """Dups found by `find_dups` split by roots.
+        cross_only - only groups with copies at more than one root.
+        """
+        if not self._dups:
+            self._print("No duplicates list.")
+            return []
+        result = []
+        for size in self._dups_sizes:
+            for hash_val, idx_list in self._dups[size].items():
+                group = self._by_root(
+                    DupGroup.from_key(
+                        size,
+                        hash_val,
+                        [self.file_list[idx].path for idx in idx_list],
+                        self.hash_names["full"],
+                    )
+                )
+                if not cross_only or len(group.roots) > 1:
+                    result.append(group)
+        return result
+
+    def iter_dups_by_root(
+        self,
+        cross_only: bool = False,
+        **kwargs: Any,
+    ) -> Iterator[RootsDupGroup]:
+        """Streaming variant of `dups_by_root`, kwargs passed to `iter_dups`."""
+        for group in self.iter_dups(**kwargs):
+            roots_group = self._by_root(group)
+            if not cross_only or len(roots_group.roots) > 1:
+                yield roots_group
+
+    def show_roots_summary(self) -> None:
+        """Print for every root number and size of files having copies at other roots."""
+        groups = self.dups_by_root(cross_only=True)
+        for root in self.roots:
+            num_files = size = 0
+            for group in groups:
+                if root in group.roots:
+                    num_files += len(group.roots[root])
+                    size += len(group.roots[root]) * group.size
+            print(f"{root}: {num_files} files, {bytes_human(size)} have copies at other roots")
@@ -0,0 +1,139 @@
+import os
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Protocol, Union
+
+from .helpers import (HEADER_SIZE, TAIL_SIZE, hash_file, hash_header, hash_sample,
+                      hash_tail, sample_read_size)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .schedule import DeviceScheduler
+
+
+HASH_FUNCS: dict[str, Callable[..., str]] = {
+    "full": hash_file,
+    "head": hash_header,
+    "tail": hash_tail,
+    "sample": hash_sample,
+}
+HASH_ATTRS: dict[str, str] = {
+    "full": "_hash",
+    "head": "_head_hash",
+    "tail": "_tail_hash",
+    "sample": "_sample_hash",
+}
+# bytes read by hash of kind for file of size
+READ_SIZE: dict[str, Callable[[int], int]] = {
+    "full": lambda size: size,
+    "head": lambda size: min(size, HEADER_SIZE),
+    "tail": lambda size: min(size, TAIL_SIZE),
+    "sample": sample_read_size,
+}
+
+ExecutorOrName = Union[Executor, str, None]
+EXECUTORS: dict[str, type[Executor]] = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+class HashItem(Protocol):
+    """File like object, hashed by `hash_files`."""
+
+    path: os.PathLike
+    hash_names: dict[str, str]
+    dev: int
+    ino: int
+
+    def cached_hash(self, kind: str) -> str | None: ...
+
+    def set_hash(self, kind: str, hash_val: str) -> None: ...
+
+    def get_hash(self, kind: str) -> str: ...
+
+
+def default_workers() -> int:
+    """Default number of workers - io bound, so more than cpu count."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def _get_hash(kind: str) -> Callable[[HashItem], str]:
+    def get_hash(file: HashItem) -> str:
+        return file.get_hash(kind)
+    return get_hash
+
+
+def make_executor(
+    workers: int | None = None,
+    executor: ExecutorOrName = None,
+) -> Executor | None:
+    """Executor for `hash_files` by name or instance and workers,
+    None for serial hashing (no executor and workers is None or 1).
+    """
+    if isinstance(executor, Executor):
+        return executor
+    if executor is None:
+        if workers is None or workers <= 1:
+            return None
+        executor = "thread"
+    return EXECUTORS[executor](max_workers=workers or default_workers())
+
+
+def hash_files(
+    files: Iterable[HashItem],
+    kind: str,
+    workers: int | None = None,
+    executor: ExecutorOrName = None,
+    scheduler: "DeviceScheduler | None" = None,
+) -> Iterator[HashItem]:
+    """Calculate hash of kind for files, yield files in same order as input.
+    executor - "thread" (default), "process" or Executor instance.
+    If no executor and workers is None or 1 - hash serially.
+    Pool created by name is shut down at end, Executor instance is
+    kept - pass it to reuse one pool for many calls.
+    scheduler - read files by device queues with per device limits,
+    workers and executor not used.
+    """
+    if scheduler is not None:
+        yield from scheduler.run(files, kind)
+        return
+    pool = make_executor(workers, executor)
+    if pool is None:
+        for file in files:
+            file.get_hash(kind)
+            yield file
+    elif pool is executor:
+        yield from _hash_with_pool(files, kind, pool)
+    else:
+        with pool:
+            yield from _hash_with_pool(files, kind, pool)
+
+
+def _hash_with_pool(
+    files: Iterable[HashItem],
+    kind: str,
+    pool: Executor,
+) -> Iterator[HashItem]:
+    if not isinstance(pool, ProcessPoolExecutor):
+        # threads share files, hash and cache done at worker.
+        files = list(files)
+        for file, _ in zip(files, pool.map(_get_hash(kind), files)):
+            yield file
+        return
+    # at process pool only paths go to workers, cache used at main process.
+    files = list(files)
+    to_hash = [file for file in files if file.cached_hash(kind) is None]
+    if not to_hash:
+        yield from files
+        return
+    chunksize = max(1, min(64, len(to_hash) // (4 * default_workers())))
+    results = pool.map(
+        partial(HASH_FUNCS[kind], hash_func=to_hash[0].hash_names[kind]),
+        [file.path for file in to_hash],
+        chunksize=chunksize,
+    )
+    to_hash_ids = {id(file) for file in to_hash}
+    for file in files:
+        if id(file) in to_hash_ids:
+            file.set_hash(kind, next(results))
+        yield file
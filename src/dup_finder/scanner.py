@@ -0,0 +1,157 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Iterator, NamedTuple
+
+from .filters import ScanFilter
+from .helpers import PathOrStr
+
+
+class Entry(NamedTuple):
+    """Scanned path with stat result, taken from os.DirEntry."""
+
+    path: str
+    stat: os.stat_result
+
+
+ListEntry = list[Entry]
+
+
+class Scanner:
+    """Walk directory tree without recursion, optionally list dirs at thread pool.
+    Every file stat'ed once - stat taken from os.DirEntry.
+    follow_symlinks - if False (default) symlinks to files and dirs are skipped,
+        if True - followed, dirs loops detected by (st_dev, st_ino).
+    same_device - don't descend to dirs at other devices (mount points).
+    scan_filter - dirs excluded by filter not listed, files not stat'ed
+        if excluded by name.
+    Dirs that can't be listed are skipped, collected at `errors`.
+    """
+
+    def __init__(
+        self,
+        follow_symlinks: bool = False,
+        same_device: bool = False,
+        workers: int | None = None,
+        scan_filter: ScanFilter | None = None,
+    ) -> None:
+        self.follow_symlinks = follow_symlinks
+        self.same_device = same_device
+        self.workers = workers
+        self.scan_filter = scan_filter
+        self.errors: list[tuple[str, OSError]] = []
+
+    def list_dir(self, path: str) -> tuple[ListEntry, ListEntry]:
+        """Return dirs and files at path (not recursive)."""
+        dirs: ListEntry = []
+        files: ListEntry = []
+        follow = self.follow_symlinks
+        scan_filter = self.scan_filter
+        try:
+            with os.scandir(path) as entries:
+                for dir_entry in entries:
+                    try:
+                        if not follow and dir_entry.is_symlink():
+                            continue
+                        if dir_entry.is_dir(follow_symlinks=follow):
+                            if scan_filter is not None and not scan_filter.dir_ok(
+                                dir_entry.name, dir_entry.path
+                            ):
+                                continue
+                            dirs.append(
+                                Entry(dir_entry.path, dir_entry.stat(follow_symlinks=follow))
+                            )
+                        elif dir_entry.is_file(follow_symlinks=follow):
+                            if scan_filter is None:
+                                files.append(
+                                    Entry(dir_entry.path, dir_entry.stat(follow_symlinks=follow))
+                                )
+                            elif scan_filter.name_ok(dir_entry.name, dir_entry.path):
+                                stat = dir_entry.stat(follow_symlinks=follow)
+                                if scan_filter.stat_ok(stat):
+                                    files.append(Entry(dir_entry.path, stat))
+                    except OSError as exception:  # broken link, removed file
+                        self.errors.append((dir_entry.path, exception))
+        except OSError as exception:
+            self.errors.append((path, exception))
+        return dirs, files
+
+    def walk(
+        self,
+        path: PathOrStr,
+        recursive: bool = True,
+    ) -> Iterator[tuple[ListEntry, ListEntry]]:
+        """Yield dirs and files of every listed dir, only memory for dirs queue
+        kept. Dirs filtered by device policy and loops if recursive.
+        """
+        root = os.fspath(path)
+        root_stat = os.stat(root)
+        self._root_dev = root_stat.st_dev
+        self._visited = {(root_stat.st_dev, root_stat.st_ino)}
+        if not recursive:
+            yield self.list_dir(root)
+            return
+        if self.workers is not None and self.workers > 1:
+            yield from self._walk_parallel(root)
+            return
+        queue = deque([root])
+        while queue:
+            dirs, files = self.list_dir(queue.popleft())
+            dirs = [dir_entry for dir_entry in dirs if self._to_walk(dir_entry)]
+            queue.extend(dir_entry.path for dir_entry in dirs)
+            yield dirs, files
+
+    def scan(
+        self,
+        path: PathOrStr,
+        recursive: bool = True,
+    ) -> tuple[ListEntry, ListEntry]:
+        """Return list of dirs and list of files at path."""
+        all_dirs: ListEntry = []
+        all_files: ListEntry = []
+        for dirs, files in self.walk(path, recursive):
+            all_dirs.extend(dirs)
+            all_files.extend(files)
+        return all_dirs, all_files
+
+    def _to_walk(self, entry: Entry) -> bool:
+        """Check dir for device policy and loops."""
+        if self.same_device and entry.stat.st_dev != self._root_dev:
+            return False
+        if self.follow_symlinks:
+            key = (entry.stat.st_dev, entry.stat.st_ino)
+            if key in self._visited:
+                return False
+            self._visited.add(key)
+        return True
+
+    def _walk_parallel(self, root: str) -> Iterator[tuple[ListEntry, ListEntry]]:
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending: set[Future[tuple[ListEntry, ListEntry]]] = {
+                pool.submit(self.list_dir, root)
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dirs, files = future.result()
+                    dirs = [dir_entry for dir_entry in dirs if self._to_walk(dir_entry)]
+                    for dir_entry in dirs:
+                        pending.add(pool.submit(self.list_dir, dir_entry.path))
+                    yield dirs, files
+
+
+def scan(
+    path: PathOrStr,
+    recursive: bool = True,
+    follow_symlinks: bool = False,
+    same_device: bool = False,
+    workers: int | None = None,
+    scan_filter: ScanFilter | None = None,
+) -> tuple[ListEntry, ListEntry]:
+    """Return list of dirs and list of files at path as Entry (path, stat)."""
+    return Scanner(
+        follow_symlinks=follow_symlinks,
+        same_device=same_device,
+        workers=workers,
+        scan_filter=scan_filter,
+    ).scan(path, recursive=recursive)
@@ -0,0 +1,160 @@
+import os
+import struct
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Iterable, Iterator, Sequence
+
+from .parallel import HashItem, default_workers
+
+FS_IOC_FIEMAP = 0xC020660B  # linux ioctl, _IOWR('f', 11, struct fiemap)
+FIEMAP = struct.Struct("=QQIIII")  # start, length, flags, mapped, count, reserved
+FIEMAP_EXTENT = struct.Struct("=QQQQQIIII")  # logical, physical, length, reserved, flags
+FIEMAP_FLAG_SYNC = 0x1
+ORDERS = ("auto", "inode", "physical", "none")
+HDD_WORKERS = 1
+
+
+@lru_cache(maxsize=None)
+def is_rotational(dev: int) -> bool | None:
+    """Device is rotational disk, from /sys (Linux). None if unknown,
+    e.g. network and virtual filesystems.
+    """
+    sys_path = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+    for queue_dir in (sys_path, os.path.join(sys_path, "..")):  # partition - parent disk
+        try:
+            with open(os.path.join(queue_dir, "queue", "rotational"), encoding="ascii") as file:
+                return file.read().strip() == "1"
+        except OSError:
+            continue
+    return None
+
+
+def physical_offset(path: os.PathLike | str) -> int | None:
+    """Physical offset of first extent of file (FIEMAP), None if not available."""
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover
+        return None
+    request = bytearray(FIEMAP.size + FIEMAP_EXTENT.size)
+    FIEMAP.pack_into(request, 0, 0, 2**64 - 1, FIEMAP_FLAG_SYNC, 0, 1, 0)
+    try:
+        with open(path, "rb") as file:
+            fcntl.ioctl(file.fileno(), FS_IOC_FIEMAP, request)
+    except OSError:
+        return None
+    if FIEMAP.unpack_from(request)[3] == 0:  # no extents - empty or inline
+        return None
+    return FIEMAP_EXTENT.unpack_from(request, FIEMAP.size)[1]
+
+
+def _shutdown(pools: dict[int, ThreadPoolExecutor]) -> None:
+    for pool in pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    pools.clear()
+
+
+class DeviceScheduler:
+    """Schedule file reads by device: files grouped by st_dev, every device
+    read by own thread pool, limited by device kind - rotational disks
+    hdd_workers (sequential by default), others ssd_workers.
+    One slow device doesn't hold reads at other devices.
+    order - order of reads at device queue: "inode", "physical" (FIEMAP
+    offset, inode if not available), "none" (input order), "auto" -
+    physical at rotational devices, input order at others.
+    limits - workers by st_dev, override detection.
+    Pool of device created on first read and reused, shut down by `close`.
+    """
+
+    def __init__(
+        self,
+        hdd_workers: int = HDD_WORKERS,
+        ssd_workers: int | None = None,
+        order: str = "auto",
+        limits: dict[int, int] | None = None,
+    ) -> None:
+        if order not in ORDERS:
+            raise ValueError(f"Unknown order: {order}, expected one of {ORDERS}")
+        self.hdd_workers = hdd_workers
+        self.ssd_workers = ssd_workers or default_workers()
+        self.order = order
+        self.limits = dict(limits or {})
+        self._pools: dict[int, ThreadPoolExecutor] = {}
+        self._finalizer = weakref.finalize(self, _shutdown, self._pools)
+
+    def __repr__(self) -> str:
+        return (
+            f"DeviceScheduler: hdd {self.hdd_workers}, ssd {self.ssd_workers} workers, "
+            f"order {self.order}"
+        )
+
+    def workers(self, dev: int) -> int:
+        if dev in self.limits:
+            return self.limits[dev]
+        return self.hdd_workers if is_rotational(dev) else self.ssd_workers
+
+    def _pool(self, dev: int) -> ThreadPoolExecutor:
+        pool = self._pools.get(dev)
+        if pool is None:
+            pool = self._pools[dev] = ThreadPoolExecutor(max_workers=self.workers(dev))
+        return pool
+
+    def close(self) -> None:
+        """Shut down pools of devices."""
+        _shutdown(self._pools)
+
+    def __enter__(self) -> "DeviceScheduler":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _order(self, dev: int) -> str:
+        if self.order != "auto":
+            return self.order
+        return "physical" if is_rotational(dev) else "none"
+
+    def plan(self, files: Sequence[HashItem]) -> dict[int, list[int]]:
+        """Indexes of files by device, in read order."""
+        by_dev: dict[int, list[int]] = {}
+        for idx, file in enumerate(files):
+            by_dev.setdefault(file.dev, []).append(idx)
+        for dev, idx_list in by_dev.items():
+            order = self._order(dev)
+            if order == "inode":
+                idx_list.sort(key=lambda idx: files[idx].ino)
+            elif order == "physical":
+                offsets = {idx: physical_offset(files[idx].path) for idx in idx_list}
+                # files without extents info after mapped ones, by inode
+                idx_list.sort(key=lambda idx: (
+                    offsets[idx] is None, offsets[idx] or 0, files[idx].ino
+                ))
+        return by_dev
+
+    def run(
+        self,
+        files: Iterable[HashItem],
+        kind: str,
+    ) -> Iterator[HashItem]:
+        """Hash files of kind by plan, yield files in input order."""
+        files = list(files)
+        to_hash = [file for file in files if file.cached_hash(kind) is None]
+        if not to_hash:
+            yield from files
+            return
+        futures: dict[int, Future[str]] = {}
+        try:
+            for dev, idx_list in self.plan(to_hash).items():
+                pool = self._pool(dev)
+                for idx in idx_list:
+                    futures[id(to_hash[idx])] = pool.submit(to_hash[idx].get_hash, kind)
+            for file in files:
+                future = futures.get(id(file))
+                if future is not None:
+                    future.result()
+                yield file
+        finally:
+            # stopped early - files not started yet are not read
+            for future in futures.values():
+                future.cancel()
+            wait(futures.values())
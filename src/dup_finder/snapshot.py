@@ -0,0 +1,198 @@
+import gzip
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from .helpers import PathOrStr
+from .parallel import HASH_ATTRS
+from .scanner import Entry, ListEntry, Scanner
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .core import FileList
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapStat(NamedTuple):
+    """Stat fields kept at snapshot, used instead of os.stat_result."""
+
+    st_size: int
+    st_dev: int
+    st_ino: int
+    st_mtime_ns: int
+    st_nlink: int
+
+
+def to_snap_stat(stat: os.stat_result | SnapStat) -> SnapStat:
+    return SnapStat(
+        stat.st_size, stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_nlink
+    )
+
+
+class Snapshot:
+    """Saved scan: dirs mtimes, files stats by dir and calculated hashes.
+    Stored as gzipped json.
+    """
+
+    def __init__(
+        self,
+        hash_names: dict[str, str],
+        dirs: dict[str, int],
+        files: dict[str, dict[str, SnapStat]],
+        hashes: dict[str, dict[str, str]],
+    ) -> None:
+        self.hash_names = hash_names
+        self.dirs = dirs
+        self.files = files
+        self.hashes = hashes
+        self.children: dict[str, list[str]] = defaultdict(list)
+        for dir_path in dirs:
+            parent = os.path.dirname(dir_path)
+            if parent != dir_path:
+                self.children[parent].append(dir_path)
+
+    def __repr__(self) -> str:
+        num_files = sum(len(files) for files in self.files.values())
+        return f"Snapshot: {len(self.dirs)} dirs, {num_files} files, {len(self.hashes)} hashed"
+
+    @classmethod
+    def from_file_list(cls, file_list: "FileList") -> "Snapshot":
+        files: dict[str, dict[str, SnapStat]] = defaultdict(dict)
+        hashes: dict[str, dict[str, str]] = {}
+        for file in file_list.file_list:
+            path = os.fspath(file.path)
+            dir_path, name = os.path.split(path)
+            files[dir_path][name] = SnapStat(
+                file.size, file.dev, file.ino, file.mtime_ns, file.nlink
+            )
+            file_hashes = {
+                kind: getattr(file, attr)
+                for kind, attr in HASH_ATTRS.items()
+                if getattr(file, attr) is not None
+            }
+            if file_hashes:
+                hashes[path] = file_hashes
+        return cls(dict(file_list.hash_names), dict(file_list.dir_mtimes), files, hashes)
+
+    def save(self, path: PathOrStr) -> None:
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "hash_names": self.hash_names,
+            "dirs": self.dirs,
+            "files": {
+                dir_path: {name: list(stat) for name, stat in files.items()}
+                for dir_path, files in self.files.items()
+            },
+            "hashes": self.hashes,
+        }
+        tmp_path = Path(f"{path}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: PathOrStr) -> "Snapshot":
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {data.get('version')}")
+        return cls(
+            data["hash_names"],
+            data["dirs"],
+            {
+                dir_path: {name: SnapStat(*stat) for name, stat in files.items()}
+                for dir_path, files in data["files"].items()
+            },
+            data["hashes"],
+        )
+
+    def file_stat(self, path: str) -> SnapStat | None:
+        dir_path, name = os.path.split(path)
+        return self.files.get(dir_path, {}).get(name)
+
+
+def same_file(stat: os.stat_result | SnapStat, snap_stat: SnapStat | None) -> bool:
+    return snap_stat is not None and (
+        stat.st_size, stat.st_ino, stat.st_mtime_ns
+    ) == (snap_stat.st_size, snap_stat.st_ino, snap_stat.st_mtime_ns)
+
+
+class IncrementalScanner(Scanner):
+    """Scanner that lists only dirs changed since snapshot (by dir mtime),
+    files of unchanged dirs taken from snapshot.
+    Dir mtime doesn't change when file modified in place - verify_files re-stat
+    files of unchanged dirs (stat only, dirs still not listed).
+    Sizes of added, removed and changed files collected at `changed_sizes`.
+    """
+
+    def __init__(
+        self,
+        snapshot: Snapshot,
+        verify_files: bool = False,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.snapshot = snapshot
+        self.verify_files = verify_files
+        self.seen_dirs: set[str] = set()
+        self.listed_dirs: set[str] = set()
+        self.changed_sizes: set[int] = set()
+
+    def list_dir(self, path: str) -> tuple[ListEntry, ListEntry]:
+        self.seen_dirs.add(path)
+        try:
+            unchanged = self.snapshot.dirs.get(path) == os.stat(path).st_mtime_ns
+        except OSError:
+            unchanged = False
+        if unchanged:
+            try:
+                return self._from_snapshot(path)
+            except OSError:  # changed while scanning, list it
+                pass
+        self.listed_dirs.add(path)
+        dirs, files = super().list_dir(path)
+        old_files = dict(self.snapshot.files.get(path, {}))
+        for entry in files:
+            old_stat = old_files.pop(os.path.basename(entry.path), None)
+            if not same_file(entry.stat, old_stat):
+                self.changed_sizes.add(entry.stat.st_size)
+                if old_stat is not None:
+                    self.changed_sizes.add(old_stat.st_size)
+        self.changed_sizes.update(stat.st_size for stat in old_files.values())
+        return dirs, files
+
+    def _from_snapshot(self, path: str) -> tuple[ListEntry, ListEntry]:
+        stat_func = os.stat if self.follow_symlinks else os.lstat
+        scan_filter = self.scan_filter
+        dirs = [
+            Entry(dir_path, stat_func(dir_path))
+            for dir_path in self.snapshot.children.get(path, [])
+            if scan_filter is None or scan_filter.dir_ok(os.path.basename(dir_path), dir_path)
+        ]
+        files: ListEntry = []
+        for name, snap_stat in self.snapshot.files.get(path, {}).items():
+            file_path = os.path.join(path, name)
+            if scan_filter is not None and not scan_filter.name_ok(name, file_path):
+                continue
+            stat = snap_stat
+            if self.verify_files:
+                stat = to_snap_stat(stat_func(file_path))
+                if not same_file(stat, snap_stat):
+                    self.changed_sizes.update((stat.st_size, snap_stat.st_size))
+            if scan_filter is None or scan_filter.stat_ok(stat):  # type: ignore[arg-type]
+                files.append(Entry(file_path, stat))  # type: ignore[arg-type]
+        return dirs, files
+
+    def scan(self, path: PathOrStr, recursive: bool = True) -> tuple[ListEntry, ListEntry]:
+        dirs, files = super().scan(path, recursive=recursive)
+        if not recursive:
+            return dirs, files
+        root = os.fspath(path)
+        for dir_path in self.snapshot.dirs:  # removed dirs
+            if dir_path not in self.seen_dirs and Path(dir_path).is_relative_to(root):
+                self.changed_sizes.update(
+                    stat.st_size for stat in self.snapshot.files.get(dir_path, {}).values()
+                )
+        return dirs, files
@@ -0,0 +1,193 @@
+import heapq
+import itertools
+import os
+import shutil
+import struct
+import tempfile
+import weakref
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Sequence
+
+from .core import COMPARE_MAX, ITER_WINDOW, DupGroup, FileList
+from .helpers import PathOrStr, bytes_human
+from .scanner import Entry, Scanner
+from .snapshot import SnapStat
+
+RUN_SIZE = 1_000_000  # entries at memory before spill to run
+# size, dev, ino, mtime_ns, nlink, path length
+RECORD = struct.Struct("<qQQqqI")
+
+Record = tuple[int, int, int, int, int, bytes]
+
+
+def _write_run(path: Path, records: list[Record]) -> None:
+    """Write records sorted by size descending."""
+    records.sort(key=lambda record: -record[0])
+    with open(path, "wb") as file:
+        for *stat, path_bytes in records:
+            file.write(RECORD.pack(*stat, len(path_bytes)))
+            file.write(path_bytes)
+
+
+def _read_run(file: IO[bytes]) -> Iterator[Record]:
+    while header := file.read(RECORD.size):
+        *stat, length = RECORD.unpack(header)
+        yield (*stat, file.read(length))  # type: ignore[misc]
+
+
+class SizeRuns:
+    """Entries spilled to disk as runs sorted by size, merged on read.
+    Only run_size entries kept at memory while adding.
+    """
+
+    def __init__(self, run_size: int = RUN_SIZE, tmp_dir: PathOrStr | None = None) -> None:
+        self.run_size = run_size
+        self.dir = Path(tempfile.mkdtemp(prefix="dup_finder_runs_", dir=tmp_dir))
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.dir, True)
+        self.runs: list[Path] = []
+        self._records: list[Record] = []
+        self.num = 0
+        self.size_all = 0
+        self.max_size = 0
+
+    def __repr__(self) -> str:
+        return f"SizeRuns: {self.num} entries, {len(self.runs)} runs at {self.dir}"
+
+    def add(self, entries: Iterable[Entry]) -> None:
+        for entry in entries:
+            stat = entry.stat
+            self._records.append((
+                stat.st_size, stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_nlink,
+                os.fsencode(entry.path),
+            ))
+            self.num += 1
+            self.size_all += stat.st_size
+            self.max_size = max(self.max_size, stat.st_size)
+            if len(self._records) >= self.run_size:
+                self._spill()
+
+    def _spill(self) -> None:
+        if self._records:
+            path = self.dir / f"run_{len(self.runs):06d}.bin"
+            _write_run(path, self._records)
+            self.runs.append(path)
+            self._records = []
+
+    def buckets(self, min_len: int = 2) -> Iterator[tuple[int, list[Entry]]]:
+        """Yield size and entries of sizes with at least min_len entries,
+        size descending, one bucket at memory.
+        """
+        self._spill()
+        files = [open(path, "rb", buffering=1048576) for path in self.runs]
+        try:
+            merged = heapq.merge(*map(_read_run, files), key=lambda record: -record[0])
+            for size, records in itertools.groupby(merged, key=lambda record: record[0]):
+                bucket = [
+                    Entry(os.fsdecode(path_bytes), SnapStat(*stat))  # type: ignore[arg-type]
+                    for *stat, path_bytes in records
+                ]
+                if len(bucket) >= min_len:
+                    yield size, bucket
+        finally:
+            for file in files:
+                file.close()
+
+    def close(self) -> None:
+        """Remove runs."""
+        self._finalizer()
+
+
+class SpilledFileList(FileList):
+    """FileList with bounded memory: scan streamed to disk runs sorted by size,
+    merged externally, only sizes with more than one file loaded.
+    load_candidates - load all candidate sizes, so all FileList methods work,
+    memory proportional to candidates. If False - nothing loaded, `iter_dups`
+    loads one size bucket at a time, memory roughly constant.
+    run_size - entries at memory while scanning, tmp_dir - dir for runs.
+    Snapshots are not supported.
+    """
+
+    def __init__(
+        self,
+        path: PathOrStr,
+        load_candidates: bool = True,
+        run_size: int = RUN_SIZE,
+        tmp_dir: PathOrStr | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if kwargs.get("snapshot") is not None:
+            raise ValueError("Snapshots are not supported with spilled scan.")
+        self.load_candidates = load_candidates
+        self.size_runs = SizeRuns(run_size, tmp_dir)
+        super().__init__(path, **kwargs)
+
+    def _scan(
+        self,
+        recursive: bool,
+        follow_symlinks: bool,
+        same_device: bool,
+    ) -> list[Entry]:
+        scanner = Scanner(
+            follow_symlinks=follow_symlinks,
+            same_device=same_device,
+            workers=self.workers,
+            scan_filter=self.scan_filter,
+        )
+        for _, files in scanner.walk(self.path, recursive=recursive):
+            self.size_runs.add(files)
+        if not self.load_candidates:
+            return []
+        return [entry for _, bucket in self.size_runs.buckets() for entry in bucket]
+
+    def __repr__(self) -> str:
+        runs = self.size_runs
+        return (
+            f"{self.path.name}: {runs.num} files, {bytes_human(runs.size_all)}, "
+            f"max size {bytes_human(runs.max_size)}, "
+            f"loaded {self.len} files of same sizes"
+        )
+
+    def iter_dups(
+        self,
+        stages: Sequence[str] = ("head",),
+        method: str = "auto",
+        compare_max: int = COMPARE_MAX,
+        sizes: Iterable[int] | None = None,
+        window: int = ITER_WINDOW,
+    ) -> Iterator[DupGroup]:
+        """Same as `FileList.iter_dups`. If candidates not loaded, size buckets
+        loaded from runs by window files, list holds only current window.
+        """
+        if self.load_candidates:
+            yield from super().iter_dups(stages, method, compare_max, sizes, window)
+            return
+        sizes = None if sizes is None else set(sizes)
+        batch: list[Entry] = []
+        for size, bucket in self.size_runs.buckets():
+            if sizes is not None and size not in sizes:
+                continue
+            batch.extend(bucket)
+            if len(batch) >= window:
+                yield from self._iter_batch(batch, stages, method, compare_max, window)
+                batch = []
+        if batch:
+            yield from self._iter_batch(batch, stages, method, compare_max, window)
+        self.file_list = []
+        self._set_sizes()
+
+    def _iter_batch(
+        self,
+        entries: list[Entry],
+        stages: Sequence[str],
+        method: str,
+        compare_max: int,
+        window: int,
+    ) -> Iterator[DupGroup]:
+        """Load entries of window to list, yield their dups."""
+        self._set_files(entries)
+        self._set_sizes()
+        yield from super().iter_dups(stages, method, compare_max, window=window)
+
+    def close(self) -> None:
+        self.size_runs.close()
+        super().close()
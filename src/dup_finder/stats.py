@@ -0,0 +1,125 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator
+
+from .cache import HashCache
+from .helpers import bytes_human
+
+StageHook = Callable[["StageStats"], None]
+
+
+class StageStats:
+    """Counters of one stage, accumulated over all runs of stage.
+    files, bytes - files processed and bytes to read for them (hashed, compared,
+    moved), cache hits included. devices - [files, bytes] by st_dev.
+    dropped, saved - files found unique at stage and their bytes not read later.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.runs = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.files = 0
+        self.bytes = 0
+        self.dropped = 0
+        self.saved = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.devices: dict[int, list[int]] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.name}: {self.files} files, {bytes_human(self.bytes)}, "
+            f"{self.wall:.3f}s wall, {self.cpu:.3f}s cpu, "
+            f"{bytes_human(int(self.throughput))}/s"
+        )
+
+    def add(self, dev: int, size: int) -> None:
+        """Count file of device with size bytes."""
+        self.files += 1
+        self.bytes += size
+        counters = self.devices.setdefault(dev, [0, 0])
+        counters[0] += 1
+        counters[1] += size
+
+    def add_many(self, files: Iterable[Any], read_size: Callable[[int], int]) -> None:
+        """Count files (with dev and size) by bytes read_size(size)."""
+        for file in files:
+            self.add(file.dev, read_size(file.size))
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second of wall time."""
+        return self.bytes / self.wall if self.wall else 0.0
+
+    def device_throughput(self) -> dict[int, float]:
+        """Bytes per second of stage wall time by device.
+        Devices read concurrently at same stage, so it is share of device
+        at stage throughput, not device speed.
+        """
+        if not self.wall:
+            return {dev: 0.0 for dev in self.devices}
+        return {dev: size / self.wall for dev, (_, size) in self.devices.items()}
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "runs": self.runs,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "files": self.files,
+            "bytes": self.bytes,
+            "dropped": self.dropped,
+            "saved": self.saved,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "throughput": self.throughput,
+            "devices": {
+                str(dev): {"files": files, "bytes": size}
+                for dev, (files, size) in self.devices.items()
+            },
+        }
+
+
+class RunStats:
+    """Stats of stages by name, hooks called with StageStats at end of every stage run."""
+
+    def __init__(self, hooks: Iterable[StageHook] = ()) -> None:
+        self.stages: dict[str, StageStats] = {}
+        self.hooks = list(hooks)
+
+    def __repr__(self) -> str:
+        return "\n".join(repr(stats) for stats in self.stages.values())
+
+    def __getitem__(self, name: str) -> StageStats:
+        return self.stages[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.stages
+
+    @contextmanager
+    def stage(self, name: str, cache: HashCache | None = None) -> Iterator[StageStats]:
+        """Time stage, count cache hits and misses of cache while stage runs."""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.wall += time.perf_counter() - wall
+            stats.cpu += time.process_time() - cpu
+            stats.runs += 1
+            if cache is not None:
+                stats.cache_hits += cache.hits - hits
+                stats.cache_misses += cache.misses - misses
+            for hook in self.hooks:
+                hook(stats)
+
+    def reset(self) -> None:
+        self.stages = {}
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        return {name: stats.as_dict() for name, stats in self.stages.items()}
@@ -0,0 +1,355 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from .cache import HashCache
+from .core import STAGES, DupGroup, File
+from .filters import ScanFilter
+from .hashers import DEFAULT_HASH, DEFAULT_STAGE_HASH, get_hasher
+from .helpers import PathOrStr, bytes_human
+from .scanner import Scanner
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW
+)
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+READ_SIZE = 65536
+
+
+class Event(NamedTuple):
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+
+class Inotify:
+    """Minimal inotify binding over libc (Linux only), no dependencies."""
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)  # error if already removed by kernel
+
+    def read(self, timeout: float | None = None) -> list[Event]:
+        """Read available events, wait up to timeout seconds (None - forever)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos < len(data):
+            wd, mask, cookie, length = EVENT.unpack_from(data, pos)
+            pos += EVENT.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            events.append(Event(wd, mask, cookie, name))
+        return events
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class LiveIndex:
+    """Size and hash index of tree kept up to date by inotify.
+    Built by one scan, then files created, written, moved and deleted update
+    index incrementally - only sizes touched by events checked again.
+    Current dups groups returned by `dups`, new groups passed to on_dups as
+    soon as found. Hashes are kept at File objects (and cache), so checking
+    a size again reads only new files. Hardlinks to same inode reported once.
+    Queue overflow (too many events) falls back to full rescan.
+    """
+
+    def __init__(
+        self,
+        path: PathOrStr,
+        cache: HashCache | PathOrStr | None = None,
+        hash_name: str = DEFAULT_HASH,
+        stage_hash_name: str = DEFAULT_STAGE_HASH,
+        scan_filter: ScanFilter | None = None,
+        on_dups: Callable[[DupGroup], None] | None = None,
+    ) -> None:
+        get_hasher(hash_name)
+        get_hasher(stage_hash_name)
+        self.hash_names = {
+            "full": hash_name,
+            **{kind: stage_hash_name for kind in STAGES},
+        }
+        self.path = Path(os.path.abspath(path))
+        if cache is not None and not isinstance(cache, HashCache):
+            cache = HashCache(cache)
+        self.cache = cache
+        self.scan_filter = scan_filter
+        self.on_dups = on_dups
+        self.inotify = Inotify()
+        self.lock = threading.RLock()
+        self.files: dict[str, File] = {}
+        self.by_size: dict[int, set[str]] = defaultdict(set)
+        self.dir_files: dict[str, set[str]] = defaultdict(set)
+        self.wd2dir: dict[int, str] = {}
+        self.dir2wd: dict[str, int] = {}
+        self._groups: dict[int, list[DupGroup]] = {}
+        self._dirty: set[int] = set()
+        self.build()
+
+    def __repr__(self) -> str:
+        size_all = sum(file.size for file in self.files.values())
+        return (
+            f"LiveIndex {self.path}: {len(self.files)} files, {bytes_human(size_all)}, "
+            f"{len(self.dir2wd)} dirs watched"
+        )
+
+    def __enter__(self) -> "LiveIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def build(self) -> None:
+        """Scan tree, watch all dirs, find all dups groups."""
+        with self.lock:
+            for wd in list(self.wd2dir):
+                self.inotify.rm_watch(wd)
+            self.files.clear()
+            self.by_size.clear()
+            self.dir_files.clear()
+            self.wd2dir.clear()
+            self.dir2wd.clear()
+            self._groups.clear()
+            self._add_tree(os.fspath(self.path))
+            self._dirty = {size for size, paths in self.by_size.items() if len(paths) > 1}
+            self._check_dirty(notify=False)
+
+    def _watch(self, dir_path: str) -> None:
+        try:
+            wd = self.inotify.add_watch(dir_path)
+        except OSError as exception:
+            if exception.errno in (errno.ENOENT, errno.ENOTDIR):
+                return  # removed already
+            raise
+        self.wd2dir[wd] = dir_path
+        self.dir2wd[dir_path] = wd
+
+    def _add_tree(self, root: str) -> None:
+        """Watch root and subdirs, add files. Watch set before listing,
+        so files created while scanning are not lost.
+        """
+        scanner = Scanner(scan_filter=self.scan_filter)
+        self._watch(root)
+        queue = [root]
+        while queue:
+            dir_path = queue.pop()
+            dirs, files = scanner.list_dir(dir_path)
+            for dir_entry in dirs:
+                self._watch(dir_entry.path)
+                queue.append(dir_entry.path)
+            for entry in files:
+                self._add_file(entry.path, entry.stat)
+
+    def _add_file(self, path: str, stat: os.stat_result) -> None:
+        self._remove_file(path)
+        file = File(path, self.cache, stat, self.hash_names)
+        self.files[path] = file
+        self.by_size[file.size].add(path)
+        self.dir_files[os.path.dirname(path)].add(path)
+        self._dirty.add(file.size)
+
+    def _remove_file(self, path: str) -> None:
+        file = self.files.pop(path, None)
+        if file is None:
+            return
+        paths = self.by_size[file.size]
+        paths.discard(path)
+        if not paths:
+            del self.by_size[file.size]
+        dir_files = self.dir_files.get(os.path.dirname(path))
+        if dir_files is not None:
+            dir_files.discard(path)
+        self._dirty.add(file.size)
+
+    def _remove_tree(self, root: str) -> None:
+        prefix = root + os.sep
+        for dir_path in [
+            dir_path for dir_path in self.dir2wd
+            if dir_path == root or dir_path.startswith(prefix)
+        ]:
+            wd = self.dir2wd.pop(dir_path)
+            self.wd2dir.pop(wd, None)
+            self.inotify.rm_watch(wd)
+        for dir_path in [
+            dir_path for dir_path in self.dir_files
+            if dir_path == root or dir_path.startswith(prefix)
+        ]:
+            for path in list(self.dir_files.pop(dir_path)):
+                self._remove_file(path)
+
+    def _update_file(self, path: str, created: bool = False) -> None:
+        """Index file by current stat. created - file just created, indexed
+        only if hardlink (complete), new file is empty or partly written
+        until closed.
+        """
+        try:
+            stat = os.lstat(path)
+        except OSError:
+            self._remove_file(path)
+            return
+        if not os.path.isfile(path) or os.path.islink(path):
+            return
+        if created and stat.st_nlink < 2:
+            return
+        scan_filter = self.scan_filter
+        if scan_filter is not None and not scan_filter.file_ok(
+            os.path.basename(path), path, stat
+        ):
+            self._remove_file(path)
+            return
+        self._add_file(path, stat)
+
+    def _handle(self, event: Event) -> bool:
+        """Update index by event, return False if full rescan needed."""
+        if event.mask & IN_Q_OVERFLOW:
+            return False
+        dir_path = self.wd2dir.get(event.wd)
+        if dir_path is None:
+            return True
+        if event.mask & IN_IGNORED:
+            self.wd2dir.pop(event.wd, None)
+            self.dir2wd.pop(dir_path, None)
+            return True
+        if event.mask & IN_DELETE_SELF:
+            self._remove_tree(dir_path)
+            return True
+        path = os.path.join(dir_path, event.name)
+        if event.mask & IN_ISDIR:
+            if event.mask & (IN_DELETE | IN_MOVED_FROM):
+                self._remove_tree(path)
+            elif event.mask & (IN_CREATE | IN_MOVED_TO):
+                scan_filter = self.scan_filter
+                if scan_filter is None or scan_filter.dir_ok(event.name, path):
+                    self._add_tree(path)
+        elif event.mask & (IN_DELETE | IN_MOVED_FROM):
+            self._remove_file(path)
+        elif event.mask & IN_CREATE:
+            self._update_file(path, created=True)
+        else:  # written and closed, moved in
+            self._update_file(path)
+        return True
+
+    def process_events(self, timeout: float | None = 0) -> int:
+        """Read and apply pending events, check changed sizes for dups.
+        Wait for events up to timeout seconds. Return number of events.
+        """
+        events = self.inotify.read(timeout)
+        if not events:
+            return 0
+        with self.lock:
+            if not all([self._handle(event) for event in events]):
+                self.build()
+            else:
+                self._check_dirty()
+        return len(events)
+
+    def run(self, stop: threading.Event | None = None, interval: float = 1.0) -> None:
+        """Process events until stop set, stop checked every interval seconds."""
+        while stop is None or not stop.is_set():
+            self.process_events(timeout=interval)
+
+    def _size_groups(self, size: int) -> list[DupGroup]:
+        """Dups groups of size: one file per inode, split by head hash, then full."""
+        inodes: dict[tuple[int, int], File] = {}
+        for path in sorted(self.by_size.get(size, ())):
+            file = self.files[path]
+            inodes.setdefault((file.dev, file.ino), file)
+        if len(inodes) < 2:
+            return []
+        groups: list[list[File]] = [list(inodes.values())]
+        for kind in ("head", "full"):
+            split: list[list[File]] = []
+            for group in groups:
+                by_hash: dict[str, list[File]] = defaultdict(list)
+                for file in group:
+                    try:
+                        by_hash[file.get_hash(kind)].append(file)
+                    except OSError:  # removed, event not processed yet
+                        continue
+                split.extend(files for files in by_hash.values() if len(files) > 1)
+            groups = split
+        return [
+            DupGroup(
+                size, group[0].hash, [file.path for file in group],
+                hash_name=self.hash_names["full"],
+            )
+            for group in groups
+        ]
+
+    def _check_dirty(self, notify: bool = True) -> None:
+        for size in self._dirty:
+            old = {frozenset(group.paths) for group in self._groups.get(size, [])}
+            groups = self._size_groups(size)
+            if groups:
+                self._groups[size] = groups
+            else:
+                self._groups.pop(size, None)
+            if notify and self.on_dups is not None:
+                for group in groups:
+                    if frozenset(group.paths) not in old:
+                        self.on_dups(group)
+        self._dirty = set()
+        if self.cache is not None:
+            self.cache.flush()
+
+    def dups(self) -> list[DupGroup]:
+        """Current dups groups, biggest size first."""
+        with self.lock:
+            return [
+                group
+                for size in sorted(self._groups, reverse=True)
+                for group in self._groups[size]
+            ]
+
+    def close(self) -> None:
+        self.inotify.close()
+        if self.cache is not None:
+            self.cache.flush()
@@ -0,0 +1,85 @@
+import errno
+import os
+
+from dup_finder.actions import Plan
+from dup_finder.core import FileList
+
+
+def make_copies(root, num=3, size=5000):
+    root.mkdir()
+    data = os.urandom(size)
+    for idx in range(num):
+        (root / f"copy_{idx}.bin").write_bytes(data)
+    file_list = FileList(root, verbose=False)
+    file_list.find_dups_candidates()
+    file_list.find_dups(method="hash")
+    return file_list
+
+
+def touch_changed(path, data):
+    """Rewrite file, mtime moved forward, so change seen at coarse timestamps too."""
+    mtime_ns = path.stat().st_mtime_ns
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+
+def test_apply_plan_skips_changed_file(tmp_path):
+    file_list = make_copies(tmp_path / "tree")
+    plan = file_list.plan_dups("delete")
+    assert len(plan) == 2
+    changed = plan.actions[0].path
+    touch_changed(changed, b"new content")
+    result = file_list.apply_plan(plan)
+    assert [action.path for action in result.done] == [plan.actions[1].path]
+    assert [action.path for action, _ in result.failed] == [changed]
+    assert changed.read_bytes() == b"new content"
+    assert not plan.actions[1].path.exists()
+    assert plan.actions[0].target.exists()
+
+
+def test_apply_plan_skips_when_kept_changed(tmp_path):
+    file_list = make_copies(tmp_path / "tree")
+    plan = file_list.plan_dups("hardlink")
+    kept = plan.actions[0].target
+    data = plan.actions[0].path.read_bytes()
+    touch_changed(kept, b"new content")
+    result = file_list.apply_plan(plan)
+    assert result.done == []
+    assert len(result.failed) == 2
+    assert all(str(errno.ESTALE) in error for _, error in result.failed)
+    for action in plan:
+        assert action.path.read_bytes() == data
+        assert action.path.stat().st_ino != kept.stat().st_ino
+
+
+def test_apply_plan_dry_run(tmp_path, capsys):
+    file_list = make_copies(tmp_path / "tree")
+    plan = file_list.plan_dups("delete")
+    result = file_list.apply_plan(plan, dry_run=True)
+    assert result.done == [] and result.failed == []
+    assert all(action.path.exists() for action in plan)
+    assert "delete" in capsys.readouterr().out
+
+
+def test_move_dups(tmp_path):
+    file_list = make_copies(tmp_path / "tree")
+    dest = tmp_path / "dest"
+    result = file_list.move_dups(dest)
+    assert len(result.done) == 2 and result.failed == []
+    assert sorted(path.name for path in (dest / "tree").iterdir()) == [
+        action.path.name for action in sorted(result.done, key=lambda action: action.path)
+    ]
+    assert len(list((tmp_path / "tree").iterdir())) == 1
+    assert file_list.len == 1
+
+
+def test_plan_save_load(tmp_path):
+    file_list = make_copies(tmp_path / "tree")
+    plan = file_list.plan_dups("hardlink")
+    plan.save(tmp_path / "plan.jsonl")
+    loaded = Plan.load(tmp_path / "plan.jsonl")
+    assert loaded.actions == plan.actions
+    assert loaded.lines() == plan.lines()
+    result = file_list.apply_plan(loaded, workers=2)
+    assert len(result.done) == 2 and result.failed == []
+    assert len({action.path.stat().st_ino for action in plan}) == 1
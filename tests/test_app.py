@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import dup_finder
+from dup_finder.app import main, parse_size
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("100", 100),
+    ("64k", 65536),
+    ("1.5M", 1572864),
+    ("2GiB", 2 * 1024**3),
+    ("10b", 10),
+])
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+def test_parse_size_invalid():
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_size("ten")
+
+
+def make_copies(root, data):
+    root.mkdir()
+    for num in range(2):
+        (root / f"copy_{num}.bin").write_bytes(data)
+    (root / "unique.bin").write_bytes(os.urandom(len(data)))
+    return root
+
+
+def run_jsonl(capsys, *argv):
+    main([*argv, "--format", "jsonl"])
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_dups_jsonl(tmp_path, capsys):
+    root = make_copies(tmp_path / "tree", os.urandom(5000))
+    [record] = run_jsonl(capsys, "dups", os.fspath(root), "--method", "hash", "--hash", "md5")
+    assert record["size"] == 5000
+    assert record["hash_name"] == "md5"
+    assert record["compare_key"] is None
+    assert sorted(os.path.basename(path) for path in record["paths"]) == [
+        "copy_0.bin", "copy_1.bin"
+    ]
+    [record] = run_jsonl(capsys, "dups", os.fspath(root), "--method", "compare")
+    assert record["hash"] is None and record["compare_key"].startswith("cmp-")
+
+
+def test_compare_with_jsonl(tmp_path, capsys):
+    data = os.urandom(5000)
+    root = make_copies(tmp_path / "tree", data)
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "kept.bin").write_bytes(data)
+    [record] = run_jsonl(capsys, "compare-with", os.fspath(root), os.fspath(other))
+    assert record["size"] == 5000
+    assert len(record["paths"]) == 2
+    assert record["other_paths"] == [os.fspath(other / "kept.bin")]
+
+
+def test_move_dry_run_jsonl(tmp_path, capsys):
+    root = make_copies(tmp_path / "tree", os.urandom(5000))
+    dest = tmp_path / "dest"
+    records = run_jsonl(capsys, "move", os.fspath(root), "--dest", os.fspath(dest), "-n")
+    assert len(records) == 1
+    assert records[0]["action"] == "move" and records[0]["dry_run"] is True
+    assert records[0]["target"].startswith(os.fspath(dest))
+    assert len(os.listdir(root)) == 3
+    assert not dest.exists()
+
+
+def test_empty_dir(tmp_path, capsys):
+    assert run_jsonl(capsys, "dups", os.fspath(tmp_path)) == []
+    [record] = run_jsonl(capsys, "scan", os.fspath(tmp_path))
+    assert record["files"] == 0
+
+
+def test_import_is_light():
+    src = os.path.dirname(os.path.dirname(dup_finder.__file__))
+    code = (
+        "import sys, dup_finder.app; "
+        "print(sorted(name for name in ('dup_finder.core', 'rich', 'asyncio') "
+        "if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": src},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
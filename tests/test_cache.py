@@ -0,0 +1,111 @@
+import os
+from types import SimpleNamespace
+
+from dup_finder.cache import HashCache
+from dup_finder.core import FileList
+
+
+def make_copies(root, num=3, size=5000):
+    root.mkdir(parents=True, exist_ok=True)
+    data = os.urandom(size)
+    for num_copy in range(num):
+        (root / f"copy_{num_copy}.bin").write_bytes(data)
+    (root / "unique.bin").write_bytes(os.urandom(size + 1))
+    return root
+
+
+def rewrite_keep_stat(path):
+    """Other content of same size, mtime restored - cache key unchanged."""
+    stat = path.stat()
+    path.write_bytes(os.urandom(stat.st_size))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def find_dups(root, cache):
+    file_list = FileList(root, cache=cache)
+    file_list.find_dups_candidates()
+    file_list.find_dups()
+    return file_list
+
+
+def test_rescan_reads_no_files(tmp_path):
+    root = make_copies(tmp_path / "tree")
+    cache = HashCache(tmp_path / "cache.db")
+    first = find_dups(root, cache)
+    assert cache.hits == 0
+    misses = cache.misses
+    assert misses > 0
+    # cached hashes returned for files with same key - content not read
+    rewrite_keep_stat(root / "copy_0.bin")
+    cache.hits = cache.misses = 0
+    second = find_dups(root, cache)
+    assert cache.misses == 0
+    assert cache.hits == misses
+    assert second._dups == first._dups
+    cache.close()
+
+
+def test_changed_file_misses(tmp_path):
+    cache = HashCache(tmp_path / "cache.db")
+    file = SimpleNamespace(dev=1, ino=2, size=10, mtime_ns=100)
+    cache.set(file, "full", "abc")
+    assert cache.get(file, "full") == "abc"
+    assert cache.get(SimpleNamespace(dev=1, ino=2, size=10, mtime_ns=101), "full") is None
+    assert cache.get(SimpleNamespace(dev=1, ino=2, size=11, mtime_ns=100), "full") is None
+    assert cache.get(file, "head") is None
+    assert (cache.hits, cache.misses) == (1, 3)
+    cache.close()
+
+
+def test_touched_file_rehashed(tmp_path):
+    root = make_copies(tmp_path / "tree")
+    cache = HashCache(tmp_path / "cache.db")
+    find_dups(root, cache)
+    stat = (root / "copy_0.bin").stat()
+    os.utime(root / "copy_0.bin", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache.hits = cache.misses = 0
+    file_list = find_dups(root, cache)
+    assert cache.misses > 0
+    assert cache.hits > 0
+    assert len(file_list._dups[5000]) == 1
+    cache.close()
+
+
+def test_evict(tmp_path):
+    cache = HashCache(tmp_path / "cache.db")
+    for ino in range(3):
+        cache.set(SimpleNamespace(dev=1, ino=ino, size=10, mtime_ns=100), "full", "abc")
+    assert len(cache) == 3
+    assert cache.evict(max_age=3600) == 0
+    assert cache.evict(max_age=-10) == 3
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_evict_stale(tmp_path):
+    cache = HashCache(tmp_path / "cache.db")
+    old = SimpleNamespace(dev=1, ino=2, size=10, mtime_ns=100)
+    other = SimpleNamespace(dev=1, ino=3, size=10, mtime_ns=100)
+    cache.set(old, "full", "abc")
+    cache.set(old, "head", "ab")
+    cache.set(other, "full", "abc")
+    changed = SimpleNamespace(dev=1, ino=2, size=10, mtime_ns=200)
+    assert cache.evict_stale([changed, other]) == 2
+    assert cache.get(old, "full") is None
+    assert cache.get(other, "full") == "abc"
+    cache.close()
+
+
+def test_compact_keeps_entries(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = HashCache(path)
+    for ino in range(2000):
+        cache.set(SimpleNamespace(dev=1, ino=ino, size=10, mtime_ns=100), "full", "a" * 32)
+    cache.flush()
+    cache.evict_stale([SimpleNamespace(dev=1, ino=ino, size=11, mtime_ns=100)
+                       for ino in range(1, 2000)])
+    cache.compact()
+    cache.close()
+    with HashCache(path) as cache:
+        assert len(cache) == 1
+        assert cache.get(SimpleNamespace(dev=1, ino=0, size=10, mtime_ns=100), "full") == "a" * 32
@@ -0,0 +1,108 @@
+import os
+from array import array
+
+import pytest
+
+from dup_finder import compact
+from dup_finder.compact import CompactFileList, SizeIndex
+from dup_finder.core import FileList
+
+
+@pytest.fixture(params=["numpy", "no numpy"])
+def numpy_mode(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(compact, "np", None)
+    return request.param
+
+
+def make_tree(root):
+    """Dups of some sizes at nested dirs, same size uniques and same head."""
+    contents = [os.urandom(size) for size in (10, 5000, 40000)]
+    for num_dir in range(3):
+        dir_path = root / f"d{num_dir}" / "sub"
+        dir_path.mkdir(parents=True)
+        for num, data in enumerate(contents):
+            (dir_path / f"copy_{num}.bin").write_bytes(data)
+        (dir_path / "unique.bin").write_bytes(os.urandom(5000))
+    data = os.urandom(100000)
+    (root / "head_0.bin").write_bytes(data)
+    (root / "head_1.bin").write_bytes(data[:-1] + bytes([data[-1] ^ 1]))
+    return root
+
+
+def add_links(root):
+    os.link(root / "d0" / "sub" / "copy_1.bin", root / "link_1.bin")
+    os.link(root / "head_0.bin", root / "d1" / "link_head.bin")
+
+
+def by_paths(file_list, dict_size_hash):
+    """Size-hash dict with sorted paths instead of idx."""
+    return {
+        size: {
+            hash_val: sorted(file_list.file_list[idx].path for idx in idx_list)
+            for hash_val, idx_list in hash_dict.items()
+        }
+        for size, hash_dict in dict_size_hash.items()
+    }
+
+
+def find_dups(file_list):
+    file_list.find_dups_candidates()
+    file_list.find_dups()
+    return file_list
+
+
+def test_matches_file_list(tmp_path, numpy_mode):
+    root = make_tree(tmp_path / "tree")
+    add_links(root)
+    expected = find_dups(FileList(root))
+    result = find_dups(CompactFileList(root))
+    assert list(result.sizes) == expected.sizes
+    assert result.size_all == expected.size_all
+    assert by_paths(result, result._size_head_hash_candidates) == by_paths(
+        expected, expected._size_head_hash_candidates
+    )
+    assert by_paths(result, result._dups) == by_paths(expected, expected._dups)
+    assert len(result._dups) == 3
+    assert links(result) == links(expected)
+    assert len(links(result)) == 2
+
+
+def links(file_list):
+    """Hardlinks as sorted paths of every inode."""
+    return sorted(
+        sorted(file_list.file_list[idx].path for idx in [first, *link_idx])
+        for first, link_idx in file_list.links.items()
+    )
+
+
+def test_size_index(numpy_mode):
+    index = SizeIndex(array("q", [50, 50, 20, 10, 10, 10]))
+    assert list(index) == [50, 20, 10]
+    assert len(index) == 3
+    assert index[50] == range(0, 2)
+    assert index[20] == range(2, 3)
+    assert index[10] == range(3, 6)
+    assert 20 in index
+    assert 30 not in index
+    assert "size" not in index
+    with pytest.raises(KeyError):
+        index[30]
+    assert len(SizeIndex(array("q"))) == 0
+
+
+def test_remove_files(tmp_path, numpy_mode):
+    root = make_tree(tmp_path / "tree")
+    file_list = CompactFileList(root)
+    paths = [file.path for file in file_list.file_list]
+    removed = list(file_list.size2idx[5000])[:2] + [0]
+    file_list._remove_files(removed)
+    assert [file.path for file in file_list.file_list] == [
+        path for idx, path in enumerate(paths) if idx not in removed
+    ]
+    assert len(file_list.size2idx[5000]) == 4
+    assert 100000 in file_list.size2idx
+    assert len(file_list.size2idx[100000]) == 1
+    assert file_list.size_all == sum(file.size for file in file_list.file_list)
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from dup_finder.cache import HashCache
+from dup_finder.compare import compare_files
+from dup_finder.core import FileList
+
+
+def write_files(root, contents):
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for num, data in enumerate(contents):
+        path = root / f"file_{num:04}.bin"
+        path.write_bytes(data)
+        paths.append(path)
+    return paths
+
+
+def changed_at(data, pos):
+    """Data with byte at pos changed."""
+    data = bytearray(data)
+    data[pos] ^= 1
+    return bytes(data)
+
+
+def test_compare_groups(tmp_path):
+    data = os.urandom(10000)
+    other = changed_at(data, 5000)
+    paths = write_files(tmp_path, [data, other, data, b"", b"", other, changed_at(data, -1)])
+    groups = sorted(compare_files(paths, buf_size=1024))
+    assert groups == [[0, 2], [1, 5], [3, 4]]
+    assert compare_files(paths[:1]) == []
+    assert compare_files(paths[:2]) == []
+
+
+@pytest.mark.parametrize("max_open", [2, 64])
+def test_compare_reopen_matches(tmp_path, max_open):
+    data = os.urandom(20000)
+    contents = [data] * 5 + [changed_at(data, -1)] * 3 + [os.urandom(20000)]
+    paths = write_files(tmp_path, contents)
+    groups = compare_files(paths, buf_size=1024, max_open=max_open)
+    assert sorted(groups) == [[0, 1, 2, 3, 4], [5, 6, 7]]
+
+
+@pytest.fixture
+def low_nofile():
+    """Open files limit lower than files at group."""
+    resource = pytest.importorskip("resource")
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (128, hard))
+    yield 128
+    resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+
+def test_compare_big_group_open_files_bounded(tmp_path, low_nofile):
+    data = os.urandom(5000)
+    paths = write_files(tmp_path, [data] * 200 + [changed_at(data, -1)] * 100)
+    groups = compare_files(paths)
+    assert sorted(groups) == [list(range(200)), list(range(200, 300))]
+
+
+def test_find_dups_compare_big_group(tmp_path, low_nofile):
+    data = os.urandom(5000)
+    write_files(tmp_path / "tree", [data] * 200 + [os.urandom(5000)])
+    file_list = FileList(tmp_path / "tree")
+    file_list.find_dups_candidates()
+    file_list.find_dups(method="compare")
+    assert [len(group) for group in file_list._dups[5000].values()] == [200]
+    assert all(key.startswith("cmp-") for key in file_list._dups[5000])
+
+
+@pytest.mark.parametrize("method", ["hash", "compare", "auto"])
+def test_methods_same_groups(tmp_path, method):
+    contents = [os.urandom(size) for size in (10, 5000, 40000)]
+    write_files(tmp_path / "tree", contents * 3 + [os.urandom(5000)])
+    file_list = FileList(tmp_path / "tree")
+    file_list.find_dups_candidates()
+    file_list.find_dups(method=method)
+    groups = sorted(
+        sorted(file_list.file_list[idx].path for idx in group)
+        for hash_dict in file_list._dups.values()
+        for group in hash_dict.values()
+    )
+    assert [len(group) for group in groups] == [3, 3, 3]
+    with pytest.raises(ValueError):
+        file_list.find_dups(method="guess")
+
+
+def test_auto_with_cache_hashes(tmp_path):
+    """Compare stores no hash, so with cache auto mode hashes."""
+    write_files(tmp_path / "tree", [os.urandom(5000)] * 2)
+    cache = HashCache(tmp_path / "cache.db")
+    for _ in range(2):
+        file_list = FileList(tmp_path / "tree", cache=cache)
+        file_list.find_dups_candidates()
+        file_list.find_dups()
+        assert not any(key.startswith("cmp-") for key in file_list._dups[5000])
+    assert cache.misses == 4  # head and full hash, first run only
+    cache.close()
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from dup_finder import scanner as scanner_module
+from dup_finder.compact import CompactFileList
+from dup_finder.core import FileList
+from dup_finder.filters import ScanFilter
+from dup_finder.helpers import get_dirs_files
+from dup_finder.scanner import Scanner, scan
+from dup_finder.snapshot import SnapStat
+
+NOW = 2_000_000_000
+
+
+def make_tree(root):
+    """Files of different names, sizes and ages, .git and cache dirs.
+    mtime of every file - NOW minus size days.
+    """
+    for dir_path in (root / "src", root / ".git" / "objects", root / "src" / "cache"):
+        dir_path.mkdir(parents=True)
+    for rel_path, size in (
+        ("src/a.txt", 10),
+        ("src/b.bin", 20),
+        ("src/c.tmp", 30),
+        ("src/cache/d.txt", 40),
+        (".git/objects/e.bin", 50),
+        ("f.txt", 60),
+    ):
+        path = root / rel_path
+        path.write_bytes(os.urandom(size))
+        mtime = NOW - size * 86400
+        os.utime(path, (mtime, mtime))
+    return root
+
+
+def names(entries):
+    return sorted(os.path.basename(entry.path) for entry in entries)
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({}, ["a.txt", "b.bin", "c.tmp", "d.txt", "e.bin", "f.txt"]),
+        ({"min_size": 20, "max_size": 40}, ["b.bin", "c.tmp", "d.txt"]),
+        ({"include": ["*.txt"]}, ["a.txt", "d.txt", "f.txt"]),
+        ({"exclude": ["*.tmp", "cache"]}, ["a.txt", "b.bin", "e.bin", "f.txt"]),
+        ({"exclude_dirs": [".git"]}, ["a.txt", "b.bin", "c.tmp", "d.txt", "f.txt"]),
+        ({"exclude_regex": [r"/src/.*\.(bin|tmp)$"]}, ["a.txt", "d.txt", "e.bin", "f.txt"]),
+        # days since modification equal to size
+        ({"min_age": 25 * 86400, "now": NOW}, ["c.tmp", "d.txt", "e.bin", "f.txt"]),
+        ({"max_age": 30 * 86400, "now": NOW}, ["a.txt", "b.bin", "c.tmp"]),
+    ],
+)
+def test_scan_filter(tmp_path, kwargs, expected):
+    root = make_tree(tmp_path / "tree")
+    scan_filter = ScanFilter(**kwargs)
+    _, files = scan(root, scan_filter=scan_filter)
+    assert names(files) == expected
+    _, dir_entries = get_dirs_files(root, recursive=True, scan_filter=scan_filter)
+    assert names(dir_entries) == expected
+    for file_list in (
+        FileList(root, scan_filter=scan_filter),
+        CompactFileList(root, scan_filter=scan_filter),
+    ):
+        assert sorted(file.path.name for file in file_list.file_list) == expected
+
+
+def test_excluded_dir_not_listed(tmp_path, monkeypatch):
+    root = make_tree(tmp_path / "tree")
+    listed = []
+    scandir = os.scandir
+
+    def scandir_denied(path):
+        listed.append(os.fspath(path))
+        if os.path.basename(path) == ".git":
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(scanner_module.os, "scandir", scandir_denied)
+    scanner = Scanner(scan_filter=ScanFilter(exclude_dirs=[".git", "cache"]))
+    dirs, files = scanner.scan(root)
+    assert names(dirs) == ["src"]
+    assert names(files) == ["a.txt", "b.bin", "c.tmp", "f.txt"]
+    assert scanner.errors == []
+    assert sorted(listed) == sorted([os.fspath(root), os.fspath(root / "src")])
+
+
+def test_path_ok():
+    """Already scanned paths, e.g. from manifest, checked with parent dirs."""
+    stat = SnapStat(50, 1, 1, NOW * 10**9, 1)
+    path = os.path.join("project", "node_modules", "pkg", "index.js")
+    assert ScanFilter().path_ok(path, stat)
+    assert not ScanFilter(exclude_dirs=["node_modules"]).path_ok(path, stat)
+    assert not ScanFilter(max_size=49).path_ok(path, stat)
+    assert not ScanFilter(include=["*.py"]).path_ok(path, stat)
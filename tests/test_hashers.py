@@ -0,0 +1,73 @@
+import hashlib
+import os
+import zlib
+
+import pytest
+
+from dup_finder.cache import HashCache
+from dup_finder.core import FileList
+from dup_finder.hashers import Crc32, available_hashers, get_hasher
+
+
+def make_copies(root, num=3, size=5000):
+    root.mkdir(parents=True)
+    data = os.urandom(size)
+    for num_copy in range(num):
+        (root / f"copy_{num_copy}.bin").write_bytes(data)
+    (root / "unique.bin").write_bytes(os.urandom(size))
+    return data
+
+
+def find_dups(file_list):
+    file_list.find_dups_candidates()
+    file_list.find_dups()
+    return file_list._dups
+
+
+def test_get_hasher():
+    assert {"md5", "sha1", "blake2b", "crc32"} <= set(available_hashers())
+    assert get_hasher("md5") is hashlib.md5
+    with pytest.raises(ValueError, match="Unknown hash"):
+        get_hasher("md4x")
+    with pytest.raises(ValueError):
+        FileList(".", hash_name="md4x")
+
+
+def test_crc32():
+    hasher = Crc32(b"abc")
+    hasher.update(b"def")
+    assert hasher.hexdigest() == f"{zlib.crc32(b'abcdef'):08x}"
+
+
+@pytest.mark.parametrize("hash_name", ["md5", "sha1", "blake2b"])
+def test_hash_name(tmp_path, hash_name):
+    data = make_copies(tmp_path / "tree")
+    file_list = FileList(tmp_path / "tree", hash_name=hash_name)
+    file_list.find_dups_candidates()
+    file_list.find_dups(method="hash")
+    dups = file_list._dups
+    assert list(dups[len(data)]) == [hashlib.new(hash_name, data).hexdigest()]
+
+
+def test_mixed_hash_names_rejected(tmp_path):
+    make_copies(tmp_path / "one")
+    make_copies(tmp_path / "two")
+    file_list = FileList(tmp_path / "one", hash_name="md5")
+    with pytest.raises(ValueError, match="Different hashes"):
+        file_list.find_dups_candidates_with(FileList(tmp_path / "two", hash_name="sha1"))
+    with pytest.raises(ValueError, match="Different hashes"):
+        file_list.find_dups_with(FileList(tmp_path / "two", stage_hash_name="md5"))
+    file_list.find_dups_candidates_with(FileList(tmp_path / "two", hash_name="md5"))
+
+
+def test_cache_keeps_hashes_by_name(tmp_path):
+    data = make_copies(tmp_path / "tree")
+    cache = HashCache(tmp_path / "cache.db")
+    find_dups(FileList(tmp_path / "tree", cache=cache, hash_name="md5"))
+    # other full hash - cached stage hashes used, full hashes not
+    cache.hits = cache.misses = 0
+    dups = find_dups(FileList(tmp_path / "tree", cache=cache, hash_name="sha1"))
+    assert list(dups[len(data)]) == [hashlib.sha1(data).hexdigest()]
+    assert cache.hits == 4
+    assert cache.misses == 3
+    cache.close()
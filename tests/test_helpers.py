@@ -0,0 +1,54 @@
+import hashlib
+import os
+
+import pytest
+
+from dup_finder import helpers
+from dup_finder.helpers import adapt_buf_size, hash_file
+
+BUF = 1024
+SIZES = [0, 1, BUF - 1, BUF, BUF + 1, 3 * BUF + 17, 64 * BUF * 3 + 5]
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for size in SIZES:
+        path = tmp_path / f"{size}.bin"
+        path.write_bytes(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def read_hash(path, hash_name="md5"):
+    """Baseline - whole file by file.read."""
+    with open(path, "rb") as file:
+        return hashlib.new(hash_name, file.read()).hexdigest()
+
+
+@pytest.mark.parametrize("hash_name", ["md5", "sha1"])
+def test_readinto_matches_read(files, hash_name):
+    # bigger files first, so smaller ones reuse longer thread buffer
+    for path in sorted(files, key=lambda path: -path.stat().st_size):
+        assert hash_file(path, hash_name, buf_size=BUF) == read_hash(path, hash_name)
+        assert hash_file(path, hash_name) == read_hash(path, hash_name)
+
+
+def test_mmap_matches_read(files, monkeypatch):
+    monkeypatch.setattr(helpers, "MMAP_MIN_SIZE", 0)
+    monkeypatch.setattr(helpers, "MMAP_CHUNK", BUF + 7)
+    for path in files:
+        assert hash_file(path, buf_size=BUF, use_mmap=True) == read_hash(path)
+
+
+def test_drop_cache_chunks(files, monkeypatch):
+    monkeypatch.setattr(helpers, "DROP_CACHE_CHUNK", BUF)
+    for path in files:
+        assert hash_file(path, buf_size=BUF, drop_cache=True) == read_hash(path)
+        assert hash_file(path, buf_size=BUF, drop_cache=False) == read_hash(path)
+
+
+def test_adapt_buf_size():
+    assert adapt_buf_size(0, BUF) == BUF
+    assert adapt_buf_size(64 * BUF * 3 + 5, BUF) == 3 * BUF
+    assert adapt_buf_size(10 ** 12) == helpers.MAX_BUF_SIZE
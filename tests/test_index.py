@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+from dup_finder.core import FileList
+from dup_finder.index import UNKNOWN, BloomFilter, HashIndex, _head_key, _size_key
+
+SIZE = 5000
+
+
+def make_index(root, **kwargs):
+    """Index of two copies, same size and head unique, small file."""
+    root.mkdir(parents=True)
+    data = os.urandom(SIZE)
+    (root / "copy_0.bin").write_bytes(data)
+    (root / "copy_1.bin").write_bytes(data)
+    (root / "same_head.bin").write_bytes(data[:-1] + bytes([data[-1] ^ 1]))
+    (root / "small.bin").write_bytes(b"small")
+    return data, HashIndex.from_file_list(FileList(root), **kwargs)
+
+
+def names(paths):
+    return sorted(path.name for path in paths)
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(1000)
+    keys = [os.urandom(16) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(os.urandom(16) in bloom for _ in range(10000))
+    assert false_positives < 300
+    copy = BloomFilter.from_bytes(bloom.num_bits, bloom.num_hashes, bytes(bloom.bits))
+    assert all(key in copy for key in keys)
+
+
+def test_lookup_path_and_bytes(tmp_path):
+    data, index = make_index(tmp_path / "tree")
+    query = tmp_path / "query.bin"
+    query.write_bytes(data)
+    assert names(index.lookup(query)) == ["copy_0.bin", "copy_1.bin"]
+    assert names(index.lookup(data)) == ["copy_0.bin", "copy_1.bin"]
+    assert names(index.lookup(memoryview(b"small"))) == ["small.bin"]
+    assert data in index
+    assert names(index.lookup(data[:-1] + bytes([data[-1] ^ 1]))) == ["same_head.bin"]
+    assert index.lookup(data[:-1] + bytes([data[-1] ^ 2])) == []
+    assert index.lookup(b"other") == []
+
+
+def test_bloom_negatives_not_hashed(tmp_path, monkeypatch):
+    data, index = make_index(tmp_path / "tree")
+    assert _size_key(SIZE) in index.bloom
+    # size and head hash of query not at filter
+    size = next(size for size in range(SIZE + 1, SIZE + 1000) if _size_key(size) not in index.bloom)
+    head = next(
+        head for head in map(str, range(1000)) if _head_key(SIZE, head) not in index.bloom
+    )
+    hashed = []
+    monkeypatch.setattr(index, "_maps", None)  # maps not touched for negatives
+    monkeypatch.setattr(
+        "dup_finder.index._BytesQuery._hash", lambda self, kind: hashed.append(kind) or head
+    )
+    assert index.lookup(os.urandom(size)) == []
+    assert hashed == []
+    assert index.lookup(os.urandom(SIZE)) == []
+    assert hashed == ["head"]
+    assert index._maps is None
+
+
+def test_add_then_resolve(tmp_path):
+    data, index = make_index(tmp_path / "tree")
+    new = tmp_path / "new.bin"
+    new.write_bytes(data)
+    removed = tmp_path / "removed.bin"
+    removed.write_bytes(data)
+    index.add(new)
+    index.add(removed)
+    fulls = index.maps[SIZE][index._query_hashes(data)[1].head()]
+    # full hashes not known at build
+    assert sorted(os.path.basename(path) for path in fulls[UNKNOWN]) == [
+        "copy_0.bin", "copy_1.bin", "new.bin", "removed.bin"
+    ]
+    removed.unlink()
+    assert names(index.lookup(data)) == ["copy_0.bin", "copy_1.bin", "new.bin"]
+    assert UNKNOWN not in fulls
+    other = tmp_path / "other.bin"
+    other.write_bytes(os.urandom(SIZE + 7))
+    assert index.lookup(other) == []
+    index.add(other)
+    assert names(index.lookup(other)) == ["other.bin"]
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_save_load(tmp_path, lazy):
+    data, index = make_index(tmp_path / "tree")
+    index.save(tmp_path / "index.bin")
+    loaded = HashIndex.load(tmp_path / "index.bin", lazy=lazy)
+    assert loaded.hash_names == index.hash_names
+    assert (loaded._maps is None) == lazy
+    assert "not loaded" in repr(loaded) if lazy else "4 files" in repr(loaded)
+    # size not at filter - maps not loaded
+    size = next(size for size in range(1, 1000) if _size_key(size) not in loaded.bloom)
+    assert loaded.lookup(bytes(size)) == []
+    assert (loaded._maps is None) == lazy
+    assert loaded.maps == index.maps
+    assert names(loaded.lookup(data)) == ["copy_0.bin", "copy_1.bin"]
+    with open(tmp_path / "bad.bin", "wb") as file:
+        file.write(b"XXXX" + bytes(8))
+    with pytest.raises(ValueError):
+        HashIndex.load(tmp_path / "bad.bin")
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from dup_finder import parallel
+from dup_finder.core import DupGroup, FileList
+
+SIZES = (100000, 40000, 5000, 10)
+
+
+def make_tree(root):
+    """Dups of some sizes, same size uniques."""
+    root.mkdir(parents=True)
+    for size in SIZES:
+        data = os.urandom(size)
+        for num in range(3):
+            (root / f"copy_{size}_{num}.bin").write_bytes(data)
+        (root / f"unique_{size}.bin").write_bytes(os.urandom(size))
+    return root
+
+
+def groups_of(dups):
+    return sorted((group.size, sorted(group.paths)) for group in dups)
+
+
+def test_iter_dups_matches_find_dups(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = FileList(root)
+    file_list.find_dups_candidates(stages=("head", "tail"))
+    file_list.find_dups(method="hash")
+    expected = sorted(
+        (size, sorted(file_list.file_list[idx].path for idx in group))
+        for size, hash_dict in file_list._dups.items()
+        for group in hash_dict.values()
+    )
+    for window in (1, 5, 256):
+        dups = list(FileList(root).iter_dups(("head", "tail"), method="hash", window=window))
+        assert [group.size for group in dups] == list(SIZES)
+        assert groups_of(dups) == expected
+
+
+def test_window_batches_hashing(tmp_path, monkeypatch):
+    root = make_tree(tmp_path / "tree")
+    file_list = FileList(root, workers=2)
+    calls = []
+    hash_idx = file_list._hash_idx
+
+    def spy(idx_list, kind):
+        calls.append((kind, len(idx_list)))
+        return hash_idx(idx_list, kind)
+
+    monkeypatch.setattr(file_list, "_hash_idx", spy)
+    assert len(list(file_list.iter_dups(method="hash"))) == 4
+    assert calls == [("head", 16), ("full", 12)]
+    calls.clear()
+    assert len(list(file_list.iter_dups(method="hash", window=8))) == 4
+    assert calls == [("head", 8), ("full", 6)] * 2
+    file_list.close()
+
+
+def test_stop_early(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = FileList(root)
+    dups = file_list.iter_dups(method="hash", window=4)
+    group = next(dups)
+    assert group.size == SIZES[0]
+    dups.close()
+    hashed = {file.size for file in file_list.file_list if file.cached_hash("full") is not None}
+    assert hashed == {SIZES[0]}
+
+
+def test_dup_group_keys(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = FileList(root, hash_name="md5")
+    for group in file_list.iter_dups(method="hash"):
+        assert group.hash is not None and group.compare_key is None
+        assert group.hash_name == "md5"
+    for group in file_list.iter_dups(method="compare"):
+        assert group.hash is None and group.compare_key.startswith("cmp-")
+        assert group.hash_name is None
+    assert DupGroup.from_key(10, "abc", [], "md5") == DupGroup(10, "abc", [], None, "md5")
+
+
+def test_aiter_dups(tmp_path):
+    root = make_tree(tmp_path / "tree")
+
+    async def collect():
+        return [group async for group in FileList(root).aiter_dups(method="hash")]
+
+    dups = asyncio.run(collect())
+    assert groups_of(dups) == groups_of(FileList(root).iter_dups(method="hash"))
+
+
+def test_aiter_dups_cancel(tmp_path, monkeypatch):
+    root = make_tree(tmp_path / "tree")
+    hash_file = parallel.HASH_FUNCS["full"]
+
+    def slow_hash(*args):
+        time.sleep(0.05)
+        return hash_file(*args)
+
+    monkeypatch.setitem(parallel.HASH_FUNCS, "full", slow_hash)
+
+    async def first_group():
+        dups = FileList(root).aiter_dups(method="hash")
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(dups.__anext__(), 0.01)
+        await dups.aclose()
+
+    asyncio.run(first_group())
@@ -0,0 +1,75 @@
+import os
+
+from dup_finder.core import FileList, count_dups_size
+
+SIZE = 5000
+
+
+def make_tree(root):
+    """Kept copy, copy with second hardlink, unique file."""
+    root.mkdir(parents=True)
+    data = os.urandom(SIZE)
+    (root / "k.bin").write_bytes(data)
+    (root / "copy.bin").write_bytes(data)
+    os.link(root / "copy.bin", root / "copy_link.bin")
+    (root / "unique.bin").write_bytes(os.urandom(SIZE + 1))
+    return root
+
+
+def find_dups(file_list):
+    file_list.find_dups_candidates()
+    file_list.find_dups(method="hash")
+    return file_list
+
+
+def names(file_list, idx_list):
+    return sorted(file_list.file_list[idx].path.name for idx in idx_list)
+
+
+def test_links_collapsed(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = FileList(root)
+    assert len(file_list) == 4
+    assert len(file_list.size2idx[SIZE]) == 2
+    [(first, links)] = file_list.links.items()
+    assert names(file_list, [first, *links]) == ["copy.bin", "copy_link.bin"]
+    file_list = FileList(root, collapse_links=False)
+    assert len(file_list.size2idx[SIZE]) == 3
+    assert file_list.links == {}
+
+
+def test_dups_size_without_links(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = find_dups(FileList(root))
+    [group] = file_list._dups[SIZE].values()
+    assert len(group) == 2
+    assert count_dups_size(file_list._dups) == SIZE
+    # only link to same inode - no dups
+    (root / "k.bin").unlink()
+    file_list = FileList(root)
+    file_list.find_dups_candidates()
+    assert file_list._size_head_hash_candidates == {}
+
+
+def test_move_dups_moves_links(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = find_dups(FileList(root))
+    file_list.move_dups(tmp_path / "moved")
+    assert sorted(os.listdir(root)) == ["k.bin", "unique.bin"]
+    assert sorted(os.listdir(tmp_path / "moved" / "tree")) == ["copy.bin", "copy_link.bin"]
+    assert len(file_list) == 2
+
+
+def test_link_dups_hardlink(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    (root / "copy_2.bin").write_bytes((root / "k.bin").read_bytes())
+    file_list = find_dups(FileList(root))
+    file_list.link_dups("hardlink")
+    inodes = {
+        (root / name).stat().st_ino for name in ("k.bin", "copy.bin", "copy_link.bin", "copy_2.bin")
+    }
+    assert inodes == {(root / "k.bin").stat().st_ino}
+    assert (root / "k.bin").stat().st_nlink == 4
+    assert (root / "copy.bin").read_bytes() == (root / "k.bin").read_bytes()
+    file_list = FileList(root)
+    assert len(file_list.size2idx[SIZE]) == 1
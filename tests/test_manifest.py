@@ -0,0 +1,28 @@
+import os
+
+from dup_finder.core import FileList
+from dup_finder.manifest import normalize_groups, run_sharded, scan_manifest
+
+
+def make_tree(root):
+    """Tree with dups groups of different sizes at nested dirs and unique files."""
+    contents = [os.urandom(size) for size in (10, 5000, 40000, 100000)]
+    for num_dir in range(3):
+        dir_path = root / f"d{num_dir}" / "sub"
+        dir_path.mkdir(parents=True)
+        for num, data in enumerate(contents):
+            (dir_path / f"copy_{num}.bin").write_bytes(data)
+        (dir_path / "unique.bin").write_bytes(os.urandom(5000))
+    # same size and head, other content
+    (root / "same_head.bin").write_bytes(contents[3][:-1] + bytes([contents[3][-1] ^ 1]))
+    return root
+
+
+def test_run_sharded_matches_file_list(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    manifest = tmp_path / "manifest.jsonl.gz"
+    scan_manifest(root, manifest)
+    groups = run_sharded(manifest, 3, tmp_path / "work", workers=2)
+    expected = normalize_groups(FileList(root).iter_dups(method="hash"))
+    assert len(groups) == 4
+    assert groups == expected
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from dup_finder.multi import MultiFileList
+
+
+def make_roots(tmp_path):
+    """Roots a, b and a/inner: x at a and b, y twice at a/inner, z at a and a/inner."""
+    root_a, root_b = tmp_path / "a", tmp_path / "b"
+    inner = root_a / "inner"
+    inner.mkdir(parents=True)
+    root_b.mkdir()
+    x_data, y_data, z_data = (os.urandom(size) for size in (1000, 2000, 3000))
+    (root_a / "x.bin").write_bytes(x_data)
+    (root_b / "x.bin").write_bytes(x_data)
+    (inner / "y_0.bin").write_bytes(y_data)
+    (inner / "y_1.bin").write_bytes(y_data)
+    (root_a / "z.bin").write_bytes(z_data)
+    (inner / "z.bin").write_bytes(z_data)
+    return root_a, root_b, inner
+
+
+def find_dups(file_list):
+    file_list.find_dups_candidates()
+    file_list.find_dups(method="hash")
+    return file_list
+
+
+def test_nested_roots_scanned_once(tmp_path):
+    roots = make_roots(tmp_path)
+    file_list = MultiFileList(roots)
+    assert len(file_list) == 6
+    assert len({file.path for file in file_list.file_list}) == 6
+    assert file_list.roots == list(roots)
+    # same root twice
+    assert len(MultiFileList([roots[1], roots[1]])) == 1
+
+
+def test_root_of_deepest(tmp_path):
+    root_a, root_b, inner = make_roots(tmp_path)
+    file_list = MultiFileList([inner, root_a, root_b])
+    assert file_list.root_of(inner / "y_0.bin") == inner
+    assert file_list.root_of(root_a / "z.bin") == root_a
+    assert file_list.root_of(root_b / "x.bin") == root_b
+    with pytest.raises(ValueError):
+        file_list.root_of(tmp_path / "other.bin")
+
+
+def test_dups_by_root(tmp_path):
+    root_a, root_b, inner = make_roots(tmp_path)
+    file_list = find_dups(MultiFileList([root_a, root_b, inner]))
+    groups = {group.size: group for group in file_list.dups_by_root()}
+    assert sorted(groups) == [1000, 2000, 3000]
+    assert groups[1000].roots == {root_a: [root_a / "x.bin"], root_b: [root_b / "x.bin"]}
+    assert list(groups[2000].roots) == [inner]
+    assert sorted(groups[3000].roots) == [root_a, inner]
+    cross = file_list.dups_by_root(cross_only=True)
+    assert sorted(group.size for group in cross) == [1000, 3000]
+    streamed = file_list.iter_dups_by_root(cross_only=True, method="hash")
+    assert sorted(group.size for group in streamed) == [1000, 3000]
+
+
+def test_empty_roots(tmp_path):
+    (tmp_path / "empty").mkdir()
+    file_list = MultiFileList([tmp_path / "empty"])
+    assert len(file_list) == 0
+    assert "0 files" in repr(file_list)
+    with pytest.raises(ValueError):
+        MultiFileList([])
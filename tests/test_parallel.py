@@ -0,0 +1,59 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dup_finder.core import FileList
+
+
+def make_tree(root):
+    """Dups of some sizes, same size uniques and same head other content."""
+    root.mkdir(parents=True)
+    for size in (10, 5000, 40000):
+        data = os.urandom(size)
+        for num in range(3):
+            (root / f"copy_{size}_{num}.bin").write_bytes(data)
+        (root / f"unique_{size}.bin").write_bytes(os.urandom(size))
+    data = os.urandom(100000)
+    (root / "head_0.bin").write_bytes(data)
+    (root / "head_1.bin").write_bytes(data[:-1] + bytes([data[-1] ^ 1]))
+    return root
+
+
+def find_dups(file_list):
+    file_list.find_dups_candidates()
+    file_list.find_dups()
+    return file_list._dups
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_matches_serial(tmp_path, executor):
+    root = make_tree(tmp_path / "tree")
+    expected = find_dups(FileList(root))
+    assert len(expected) == 3
+    with FileList(root, workers=2, executor=executor) as file_list:
+        assert find_dups(file_list) == expected
+
+
+def test_executor_instance_kept(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        file_list = FileList(root, executor=pool)
+        find_dups(file_list)
+        assert file_list._pool is pool
+        file_list.close()
+        assert pool.submit(sum, [1, 2]).result() == 3
+
+
+def test_close_shuts_down_own_pool(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = FileList(root, workers=2)
+    find_dups(file_list)
+    pool = file_list._pool
+    assert pool is not None
+    # one pool for all stages
+    file_list.find_dups_candidates()
+    assert file_list._pool is pool
+    file_list.close()
+    with pytest.raises(RuntimeError):
+        pool.submit(sum, [1, 2])
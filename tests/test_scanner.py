@@ -0,0 +1,95 @@
+import os
+import tempfile
+
+import pytest
+
+from dup_finder import scanner as scanner_module
+from dup_finder.scanner import Scanner, scan
+
+
+def make_tree(root):
+    """Nested dirs with files, symlinks to file and dir, loop link to root."""
+    for num in range(3):
+        dir_path = root / f"d{num}" / "sub" / "subsub"
+        dir_path.mkdir(parents=True)
+        for level in (dir_path, dir_path.parent, dir_path.parent.parent):
+            (level / f"file_{num}.txt").write_text(str(level))
+    (root / "d0" / "link_file").symlink_to(root / "d1" / "file_1.txt")
+    (root / "d0" / "link_dir").symlink_to(root / "d2")
+    (root / "d1" / "loop").symlink_to(root)
+    return root
+
+
+def paths(entries):
+    return sorted(entry.path for entry in entries)
+
+
+def test_symlinks_skipped(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    dirs, files = scan(root)
+    assert len(dirs) == 9
+    assert len(files) == 9
+    names = {os.path.basename(path) for path in paths(dirs + files)}
+    assert not names & {"link_file", "link_dir", "loop"}
+
+
+def test_follow_symlinks_loop(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    _, files = scan(root, follow_symlinks=True)
+    # link to file listed, dir loop and linked dir (already walked) not descended
+    assert len(files) == 10
+    assert os.path.join(root, "d0", "link_file") in paths(files)
+    assert len({(entry.stat.st_dev, entry.stat.st_ino) for entry in files}) == 9
+
+
+def test_non_recursive(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    dirs, files = scan(root / "d0", recursive=False)
+    assert paths(dirs) == [os.path.join(root, "d0", "sub")]
+    assert paths(files) == [os.path.join(root, "d0", "file_0.txt")]
+
+
+def test_same_device(tmp_path):
+    if not os.path.isdir("/dev/shm"):
+        pytest.skip("no /dev/shm")
+    with tempfile.TemporaryDirectory(dir="/dev/shm") as other:
+        if os.stat(other).st_dev == os.stat(tmp_path).st_dev:
+            pytest.skip("/dev/shm at same device")
+        with open(os.path.join(other, "other.txt"), "w") as file:
+            file.write("other")
+        (tmp_path / "mount").symlink_to(other)
+        (tmp_path / "file.txt").write_text("file")
+        _, files = scan(tmp_path, follow_symlinks=True)
+        assert len(files) == 2
+        _, files = scan(tmp_path, follow_symlinks=True, same_device=True)
+        assert paths(files) == [os.path.join(tmp_path, "file.txt")]
+
+
+@pytest.mark.parametrize("follow_symlinks", [False, True])
+def test_parallel_matches_serial(tmp_path, follow_symlinks):
+    root = make_tree(tmp_path / "tree")
+    dirs, files = scan(root, follow_symlinks=follow_symlinks)
+    dirs_par, files_par = scan(root, follow_symlinks=follow_symlinks, workers=4)
+    assert paths(dirs_par) == paths(dirs)
+    if follow_symlinks:  # path of linked dir depends on listing order
+        assert len(files_par) == len(files)
+    else:
+        assert paths(files_par) == paths(files)
+
+
+def test_unlistable_dir_at_errors(tmp_path, monkeypatch):
+    root = make_tree(tmp_path / "tree")
+    denied = os.path.join(root, "d1", "sub")
+    scandir = os.scandir
+
+    def scandir_denied(path):
+        if path == denied:
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(scanner_module.os, "scandir", scandir_denied)
+    scanner = Scanner()
+    _, files = scanner.scan(root)
+    assert len(files) == 7
+    assert [path for path, _ in scanner.errors] == [denied]
+    assert isinstance(scanner.errors[0][1], PermissionError)
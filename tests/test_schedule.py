@@ -0,0 +1,87 @@
+import os
+import threading
+
+import pytest
+
+from dup_finder.core import FileList
+from dup_finder.schedule import DeviceScheduler
+
+
+class FakeFile:
+    """HashItem at device dev with inode ino, reads recorded at `reads`."""
+
+    def __init__(self, dev, ino, reads):
+        self.path = f"/dev{dev}/file{ino}"
+        self.dev = dev
+        self.ino = ino
+        self.hash_names = {"full": "md5"}
+        self.reads = reads
+        self.hash = None
+
+    def cached_hash(self, kind):
+        return self.hash
+
+    def get_hash(self, kind):
+        self.reads.append((self.dev, self.ino, threading.current_thread().name))
+        self.hash = f"{self.dev}-{self.ino}"
+        return self.hash
+
+
+def make_files(reads):
+    inodes = [5, 3, 9, 1, 7]
+    return [FakeFile(dev, ino, reads) for ino in inodes for dev in (1, 2)]
+
+
+@pytest.mark.parametrize("order, expected", [
+    ("inode", [1, 3, 5, 7, 9]),
+    ("none", [5, 3, 9, 1, 7]),
+])
+def test_order(order, expected):
+    reads = []
+    files = make_files(reads)
+    with DeviceScheduler(order=order, limits={1: 1, 2: 1}) as scheduler:
+        assert list(scheduler.run(files, "full")) == files
+    for dev in (1, 2):
+        assert [ino for read_dev, ino, _ in reads if read_dev == dev] == expected
+    assert all(file.hash == f"{file.dev}-{file.ino}" for file in files)
+
+
+def test_limits_override():
+    scheduler = DeviceScheduler(hdd_workers=1, ssd_workers=3, limits={7: 2})
+    assert scheduler.workers(7) == 2
+    assert scheduler.workers(os.stat(".").st_dev) in (1, 3)
+    with pytest.raises(ValueError):
+        DeviceScheduler(order="random")
+
+
+def test_pool_per_device_and_close():
+    reads = []
+    files = make_files(reads)
+    scheduler = DeviceScheduler(order="none", limits={1: 1, 2: 2})
+    list(scheduler.run(files[:4], "full"))
+    pools = dict(scheduler._pools)
+    assert sorted(pools) == [1, 2]
+    assert pools[1]._max_workers == 1 and pools[2]._max_workers == 2
+    list(scheduler.run(files[4:], "full"))
+    assert scheduler._pools == pools  # reused
+    # cached hashes not read again
+    reads.clear()
+    assert list(scheduler.run(files, "full")) == files
+    assert reads == []
+    scheduler.close()
+    assert scheduler._pools == {}
+    assert all(pool._shutdown for pool in pools.values())
+
+
+def test_file_list_with_scheduler(tmp_path):
+    data = os.urandom(5000)
+    for num in range(3):
+        (tmp_path / f"copy_{num}.bin").write_bytes(data)
+    (tmp_path / "unique.bin").write_bytes(os.urandom(5000))
+    with DeviceScheduler(order="inode") as scheduler:
+        file_list = FileList(tmp_path, scheduler=scheduler, workers=4)
+        dups = list(file_list.iter_dups(method="hash"))
+        assert file_list._pool is None
+    assert [sorted(path.name for path in group.paths) for group in dups] == [
+        ["copy_0.bin", "copy_1.bin", "copy_2.bin"]
+    ]
@@ -0,0 +1,101 @@
+import os
+import shutil
+
+from dup_finder.compact import CompactFileList
+from dup_finder.core import FileList
+
+
+def make_tree(root):
+    """Copies at a, sub dirs b and b/c, times set back so later change seen at dir mtime."""
+    sub = root / "b" / "c"
+    sub.mkdir(parents=True)
+    data = os.urandom(5000)
+    for dir_path in (root / "a", root / "b"):
+        dir_path.mkdir(exist_ok=True)
+        (dir_path / "copy.bin").write_bytes(data)
+    (sub / "unique.bin").write_bytes(os.urandom(3000))
+    for dir_path, _, names in os.walk(root):
+        for name in [*names, "."]:
+            path = os.path.join(dir_path, name)
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**10))
+    return root
+
+
+def snapshot_of(root, snapshot):
+    file_list = FileList(root, snapshot=snapshot)
+    file_list.find_dups_candidates()
+    file_list.find_dups(method="hash")
+    file_list.save_snapshot()
+    return file_list
+
+
+def test_unchanged(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    snapshot = tmp_path / "snap.json.gz"
+    assert snapshot_of(root, snapshot).changed_sizes is None
+    file_list = FileList(root, snapshot=snapshot, verify_files=True)
+    assert file_list.changed_sizes == set()
+    assert len(file_list) == 3
+
+
+def test_changed_sizes_added(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    snapshot = tmp_path / "snap.json.gz"
+    snapshot_of(root, snapshot)
+    (root / "b" / "c" / "new.bin").write_bytes(os.urandom(700))
+    file_list = FileList(root, snapshot=snapshot)
+    assert file_list.changed_sizes == {700}
+    assert len(file_list) == 4
+
+
+def test_changed_sizes_modified_in_place(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    snapshot = tmp_path / "snap.json.gz"
+    snapshot_of(root, snapshot)
+    (root / "a" / "copy.bin").write_bytes(os.urandom(4000))
+    # dir mtime not changed - seen only with verify_files
+    assert FileList(root, snapshot=snapshot).changed_sizes == set()
+    file_list = FileList(root, snapshot=snapshot, verify_files=True)
+    assert file_list.changed_sizes == {4000, 5000}
+    assert sorted(file.size for file in file_list.file_list) == [3000, 4000, 5000]
+
+
+def test_changed_sizes_removed_dir(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    snapshot = tmp_path / "snap.json.gz"
+    snapshot_of(root, snapshot)
+    shutil.rmtree(root / "b")
+    file_list = FileList(root, snapshot=snapshot)
+    assert file_list.changed_sizes == {3000, 5000}
+    assert len(file_list) == 1
+
+
+def test_hashes_restored(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    snapshot = tmp_path / "snap.json.gz"
+    snapshot_of(root, snapshot)
+    (root / "b" / "copy.bin").write_bytes(os.urandom(5000))
+    for file_list in (
+        FileList(root, snapshot=snapshot, verify_files=True),
+        CompactFileList(root, snapshot=snapshot, verify_files=True),
+    ):
+        hashed = {
+            os.path.relpath(file.path, root): file.cached_hash("full") is not None
+            for file in file_list.file_list
+        }
+        assert hashed == {
+            os.path.join("a", "copy.bin"): True,
+            os.path.join("b", "copy.bin"): False,
+            os.path.join("b", "c", "unique.bin"): False,
+        }
+    assert file_list.changed_sizes == {5000}
+
+
+def test_other_hash_name_not_restored(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    snapshot = tmp_path / "snap.json.gz"
+    snapshot_of(root, snapshot)
+    file_list = FileList(root, snapshot=snapshot, hash_name="sha1")
+    assert all(file.cached_hash("full") is None for file in file_list.file_list)
+    assert any(file.cached_hash("head") is not None for file in file_list.file_list)
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from dup_finder.core import FileList
+from dup_finder.scanner import scan
+from dup_finder.spill import SizeRuns, SpilledFileList
+
+
+def make_tree(root):
+    """Dups of many sizes at nested dirs, same size uniques, hardlink."""
+    for num_dir in range(4):
+        dir_path = root / f"d{num_dir}" / "sub"
+        dir_path.mkdir(parents=True)
+        for size in range(100, 2100, 100):
+            data = bytes([size % 251]) * size
+            (dir_path / f"copy_{size}.bin").write_bytes(data)
+            if num_dir == 0:
+                (dir_path / f"unique_{size}.bin").write_bytes(os.urandom(size))
+    os.link(root / "d0" / "sub" / "copy_100.bin", root / "link_100.bin")
+    (root / "single.bin").write_bytes(os.urandom(5000))
+    return root
+
+
+def groups_of(dups):
+    return sorted((group.size, sorted(group.paths)) for group in dups)
+
+
+def test_size_runs(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    _, files = scan(root)
+    runs = SizeRuns(run_size=7, tmp_dir=tmp_path)
+    runs.add(files)
+    buckets = list(runs.buckets())
+    assert len(runs.runs) == -(-len(files) // 7)
+    assert [size for size, _ in buckets] == list(range(2000, 0, -100))
+    assert sum(len(bucket) for _, bucket in buckets) == len(files) - 1
+    assert sorted(runs.buckets(min_len=1))[0][0] == 100
+    runs.close()
+    assert not runs.dir.exists()
+
+
+@pytest.mark.parametrize("load_candidates", [True, False])
+def test_spilled_matches_file_list(tmp_path, load_candidates):
+    root = make_tree(tmp_path / "tree")
+    expected = groups_of(FileList(root).iter_dups(method="hash"))
+    assert len(expected) == 20
+    with SpilledFileList(
+        root, load_candidates=load_candidates, run_size=5, tmp_dir=tmp_path
+    ) as file_list:
+        for window in (1, 10, 256):
+            dups = list(file_list.iter_dups(method="hash", window=window))
+            assert [group.size for group in dups] == sorted(
+                (group.size for group in dups), reverse=True
+            )
+            assert groups_of(dups) == expected
+        assert groups_of(file_list.iter_dups(sizes=[100, 200], method="hash")) == expected[:2]
+        assert len(file_list.size_runs.runs) > 1
+    assert not file_list.size_runs.dir.exists()
+
+
+def test_snapshot_not_supported(tmp_path):
+    with pytest.raises(ValueError):
+        SpilledFileList(tmp_path, snapshot=tmp_path / "snap.json.gz")
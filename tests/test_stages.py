@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from dup_finder.core import FileList
+from dup_finder.helpers import SAMPLE_NUM, SAMPLE_SIZE, sample_offsets, sample_read_size
+
+SIZE = 100000
+
+
+def make_tree(root):
+    """Same size and head files: copies, other tail, other sampled block, other
+    byte outside of samples.
+    """
+    root.mkdir(parents=True)
+    data = bytearray(os.urandom(SIZE))
+    for num in range(2):
+        (root / f"copy_{num}.bin").write_bytes(data)
+    (root / "tail.bin").write_bytes(data[:-1] + bytes([data[-1] ^ 1]))
+    offset = sample_offsets(SIZE)[3]
+    (root / "sample.bin").write_bytes(data[:offset] + bytes([data[offset] ^ 1]) + data[offset + 1:])
+    offset -= 1  # before sampled block, found only by full hash
+    (root / "middle.bin").write_bytes(data[:offset] + bytes([data[offset] ^ 1]) + data[offset + 1:])
+    return root
+
+
+def candidates(file_list):
+    return sorted(
+        sorted(file_list.file_list[idx].path.name for idx in group)
+        for hash_dict in file_list._size_head_hash_candidates.values()
+        for group in hash_dict.values()
+    )
+
+
+def test_stages_split_groups(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = FileList(root)
+    file_list.find_dups_candidates(stages=("head",))
+    assert len(candidates(file_list)[0]) == 5
+    file_list.find_dups_candidates(stages=("head", "tail"))
+    assert candidates(file_list) == [["copy_0.bin", "copy_1.bin", "middle.bin", "sample.bin"]]
+    file_list.find_dups_candidates(stages=("head", "tail", "sample"))
+    assert candidates(file_list) == [["copy_0.bin", "copy_1.bin", "middle.bin"]]
+    file_list.find_dups()
+    assert [len(group) for group in file_list._dups[SIZE].values()] == [2]
+
+
+def test_stages_stats(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = FileList(root)
+    file_list.find_dups_candidates(stages=("head", "tail", "sample"))
+    stats = {
+        kind: (file_list.stats[kind].files, file_list.stats[kind].bytes,
+               file_list.stats[kind].dropped, file_list.stats[kind].saved)
+        for kind in ("head", "tail", "sample")
+    }
+    assert stats == {
+        "head": (5, 5 * 32768, 0, 0),
+        "tail": (5, 5 * 32768, 1, SIZE),
+        "sample": (4, 4 * SAMPLE_NUM * SAMPLE_SIZE, 1, SIZE),
+    }
+
+
+def test_unknown_stage(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    with pytest.raises(ValueError):
+        FileList(root).find_dups_candidates(stages=("middle",))
+
+
+@pytest.mark.parametrize("size", [1, SAMPLE_SIZE, SAMPLE_SIZE + 1, SAMPLE_SIZE + 9, 20000, SIZE])
+def test_sample_offsets(size):
+    offsets = sample_offsets(size)
+    assert offsets == sorted(set(offsets))
+    assert len(offsets) <= SAMPLE_NUM
+    assert all(0 <= offset and offset + SAMPLE_SIZE <= max(size, SAMPLE_SIZE)
+               for offset in offsets)
+
+
+def test_sample_offsets_small():
+    assert sample_offsets(SAMPLE_SIZE) == [0]
+    assert sample_offsets(SAMPLE_SIZE + 1) == [0]
+    assert sample_offsets(SAMPLE_SIZE + 9) == list(range(1, 9))
+    assert len(sample_offsets(SIZE)) == SAMPLE_NUM
+
+
+@pytest.mark.parametrize(
+    "size, read",
+    [
+        (0, 0),
+        (10, 10),
+        (SAMPLE_SIZE, SAMPLE_SIZE),
+        (SAMPLE_SIZE + 1, SAMPLE_SIZE),  # last byte not read
+        (SAMPLE_SIZE + 9, SAMPLE_SIZE + 7),  # first and last bytes not read
+        (SIZE, SAMPLE_NUM * SAMPLE_SIZE),
+    ],
+)
+def test_sample_read_size(size, read):
+    assert sample_read_size(size) == read
+
+
+def test_sample_read_size_covered():
+    """Bytes at sampled blocks, overlapping blocks counted once."""
+    for size in (SAMPLE_SIZE + 1, SAMPLE_SIZE + 100, 20000, SIZE):
+        offsets = sample_offsets(size)
+        covered = set()
+        for offset in offsets:
+            covered.update(range(offset, min(offset + SAMPLE_SIZE, size)))
+        assert sample_read_size(size) == len(covered)
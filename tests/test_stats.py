@@ -0,0 +1,93 @@
+import os
+
+from dup_finder.cache import HashCache
+from dup_finder.core import FileList
+from dup_finder.stats import RunStats
+
+SIZE = 50000
+
+
+def make_tree(root):
+    """Three copies, same size unique, small unique."""
+    root.mkdir(parents=True)
+    data = os.urandom(SIZE)
+    for num in range(3):
+        (root / f"copy_{num}.bin").write_bytes(data)
+    (root / "unique.bin").write_bytes(os.urandom(SIZE))
+    (root / "small.bin").write_bytes(os.urandom(10))
+    return root
+
+
+def find_dups(file_list):
+    file_list.find_dups_candidates(stages=("head", "tail"))
+    file_list.find_dups(method="hash")
+    return file_list
+
+
+def test_stage_counters(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = find_dups(FileList(root))
+    stats = file_list.stats
+    assert list(stats.stages) == ["scan", "group", "head", "tail", "full"]
+    assert (stats["scan"].files, stats["scan"].bytes) == (5, 0)
+    assert stats["group"].files == 5
+    assert (stats["head"].files, stats["head"].dropped) == (4, 1)
+    assert (stats["tail"].files, stats["tail"].dropped) == (3, 0)
+    assert (stats["full"].files, stats["full"].bytes) == (3, 3 * SIZE)
+    dev = os.stat(root).st_dev
+    assert stats["full"].devices == {dev: [3, 3 * SIZE]}
+    assert all(stage.runs == 1 and stage.wall >= 0 for stage in stats.stages.values())
+    assert stats.as_dict()["full"]["devices"] == {str(dev): {"files": 3, "bytes": 3 * SIZE}}
+
+
+def test_iter_dups_stats(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    file_list = FileList(root)
+    assert len(list(file_list.iter_dups(("head",), method="hash"))) == 1
+    assert (file_list.stats["full"].files, file_list.stats["full"].bytes) == (3, 3 * SIZE)
+
+
+def test_cache_counters(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    cache = HashCache(tmp_path / "cache.db")
+    find_dups(FileList(root, cache=cache))
+    file_list = find_dups(FileList(root, cache=cache))
+    assert file_list.stats["head"].cache_hits == 4
+    assert file_list.stats["full"].cache_hits == 3
+    assert file_list.stats["full"].cache_misses == 0
+    cache.close()
+
+
+def test_hooks(tmp_path):
+    root = make_tree(tmp_path / "tree")
+    seen = []
+    file_list = find_dups(FileList(root, hooks=[lambda stats: seen.append(stats.name)]))
+    assert seen == ["scan", "group", "head", "tail", "full"]
+    file_list.move_dups(tmp_path / "moved")
+    assert seen[-1] == "move"
+    assert file_list.stats["move"].files == 2
+
+
+def test_run_stats():
+    stats = RunStats()
+    with stats.stage("read") as stage:
+        stage.add(1, 100)
+        stage.add(2, 50)
+    with stats.stage("read") as stage:
+        stage.add(1, 10)
+    assert "read" in stats and "other" not in stats
+    assert stats["read"].runs == 2
+    assert (stats["read"].files, stats["read"].bytes) == (3, 160)
+    assert stats["read"].devices == {1: [2, 110], 2: [1, 50]}
+    stats.reset()
+    assert stats.stages == {}
+
+
+def test_quiet(tmp_path, capsys):
+    root = make_tree(tmp_path / "tree")
+    file_list = find_dups(FileList(root, verbose=False))
+    file_list.move_dups(tmp_path / "moved")
+    list(FileList(root, verbose=False).iter_dups())
+    assert capsys.readouterr().out == ""
+    find_dups(FileList(root))
+    assert capsys.readouterr().out != ""
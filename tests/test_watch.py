@@ -0,0 +1,108 @@
+import os
+import sys
+
+import pytest
+
+from dup_finder.watch import IN_Q_OVERFLOW, Event, Inotify, LiveIndex
+
+SIZE = 5000
+
+
+@pytest.fixture
+def inotify_ok():
+    if not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux only")
+    try:
+        Inotify().close()
+    except (OSError, AttributeError) as exception:
+        pytest.skip(f"inotify not available: {exception}")
+
+
+def make_tree(root):
+    """Dir with kept copy and unique file, empty sub dir."""
+    (root / "sub").mkdir(parents=True)
+    data = os.urandom(SIZE)
+    (root / "kept.bin").write_bytes(data)
+    (root / "unique.bin").write_bytes(os.urandom(SIZE))
+    return data
+
+
+def settle(index):
+    """Process events until none left."""
+    while index.process_events(timeout=0.2):
+        pass
+
+
+def names(index):
+    return [sorted(os.path.basename(path) for path in group.paths) for group in index.dups()]
+
+
+def test_create_and_delete(tmp_path, inotify_ok):
+    root = tmp_path / "tree"
+    data = make_tree(root)
+    found = []
+    with LiveIndex(root, on_dups=found.append) as index:
+        assert index.dups() == []
+        with open(root / "sub" / "copy.bin", "wb") as file:
+            file.write(data[:10])
+            file.flush()
+            settle(index)  # not indexed until closed
+            assert index.dups() == []
+            file.write(data[10:])
+        settle(index)
+        assert names(index) == [["copy.bin", "kept.bin"]]
+        assert [group.size for group in found] == [SIZE]
+        assert found[0].hash_name == index.hash_names["full"]
+        (root / "kept.bin").unlink()
+        settle(index)
+        assert index.dups() == []
+        assert len(index.files) == 2
+
+
+def test_move_in_and_out(tmp_path, inotify_ok):
+    root = tmp_path / "tree"
+    data = make_tree(root)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "copy.bin").write_bytes(data)
+    with LiveIndex(root) as index:
+        os.rename(outside / "copy.bin", root / "sub" / "copy.bin")
+        settle(index)
+        assert names(index) == [["copy.bin", "kept.bin"]]
+        os.rename(root / "sub" / "copy.bin", outside / "copy.bin")
+        settle(index)
+        assert index.dups() == []
+        assert os.fspath(root / "sub" / "copy.bin") not in index.files
+
+
+def test_dir_created_with_files(tmp_path, inotify_ok):
+    root = tmp_path / "tree"
+    data = make_tree(root)
+    with LiveIndex(root) as index:
+        new_dir = root / "new" / "deep"
+        new_dir.mkdir(parents=True)
+        (new_dir / "copy.bin").write_bytes(data)
+        os.link(new_dir / "copy.bin", root / "new" / "link.bin")
+        settle(index)
+        assert names(index) == [["copy.bin", "kept.bin"]]
+        assert os.fspath(root / "new" / "link.bin") in index.files
+        assert os.fspath(new_dir) in index.dir2wd
+
+
+def test_overflow_rebuild(tmp_path, inotify_ok, monkeypatch):
+    root = tmp_path / "tree"
+    data = make_tree(root)
+    with LiveIndex(root) as index:
+        # changes made while events lost
+        monkeypatch.setattr(index.inotify, "read", lambda timeout: [])
+        (root / "sub" / "copy.bin").write_bytes(data)
+        assert index.process_events() == 0
+        assert index.dups() == []
+        overflow = [Event(-1, IN_Q_OVERFLOW, 0, "")]
+        monkeypatch.setattr(index.inotify, "read", lambda timeout: overflow)
+        built = []
+        build = index.build
+        monkeypatch.setattr(index, "build", lambda: built.append(build()))
+        assert index.process_events() == 1
+        assert len(built) == 1
+        assert names(index) == [["copy.bin", "kept.bin"]]